@@ -208,6 +208,9 @@ document.addEventListener('DOMContentLoaded', function() {
   // Initialize blog search and pagination if on blog page
   initBlogSearch();
   initBlogPagination();
+
+  // Refresh camp availability badges from the static feed
+  renderAvailability();
 });
 
 /**
@@ -317,6 +320,56 @@ async function loadInstagramFeed() {
   console.log('Using fallback Instagram posts. Configure INSTAGRAM_API_URL or INSTAGRAM_POST_IDS to enable automatic fetching.');
 }
 
+/**
+ * Render summer camp availability badges from /api/availability.json.
+ *
+ * The feed is written by scripts/update_availability.py. Badge elements are
+ * marked with data-availability="campId:sessionIndex" and data-session. The
+ * server-rendered badges stay in place if the feed can't be loaded.
+ */
+async function renderAvailability() {
+  const targets = document.querySelectorAll('[data-availability]');
+  if (targets.length === 0) return;
+
+  let feed;
+  try {
+    const response = await fetch('/api/availability.json');
+    if (!response.ok) return;
+    feed = await response.json();
+  } catch (error) {
+    console.error('Error loading availability feed:', error);
+    return;
+  }
+
+  targets.forEach(el => {
+    const [campId, index] = el.dataset.availability.split(':');
+    const camp = feed.camps && feed.camps[campId];
+    if (!camp || camp.remaining[index] === undefined) return;
+    el.innerHTML = availabilityBadgeHtml(camp.remaining[index], camp.name, el.dataset.session);
+  });
+}
+
+/**
+ * Availability badge HTML (mirrors badge_html in scripts/update_availability.py)
+ */
+function availabilityBadgeHtml(remaining, campName, session) {
+  if (remaining <= 0) {
+    const soldOut = '<span style="color: #d32f2f; font-weight: bold;">SOLD OUT</span>';
+    if (!campName || !session) return soldOut;
+    const subject = encodeURIComponent(`Waitlist Request: ${campName} — ${session}`);
+    const body = encodeURIComponent(
+      `Hi,\n\nI would like to join the waitlist for:\n\n` +
+      `Camp: ${campName}\nSession: ${session}\n\n` +
+      `Camper Name: \nParent/Guardian Name: \nEmail: \nPhone: \n\nThank you!`
+    );
+    return `${soldOut} · <a href="mailto:uimakerlab@illinois.edu?subject=${subject}&body=${body}" style="color: #0455A4; text-decoration: underline;">Join Waitlist</a>`;
+  }
+  if (remaining <= 2) {
+    return `<span style="color: #e04e39; font-weight: bold;">${remaining} spot${remaining === 1 ? '' : 's'} left</span>`;
+  }
+  return `${remaining} spots left`;
+}
+
 /**
  * Create Instagram post HTML element
  */
@@ -358,6 +411,8 @@ function slugify(text) {
  * Adds loading="lazy" attribute to all images that don't already have it
  */
 function implementLazyLoading() {
+  // Deployed pages already carry loading/decoding attributes from
+  // scripts/rewrite_images.py; this only covers images it didn't rewrite.
   // Get all images on the page
   const images = document.querySelectorAll('img');
 
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Project when each camp session will sell out from its recent fill rate.
+
+Sign-ups are treated as a Poisson process per session. The fitted rate is
+the net seats filled over a trailing window (FORECAST_WINDOW_DAYS, or the
+whole history if shorter) divided by its length. A 95% band on the rate
+(n ± 1.96·√n, or the rule of three when nothing sold) gives the earliest and
+latest projected sell-out dates.
+
+All sessions are fitted together: one pass over the history's change points
+fills per-session arrays. Everything after that is elementwise over those
+arrays, so a season of history takes a few milliseconds.
+
+Usage:
+    python3 scripts/availability_forecast.py     # report from data/registration-history/
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from registration_history import RegistrationHistory
+from schedule import parse_date_range
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_PATH = ROOT / "data" / "summer-camps-2026.json"
+
+FORECAST_WINDOW_DAYS = 14
+MIN_HISTORY_DAYS = 1  # below this a rate means nothing
+Z_95 = 1.96
+
+
+def session_start(dates: str, year: int) -> date:
+    """First day of a session from its label, e.g. "Jun 1–5" → June 1."""
+    return parse_date_range(dates, year)[0]
+
+
+def forecast_sessions(
+    history: RegistrationHistory,
+    camps: list[dict],
+    availability: dict,
+    year: int,
+    window_days: float = FORECAST_WINDOW_DAYS,
+) -> dict | None:
+    """Sell-out projection per camp session, or None if history is too short.
+
+    Returns:
+        {camp ID: [forecast or None per session]}. Each forecast is
+        {"rate": seats/day, "eta": date, "earliest": date, "latest": date or
+        None, "before_start": bool}. Sold-out sessions map to None.
+    """
+    if history.first_time is None or history.last_time is None:
+        return None
+    now = history.last_time
+    start = max(history.first_time, now - window_days * 86400)
+    span_days = (now - start) / 86400
+    if span_days < MIN_HISTORY_DAYS:
+        return None
+
+    # Flat slot per session, so the fit below is elementwise over arrays
+    slots = [(camp, i) for camp in camps for i in range(len(camp["sessions"]))]
+    slot_index = {(camp["id"], i): n for n, (camp, i) in enumerate(slots)}
+    filled = [0] * len(slots)
+    for t, deltas in reversed(history.changes):
+        if t <= start:
+            break
+        for key, delta in deltas.items():
+            n = slot_index.get(key)
+            if n is not None:
+                filled[n] += delta
+
+    remaining = [availability[camp["id"]][i]["remaining"] for camp, i in slots]
+    n = [max(f, 0) for f in filled]
+    rate = [k / span_days for k in n]
+    rate_lo = [max(k - Z_95 * math.sqrt(k), 0) / span_days for k in n]
+    rate_hi = [(k + Z_95 * math.sqrt(k)) / span_days if k else 3 / span_days for k in n]
+
+    today = datetime.fromtimestamp(now).date()
+
+    def eta(left: int, r: float) -> date | None:
+        return today + timedelta(days=math.ceil(left / r)) if r > 0 else None
+
+    result: dict[str, list] = {camp["id"]: [] for camp in camps}
+    for s, (camp, i) in enumerate(slots):
+        if remaining[s] <= 0:
+            result[camp["id"]].append(None)
+            continue
+        projected = eta(remaining[s], rate[s])
+        starts = session_start(camp["sessions"][i]["dates"], year)
+        result[camp["id"]].append({
+            "rate": round(rate[s], 2),
+            "eta": projected,
+            "earliest": eta(remaining[s], rate_hi[s]),
+            "latest": eta(remaining[s], rate_lo[s]),
+            "before_start": projected is not None and projected <= starts,
+        })
+    return result
+
+
+def feed_forecast(forecast: dict) -> dict:
+    """JSON-safe form of forecast_sessions() output for the public feed."""
+    def iso(d: date | None) -> str | None:
+        return d.isoformat() if d else None
+
+    return {
+        cid: [
+            None if f is None else {
+                "rate": f["rate"],
+                "eta": iso(f["eta"]),
+                "band": [iso(f["earliest"]), iso(f["latest"])],
+                "before_start": f["before_start"],
+            }
+            for f in sessions
+        ]
+        for cid, sessions in forecast.items()
+    }
+
+
+def main() -> None:
+    from update_availability import AVAILABILITY_PATH, load_json
+
+    data = json.loads(DATA_PATH.read_text())
+    availability = load_json(AVAILABILITY_PATH)
+    if availability is None:
+        raise SystemExit(f"No {AVAILABILITY_PATH.relative_to(ROOT)} — run update_availability.py first")
+
+    forecast = forecast_sessions(RegistrationHistory(), data["camps"], availability, data["year"])
+    if forecast is None:
+        raise SystemExit(f"Less than {MIN_HISTORY_DAYS} day(s) of registration history")
+
+    for camp in data["camps"]:
+        print(camp["name"])
+        for session, f in zip(camp["sessions"], forecast[camp["id"]]):
+            label = f"  {session['dates']} ({session['time']})"
+            if f is None:
+                print(f"{label}: sold out")
+            elif f["eta"] is None:
+                print(f"{label}: no sign-ups in the window")
+            else:
+                latest = f["latest"].isoformat() if f["latest"] else "open"
+                flag = "  ← sells out before start" if f["before_start"] else ""
+                print(f"{label}: {f['rate']}/day, sells out ~{f['eta']} "
+                      f"({f['earliest']} – {latest}){flag}")
+
+
+if __name__ == "__main__":
+    main()
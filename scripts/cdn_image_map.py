@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""One persistent map from Squarespace CDN URLs to local images.
+
+replace_squarespace_images.py, fix_remaining_cdn_images.py and the archived
+update_image_refs.py each used to build their own filename map from the
+image folders. Each then tried several patterns per URL and rewrote files
+with one str.replace per URL. They now share this map.
+
+URLs are normalized before lookup: scheme, host case, query string (the
+CDN's ?format=750w / ?format=1500w variants), URL-encoding (also double
+encoding) and letter case are ignored. All of these are the same image:
+
+    https://images.squarespace-cdn.com/content/v1/5a1b/1512/Foo+Bar.JPG?format=1500w
+    http://images.squarespace-cdn.com/content/v1/5a1b/1512/foo%2Bbar.jpg
+
+A URL resolves in this order:
+1. Its own entry: a URL the downloader fetched (images/.download-journal.jsonl)
+   or a URL resolved on an earlier run.
+2. Its filename, matched against every file under images/. The filename is
+   tried decoded, with special characters replaced by "_", and as the
+   "image_<md5>" name download_squarespace_images.py gives generic asset
+   names.
+
+Resolutions are saved to images/.cdn-map.json, so later runs skip the
+filename search. A file is rewritten with one regex pass whose callback
+looks each URL up.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from image_downloader import JOURNAL_PATH
+from image_refs import IMAGES_DIR, ROOT, find_images, repo_path
+
+MAP_PATH = IMAGES_DIR / ".cdn-map.json"
+
+CDN_URL_RE = re.compile(r'https?://images\.squarespace-cdn\.com[^\s"\'<>\)]+', re.I)
+
+# Folder preference when the same filename exists in several places
+CATEGORY_ORDER = ["blog", "summer", "events", "staff", "general"]
+
+
+def normalize_url(url: str) -> str:
+    """Comparison key for a CDN URL: host + decoded path, lowercase, no query."""
+    parts = urlsplit(url.strip())
+    path = unquote(unquote(parts.path))
+    return f"{parts.netloc}{path}".lower().rstrip("/")
+
+
+def clean_filename(name: str) -> str:
+    """The "_"-for-special-characters form downloaded files were saved under."""
+    return re.sub(r"[^\w\-_.]", "_", name)
+
+
+def filename_keys(url: str) -> list[str]:
+    """Candidate local filenames for a CDN URL, lowercase, best first."""
+    base = url.split("?")[0]
+    decoded = unquote(unquote(base.rsplit("/", 1)[-1]))
+    simplified = re.sub(r"[^\w]", "_", decoded).replace("__", "_").strip("_")
+    keys = [decoded, clean_filename(decoded), simplified]
+    # Generic asset names were saved as image_<md5 of the URL>
+    ext = re.search(r"\.(jpe?g|png|gif|webp|svg)", url, re.I)
+    for hashed in (url, base):
+        digest = hashlib.md5(hashed.encode()).hexdigest()[:12]
+        keys.append(f"image_{digest}{ext.group(0) if ext else '.jpg'}")
+    return list(dict.fromkeys(k.lower() for k in keys if k))
+
+
+class CdnImageMap:
+    """Normalized CDN URL → image repo path ("images/blog/foo.jpg")."""
+
+    def __init__(self, path: Path = MAP_PATH, journal_path: Path = JOURNAL_PATH):
+        self.path = path
+        self.urls: dict[str, str] = {}
+        if path.exists():
+            self.urls = json.loads(path.read_text())
+        if journal_path.exists():
+            for line in journal_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("status") in ("done", "skipped") and CDN_URL_RE.match(entry["url"]):
+                    self.urls[normalize_url(entry["url"])] = entry["path"]
+        self._by_filename: dict[str, list[str]] | None = None
+        self._dirty = False
+
+    def _filename_index(self) -> dict[str, list[str]]:
+        if self._by_filename is None:
+            index: dict[str, list[str]] = {}
+            for image in find_images():
+                path = repo_path(image)
+                for key in {image.name.lower(), clean_filename(image.name).lower()}:
+                    index.setdefault(key, []).append(path)
+            self._by_filename = index
+        return self._by_filename
+
+    def resolve(self, url: str, prefer: str | None = None) -> str | None:
+        """Repo path of the local copy of a CDN URL, or None.
+
+        prefer names an images/ subfolder to pick when a filename exists in
+        several (e.g. "blog" for blog posts).
+        """
+        key = normalize_url(url)
+        known = self.urls.get(key)
+        if known and (ROOT / known).exists():
+            return known
+
+        index = self._filename_index()
+        for name in filename_keys(url):
+            candidates = index.get(name)
+            if candidates:
+                found = self._pick(candidates, prefer)
+                self.record(url, found)
+                return found
+        return None
+
+    def record(self, url: str, path: str) -> None:
+        self.urls[normalize_url(url)] = path
+        self._dirty = True
+
+    def replace(self, text: str, prefix: str = "", prefer: str | None = None) -> tuple[str, int]:
+        """Point every resolvable CDN URL in text at prefix + its repo path, in one pass."""
+        count = 0
+
+        def repl(match: re.Match) -> str:
+            nonlocal count
+            path = self.resolve(match.group(0), prefer)
+            if path is None:
+                return match.group(0)
+            count += 1
+            return prefix + path
+
+        return CDN_URL_RE.sub(repl, text), count
+
+    def unresolved(self, text: str, prefer: str | None = None) -> list[str]:
+        """CDN URLs in text with no local copy."""
+        return [url for url in CDN_URL_RE.findall(text) if self.resolve(url, prefer) is None]
+
+    def save(self) -> None:
+        if self._dirty:
+            self.path.write_text(json.dumps(dict(sorted(self.urls.items())), indent=0) + "\n")
+            self._dirty = False
+
+    @staticmethod
+    def _pick(candidates: list[str], prefer: str | None) -> str:
+        order = ([prefer] if prefer else []) + CATEGORY_ORDER
+
+        def rank(path: str) -> tuple:
+            folder = path.split("/")[1] if path.count("/") > 1 else ""
+            return (order.index(folder) if folder in order else len(order), path)
+
+        return min(candidates, key=rank)
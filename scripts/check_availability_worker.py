@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Check that the availability worker and update_availability.py agree.
+
+Both write api/availability.json and the fallback badges in summer.html and
+the detail pages, so any difference (a session code mapped to another week,
+a camp name, badge markup) makes them undo each other on alternate runs.
+
+Runs the same registrations through both: the worker's pure helpers under
+node, and compute_availability / build_feed / the region renderers here. It
+then compares the feed's camps and every page. Registrations default to a
+synthetic set that uses every session code in CODE_TO_SESSION, with counts
+covering sold out, 1-2 spots left and open.
+
+Usage:
+    python3 scripts/check_availability_worker.py
+    python3 scripts/check_availability_worker.py --registrations /tmp/regs.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from sync_regions import splice
+from update_availability import (
+    CODE_TO_SESSION,
+    DATA_PATH,
+    FIELD_TO_CAMP,
+    build_feed,
+    compute_availability,
+    render_session_rows,
+    render_sessions_line,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+WORKER_PATH = ROOT / "workers" / "availability-updater" / "src" / "index.js"
+
+NODE_SCRIPT = """
+import { readFileSync } from "node:fs";
+const { CAMPS, computeAvailability, buildFeed, updateFallbackBadges } = await import(process.argv[1]);
+const input = JSON.parse(readFileSync(0, "utf8"));
+const feed = buildFeed(computeAvailability(input.registrations), "");
+const stale = new Set(CAMPS.map((c) => c.id));
+const pages = {};
+for (const [path, content] of Object.entries(input.pages)) {
+  pages[path] = updateFallbackBadges(content, feed, stale);
+}
+console.log(JSON.stringify({ camps: feed.camps, pages }));
+"""
+
+
+def synthetic_registrations(camps: list[dict]) -> list[dict]:
+    """Registrations giving each session a different count, from 0 to full."""
+    max_by_id = {camp["id"]: camp["max_campers"] for camp in camps}
+    registrations = []
+    n = 0
+    for field, cid in FIELD_TO_CAMP.items():
+        for code, idx in CODE_TO_SESSION[cid].items():
+            # Offset by the session index so a swapped mapping changes a badge
+            for _ in range((max_by_id[cid] - 2 * idx - 1) % (max_by_id[cid] + 1)):
+                n += 1
+                registrations.append({"FormResponseId": n, field: code})
+    return registrations
+
+
+def python_output(camps: list[dict], registrations: list[dict], pages: dict[str, str]) -> dict:
+    availability = compute_availability(registrations, camps)
+    rendered = dict(pages)
+    rendered["summer.html"] = splice(rendered["summer.html"], {
+        f'camp={camp["id"]}:sessions': render_sessions_line(camp, availability[camp["id"]])
+        for camp in camps
+    })
+    for camp in camps:
+        path = camp["detail_file"]
+        rendered[path] = splice(rendered[path], {
+            f'camp={camp["id"]}:session-rows': render_session_rows(camp, availability[camp["id"]])
+        })
+    return {"camps": build_feed(camps, availability)["camps"], "pages": rendered}
+
+
+def worker_output(registrations: list[dict], pages: dict[str, str]) -> dict:
+    result = subprocess.run(
+        ["node", "--input-type=module", "-e", NODE_SCRIPT, WORKER_PATH.as_uri()],
+        input=json.dumps({"registrations": registrations, "pages": pages}),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout)
+
+
+def compare(python: dict, worker: dict) -> list[str]:
+    problems = []
+    for cid in sorted(set(python["camps"]) | set(worker["camps"])):
+        ours, theirs = python["camps"].get(cid), worker["camps"].get(cid)
+        if ours != theirs:
+            problems.append(f"feed camp {cid}: update_availability.py {ours} vs worker {theirs}")
+    for path in sorted(python["pages"]):
+        ours, theirs = python["pages"][path], worker["pages"][path]
+        if ours != theirs:
+            ours_lines, theirs_lines = ours.splitlines(), theirs.splitlines()
+            line = next(
+                (i for i, (a, b) in enumerate(zip(ours_lines, theirs_lines)) if a != b),
+                min(len(ours_lines), len(theirs_lines)),
+            )
+            problems.append(f"{path} differs from line {line + 1}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the availability worker with update_availability.py")
+    parser.add_argument("--registrations", type=Path, help="FormBuilder export to use instead of synthetic data")
+    args = parser.parse_args()
+
+    camps = json.loads(DATA_PATH.read_text())["camps"]
+    if args.registrations:
+        registrations = json.loads(args.registrations.read_text())
+    else:
+        registrations = synthetic_registrations(camps)
+    paths = ["summer.html"] + [camp["detail_file"] for camp in camps]
+    pages = {path: (ROOT / path).read_text() for path in paths}
+
+    problems = compare(python_output(camps, registrations, pages), worker_output(registrations, pages))
+    if problems:
+        print("Worker and update_availability.py disagree:")
+        for problem in problems:
+            print(f"  - {problem}")
+        sys.exit(1)
+    print(f"Worker matches update_availability.py ({len(registrations)} registrations, {len(paths)} pages)")
+
+
+if __name__ == "__main__":
+    main()
@@ -31,8 +31,8 @@ $PYTHON scripts/update_availability.py >> "$LOG" 2>&1
 if git diff --quiet; then
     echo "No changes detected" >> "$LOG"
 else
-    # Only the public HTML — data/*.json snapshots contain PII and are gitignored.
-    git add summer.html summer/*.html
+    # Only the public feed + HTML — data/*.json snapshots contain PII and are gitignored.
+    git add api/availability.json summer.html summer/*.html
     git commit -m "Update camp availability ($(date +%Y-%m-%d))" >> "$LOG" 2>&1
     git push >> "$LOG" 2>&1
     echo "Committed and pushed" >> "$LOG"
@@ -17,13 +17,13 @@ git pull --ff-only origin main
 python3 scripts/update_availability.py
 
 # Check if anything changed
-if git diff --quiet summer.html summer/*.html; then
+if git diff --quiet api/availability.json summer.html summer/*.html; then
     echo "No availability changes detected."
     exit 0
 fi
 
 # Commit and push
-git add summer.html summer/*.html
+git add api/availability.json summer.html summer/*.html
 git commit -m "Update camp availability ($(date +%Y-%m-%d))"
 git push origin main
 
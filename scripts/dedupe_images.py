@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Remove byte-identical duplicate images and repoint every reference.
+
+The Squarespace migration named files after their URLs, so the same photo
+can sit in images/blog, images/general and images/events at once. This tool
+hashes every file under images/ in parallel and groups files with identical
+bytes. Each group keeps one canonical path: the most-referenced copy, then
+the shortest path. References in the files the site serves
+(image_refs.SITE_GLOBS: pages, css/, js/, api/*.json, sitemap.xml,
+llms.txt) are rewritten to the canonical path in a single pass per file,
+then the redundant copies are deleted. archive/, docs and logs such as
+download_log.txt are records of the past and are left untouched.
+
+Usage:
+    python3 scripts/dedupe_images.py --dry-run   # report duplicate sets and savings
+    python3 scripts/dedupe_images.py             # rewrite references, delete copies
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from image_refs import ROOT, count_refs, file_hash, find_images, find_site_files, repo_path, rewrite_files
+
+
+def hash_images(paths: list, jobs: int | None = None) -> dict[str, list[str]]:
+    """Map content hash → repo paths, hashing in parallel (hashlib releases the GIL)."""
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        digests = pool.map(file_hash, paths)
+        groups: dict[str, list[str]] = {}
+        for path, digest in zip(paths, digests):
+            groups.setdefault(digest, []).append(repo_path(path))
+    return groups
+
+
+def pick_canonical(paths: list[str], ref_counts: Counter) -> str:
+    return min(paths, key=lambda p: (-ref_counts[p], len(p), p))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deduplicate byte-identical images")
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing files")
+    parser.add_argument("--jobs", type=int, default=min(32, (os.cpu_count() or 1) * 4))
+    args = parser.parse_args()
+
+    images = find_images()
+    groups = {d: paths for d, paths in hash_images(images, args.jobs).items() if len(paths) > 1}
+    print(f"Hashed {len(images)} images: {len(groups)} duplicate sets")
+    if not groups:
+        return
+
+    text_files = find_site_files()
+    ref_counts = count_refs(text_files)
+
+    mapping: dict[str, str] = {}
+    saved = 0
+    for paths in sorted(groups.values()):
+        canonical = pick_canonical(paths, ref_counts)
+        print(f"  keep {canonical}")
+        for path in sorted(paths):
+            if path == canonical:
+                continue
+            mapping[path] = canonical
+            saved += (ROOT / path).stat().st_size
+            print(f"    drop {path} ({ref_counts[path]} refs)")
+
+    changed = rewrite_files(
+        text_files, mapping, dry_run=args.dry_run,
+        on_change=lambda path, n: print(f"  {repo_path(path)}: {n} references"),
+    )
+
+    if not args.dry_run:
+        for path in mapping:
+            (ROOT / path).unlink()
+
+    verb = "Would remove" if args.dry_run else "Removed"
+    print(f"{verb} {len(mapping)} duplicate files ({saved / 1e6:.1f} MB), "
+          f"{changed} references repointed")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,16 +6,21 @@ This script:
 2. Categorizes images based on file location (blog, summer, events, etc.)
 3. Downloads images to appropriate folders
 4. Optionally updates HTML files to use local paths
+
+Downloads run concurrently over reused connections and are journaled in
+images/.download-journal.jsonl, so an interrupted run resumes where it
+stopped (see image_downloader.py).
 """
 import os
 import re
 import hashlib
-import urllib.request
 import urllib.parse
 from pathlib import Path
 from collections import defaultdict
-import time
-import sys
+
+from image_downloader import Downloader, Journal
+
+CDN_BASE = 'https://images.squarespace-cdn.com/'
 
 def extract_squarespace_urls(file_path):
     """Extract all Squarespace CDN URLs from a file"""
@@ -77,38 +82,6 @@ def get_filename_from_url(url):
 
     return filename
 
-def download_image(url, dest_path, max_retries=3):
-    """Download an image from URL to destination path"""
-    for attempt in range(max_retries):
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            req = urllib.request.Request(url, headers=headers)
-
-            with urllib.request.urlopen(req, timeout=30) as response:
-                data = response.read()
-                
-                # Verify it's actually an image
-                if len(data) < 100:  # Too small to be an image
-                    raise ValueError("Downloaded file too small")
-
-            # Ensure directory exists
-            dest_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(dest_path, 'wb') as f:
-                f.write(data)
-
-            return True
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"  Retry {attempt + 1}/{max_retries} for {url}")
-                time.sleep(2)
-            else:
-                print(f"  Failed to download {url}: {e}")
-                return False
-    return False
-
 def scan_all_files(target_dir='.'):
     """Scan all HTML and CSS files for Squarespace URLs"""
     print(f"Scanning files in {target_dir} for Squarespace CDN URLs...")
@@ -154,20 +127,21 @@ def scan_all_files(target_dir='.'):
     print(f"Found {len(url_map)} unique images")
     return url_map
 
-def download_all_images(url_map, dry_run=False):
-    """Download all images to their categorized folders"""
+def download_all_images(url_map, dry_run=False, workers=8, cdn_base=None):
+    """Download all images to their categorized folders
+
+    cdn_base replaces the Squarespace CDN origin when fetching, e.g. a local
+    image_server_stub.py for testing.
+    """
     if dry_run:
         print("\n[DRY RUN] Would download images...")
     else:
         print("\nDownloading images...")
 
-    success_count = 0
-    fail_count = 0
-    skipped_count = 0
-
     # Handle filename conflicts
     used_filenames = defaultdict(dict)  # category -> {filename -> count}
 
+    jobs = []
     for i, (base_url, info) in enumerate(url_map.items(), 1):
         category = info['category']
         filename = info['filename']
@@ -185,40 +159,45 @@ def download_all_images(url_map, dry_run=False):
 
         dest_path = Path(f'images/{category}/{filename}')
 
-        # Skip if file already exists
-        if dest_path.exists():
-            print(f"[{i}/{len(url_map)}] Skipping (exists): images/{category}/{filename}")
-            skipped_count += 1
-            continue
-
         # Prefer https URL, fallback to first available
         download_url = None
-        for url in info['original_urls']:
+        for url in sorted(info['original_urls']):
             if url.startswith('https://'):
                 download_url = url
                 break
         if not download_url:
-            download_url = list(info['original_urls'])[0]
+            download_url = sorted(info['original_urls'])[0]
+        if cdn_base:
+            download_url = re.sub(r'^https?://images\.squarespace-cdn\.com/', cdn_base, download_url)
 
         if dry_run:
-            print(f"[{i}/{len(url_map)}] Would download to images/{category}/{filename}")
+            status = "Skipping (exists)" if dest_path.exists() else "Would download"
+            print(f"[{i}/{len(url_map)}] {status} to images/{category}/{filename}")
             print(f"  URL: {download_url}")
         else:
-            print(f"[{i}/{len(url_map)}] Downloading to images/{category}/{filename}")
-
-            if download_image(download_url, dest_path):
-                success_count += 1
-            else:
-                fail_count += 1
-
-            # Small delay to be respectful to the server
-            if i % 10 == 0:
-                time.sleep(1)
+            jobs.append((download_url, dest_path))
 
     if dry_run:
         print(f"\n[DRY RUN] Would download {len(url_map)} images")
-    else:
-        print(f"\nDownload complete: {success_count} successful, {fail_count} failed, {skipped_count} skipped")
+        return 0, 0, 0
+
+    done = 0
+
+    def report(result):
+        nonlocal done
+        done += 1
+        if result['status'] == 'failed':
+            print(f"[{done}/{len(jobs)}] Failed {result['path']}: {result['error']}")
+        elif result['status'] == 'done':
+            print(f"[{done}/{len(jobs)}] Downloaded {result['path']} ({result['bytes']} bytes)")
+
+    counts = Downloader(Journal(), workers=workers).download_all(jobs, on_result=report)
+    success_count = counts['done']
+    fail_count = counts['failed']
+    skipped_count = counts['skipped'] + counts['done before']
+    print(f"\nDownload complete: {success_count} successful, {fail_count} failed, {skipped_count} skipped")
+    if fail_count:
+        print("Rerun to retry the failures; finished downloads are skipped")
     return success_count, fail_count, skipped_count
 
 def main():
@@ -243,6 +222,16 @@ def main():
         action='store_true',
         help='Only scan blog/ directory'
     )
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=8,
+        help='Concurrent downloads (default: 8)'
+    )
+    parser.add_argument(
+        '--cdn-base',
+        help=f'Fetch from this origin instead of {CDN_BASE} (e.g. a local image_server_stub.py)'
+    )
     
     args = parser.parse_args()
     
@@ -268,7 +257,8 @@ def main():
     print("="*60)
     
     # Download images
-    success, failed, skipped = download_all_images(url_map, dry_run=args.dry_run)
+    success, failed, skipped = download_all_images(url_map, dry_run=args.dry_run, workers=args.jobs,
+                                                   cdn_base=args.cdn_base)
     
     if not args.dry_run:
         print(f"\nNext step: Run 'python3 replace_squarespace_images.py {target_dir}' to update HTML files")
@@ -1,114 +1,88 @@
 #!/usr/bin/env python3
 """
 Fix remaining Squarespace CDN URLs in blog posts by matching decoded filenames
+
+Matching goes through the shared CDN map (cdn_image_map.py): decoded,
+cleaned and lowercase filenames, including Chinese and double-encoded ones.
+
+With --download-missing, URLs with no local match are first fetched into
+images/blog/ with the concurrent, resumable downloader (image_downloader.py).
 """
-import re
-import os
 from pathlib import Path
-from urllib.parse import unquote
 
-def get_local_image_map():
-    """Build a map of cleaned filename -> local path"""
-    image_map = {}
-    for category in ['general', 'summer', 'blog', 'events', 'staff']:
-        dir_path = Path(f'images/{category}')
-        if dir_path.exists():
-            for img_file in dir_path.iterdir():
-                if img_file.is_file():
-                    filename = img_file.name
-                    # Store original
-                    image_map[filename.lower()] = f'../images/{category}/{filename}'
-                    image_map[filename] = f'../images/{category}/{filename}'
-                    # Store cleaned version (replace special chars with _)
-                    cleaned = re.sub(r'[^\w\-_.]', '_', filename)
-                    if cleaned != filename:
-                        image_map[cleaned.lower()] = f'../images/{category}/{filename}'
-                        image_map[cleaned] = f'../images/{category}/{filename}'
-    return image_map
+from cdn_image_map import CdnImageMap
+from download_squarespace_images import get_filename_from_url
+from image_downloader import Downloader, Journal
 
-def extract_and_clean_filename(url):
-    """Extract filename from URL and clean it"""
-    # Remove query parameters
-    url_clean = url.split('?')[0]
-    # Get filename
-    filename = url_clean.split('/')[-1]
-    # URL decode (may need multiple passes)
-    decoded = unquote(unquote(filename))  # Handle double encoding
-    # Clean special characters
-    cleaned = re.sub(r'[^\w\-_.]', '_', decoded)
-    return decoded, cleaned
-
-def fix_file(file_path, image_map):
+def fix_file(file_path, cdn_map):
     """Fix Squarespace URLs in a file"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        original_content = content
-        replacements = 0
-        
-        # Find all Squarespace CDN URLs
-        pattern = r'https?://images\.squarespace-cdn\.com[^\s"\'<>\)]+'
-        urls = re.findall(pattern, content)
+        # Blog posts live one level down, so paths need ../
+        content, replacements = cdn_map.replace(content, prefix='../', prefer='blog')
         
-        for url in urls:
-            decoded, cleaned = extract_and_clean_filename(url)
-            local_path = None
-            
-            # Try multiple matching strategies
-            # 1. Try exact decoded filename
-            if decoded in image_map:
-                local_path = image_map[decoded]
-            # 2. Try cleaned filename
-            elif cleaned in image_map:
-                local_path = image_map[cleaned]
-            # 3. Try lowercase versions
-            elif decoded.lower() in image_map:
-                local_path = image_map[decoded.lower()]
-            elif cleaned.lower() in image_map:
-                local_path = image_map[cleaned.lower()]
-            # 4. Try partial match (for cases like "Image September 26" -> "Image_September_26")
-            else:
-                # Remove common patterns and try again
-                simplified = re.sub(r'[^\w]', '_', decoded).replace('__', '_').strip('_')
-                if simplified.lower() in image_map:
-                    local_path = image_map[simplified.lower()]
-            
-            if local_path:
-                content = content.replace(url, local_path)
-                replacements += 1
-                print(f"  Matched: {decoded[:50]} -> {local_path}")
-        
-        if content != original_content:
+        if replacements:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
-            return replacements
-        
-        return 0
+        return replacements
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return 0
 
+def download_missing(files, cdn_map, workers=8):
+    """Download CDN images that have no local copy into images/blog/"""
+    jobs = {}
+    for file_path in files:
+        content = Path(file_path).read_text(encoding='utf-8', errors='ignore')
+        for url in cdn_map.unresolved(content, prefer='blog'):
+            jobs.setdefault(url.split('?')[0], Path('images/blog') / get_filename_from_url(url))
+    if not jobs:
+        return
+
+    def report(result):
+        if result['status'] == 'failed':
+            print(f"  Failed {result['url']}: {result['error']}")
+        else:
+            cdn_map.record(result['url'], result['path'])
+
+    print(f"Downloading {len(jobs)} unmatched images...")
+    counts = Downloader(Journal(), workers=workers).download_all(jobs.items(), on_result=report)
+    print(f"  {counts['done']} downloaded, {counts['failed']} failed, "
+          f"{counts['skipped'] + counts['done before']} already present")
+
 def main():
-    print("Building local image map...")
-    image_map = get_local_image_map()
-    print(f"Found {len(image_map)} local image mappings")
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Point remaining Squarespace CDN URLs in blog posts at local images')
+    parser.add_argument('--download-missing', action='store_true',
+                        help='Download unmatched images into images/blog/ first')
+    parser.add_argument('--jobs', type=int, default=8, help='Concurrent downloads (default: 8)')
+    args = parser.parse_args()
+
+    print("Loading CDN image map...")
+    cdn_map = CdnImageMap()
+    print(f"Found {len(cdn_map.urls)} known CDN URLs")
     
     print("\nScanning blog posts for remaining Squarespace URLs...")
     blog_files = list(Path('blog').glob('*.html'))
+
+    if args.download_missing:
+        download_missing(blog_files, cdn_map, workers=args.jobs)
     
     total_replacements = 0
     files_updated = 0
     
     for file_path in blog_files:
-        replacements = fix_file(file_path, image_map)
+        replacements = fix_file(file_path, cdn_map)
         if replacements > 0:
             files_updated += 1
             total_replacements += replacements
             print(f"{file_path}: {replacements} replacements")
     
+    cdn_map.save()
     print(f"\nDone! Updated {files_updated} files with {total_replacements} total replacements")
 
 if __name__ == '__main__':
     main()
-
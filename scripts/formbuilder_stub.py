@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Local stand-in for the FormBuilder DataEndpoint API.
+
+Serves a registrations export (a JSON list, like data/registrations-snapshot.json)
+and re-reads it on every request, so editing the file simulates sign-ups and
+cancellations while update_availability.py --watch is polling.
+
+Usage:
+    python3 scripts/formbuilder_stub.py data/registrations-snapshot.json --port 8791
+    FORMBUILDER_API_URL=http://localhost:8791/ FORMBUILDER_TOKEN=test \\
+        python3 scripts/update_availability.py --watch --min-interval 2
+
+Requests with a bearer token other than --token get a 401, like an expired
+token does upstream.
+"""
+
+from __future__ import annotations
+
+import argparse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+
+def make_handler(path: Path, token: str):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.headers.get("Authorization") != f"Bearer {token}":
+                self.send_response(401)
+                self.end_headers()
+                return
+            body = path.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local FormBuilder API stub")
+    parser.add_argument("registrations", type=Path, help="JSON file with the registrations list to serve")
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--token", default="test", help="Bearer token to accept (default: test)")
+    args = parser.parse_args()
+
+    server = HTTPServer(("localhost", args.port), make_handler(args.registrations, args.token))
+    print(f"FormBuilder stub on http://localhost:{args.port}/ serving {args.registrations}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,20 @@
 """Generate summer camp form PDFs for Illinois MakerLab.
 
 Based on CU Community Fab Lab forms, adapted with MakerLab branding and contact info.
-Generates 4 individual forms + 1 combined packet.
+Generates 4 individual forms + 1 combined packet. The four forms build in
+parallel worker processes, then the packet. Nothing is rebuilt when this
+script and its constants are unchanged since the last build (recorded in
+summer/forms/.build-hash, gitignored); pass --force to rebuild anyway. A
+build without PyPDF2 produces a cover-only packet and isn't recorded, so the
+next run with PyPDF2 installed builds the full packet.
 """
 
+import argparse
+import functools
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -16,6 +26,7 @@ from reportlab.platypus import (
 from reportlab.lib.colors import HexColor, black, white
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'summer', 'forms')
+BUILD_HASH_FILE = os.path.join(OUTPUT_DIR, '.build-hash')
 
 ILLINOIS_ORANGE = HexColor('#FF5F05')
 ILLINOIS_BLUE = HexColor('#13294B')
@@ -31,7 +42,9 @@ DIRECTOR_DEPT = 'Gies College of Business'
 DIRECTOR_UNIV = 'University of Illinois at Urbana-Champaign'
 
 
+@functools.lru_cache(maxsize=None)
 def get_styles():
+    # Built once per process; every form and helper shares the same stylesheet
     styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(
         'FormTitle', parent=styles['Title'],
@@ -78,7 +91,6 @@ def field_row(label, width='100%'):
 
 
 def signature_block():
-    styles = get_styles()
     elements = []
     elements.append(Spacer(1, 20))
 
@@ -451,7 +463,10 @@ def build_photo_waiver_adults(filename):
 
 
 def build_combined_packet(filename, individual_files):
-    """Build a combined PDF packet from individual form PDFs."""
+    """Build a combined PDF packet from individual form PDFs.
+
+    Returns True if the forms were merged, False for the cover-only fallback.
+    """
     # We'll just build a fresh combined doc with all forms inline
     styles = get_styles()
     doc = SimpleDocTemplate(
@@ -471,6 +486,7 @@ def build_combined_packet(filename, individual_files):
         merger.write(filename)
         merger.close()
         print(f'  Created: {filename} (merged from individual forms)')
+        return True
     except ImportError:
         # Fallback: just create a cover page noting individual forms
         elements = []
@@ -497,9 +513,37 @@ def build_combined_packet(filename, individual_files):
         ))
         doc.build(elements)
         print(f'  Created: {filename} (cover page only - install PyPDF2 for merged version)')
+        return False
+
+
+def build_hash():
+    """Hash of this script plus the constants that end up in the PDFs."""
+    with open(__file__, 'rb') as f:
+        digest = hashlib.sha256(f.read())
+    constants = [
+        ORG_NAME, ORG_ADDRESS, ORG_CITY, ORG_EMAIL, ORG_WEBSITE,
+        DIRECTOR_NAME, DIRECTOR_TITLE, DIRECTOR_DEPT, DIRECTOR_UNIV,
+        ILLINOIS_ORANGE.hexval(), ILLINOIS_BLUE.hexval(),
+    ]
+    digest.update(json.dumps(constants).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_up_to_date(digest, outputs):
+    if not all(os.path.exists(f) for f in outputs):
+        return False
+    try:
+        with open(BUILD_HASH_FILE) as f:
+            return f.read().strip() == digest
+    except FileNotFoundError:
+        return False
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate summer camp form PDFs')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if nothing changed')
+    args = parser.parse_args()
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     emergency = os.path.join(OUTPUT_DIR, 'Emergency-Medical-Contact-Form.pdf')
@@ -507,13 +551,31 @@ def main():
     photo_minors = os.path.join(OUTPUT_DIR, 'Photo-Waiver-Minors.pdf')
     photo_adults = os.path.join(OUTPUT_DIR, 'Photo-Waiver-Adults.pdf')
     combined = os.path.join(OUTPUT_DIR, 'Summer-Camp-Forms.pdf')
+    forms = [
+        (build_emergency_form, emergency),
+        (build_waiver, waiver),
+        (build_photo_waiver_minors, photo_minors),
+        (build_photo_waiver_adults, photo_adults),
+    ]
+
+    digest = build_hash()
+    if not args.force and is_up_to_date(digest, [f for _, f in forms] + [combined]):
+        print('Camp forms are up to date (use --force to rebuild).')
+        return
 
     print('Generating Illinois MakerLab camp forms...')
-    build_emergency_form(emergency)
-    build_waiver(waiver)
-    build_photo_waiver_minors(photo_minors)
-    build_photo_waiver_adults(photo_adults)
-    build_combined_packet(combined, [emergency, waiver, photo_minors, photo_adults])
+    with ProcessPoolExecutor(max_workers=len(forms)) as pool:
+        # The packet merges the individual PDFs, so it waits for all four
+        for future in [pool.submit(build, filename) for build, filename in forms]:
+            future.result()
+        merged = pool.submit(build_combined_packet, combined, [f for _, f in forms]).result()
+
+    if merged:
+        with open(BUILD_HASH_FILE, 'w') as f:
+            f.write(digest + '\n')
+    elif os.path.exists(BUILD_HASH_FILE):
+        # An earlier stamp would mark the cover-only packet as up to date
+        os.remove(BUILD_HASH_FILE)
     print('Done!')
 
 
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Concurrent, resumable image downloads with per-host connection reuse.
+
+A bounded pool of worker threads fetches (url, destination) pairs. Each
+worker keeps one open HTTP/1.1 connection per host and reuses it across
+downloads. A few hundred images from the Squarespace CDN then need a
+handful of TLS handshakes instead of one per file. Bodies are streamed to a
+".part" file beside the destination and renamed into place once complete,
+so an interrupted run never leaves a truncated image behind.
+
+Every outcome is appended to a JSON-lines journal (one record per URL:
+done, failed or skipped). A rerun reads the journal and skips URLs already
+done, so it picks up where the last run stopped and retries only failures.
+
+    {"url": "https://…/foo.jpg", "path": "images/blog/foo.jpg", "status": "done", "bytes": 81234, "at": "…"}
+
+Transient failures (connection errors, 429, 5xx) are retried with
+exponential backoff. Other HTTP errors fail immediately.
+
+Used by download_squarespace_images.py and fix_remaining_cdn_images.py.
+To try it without touching the CDN, run image_server_stub.py and point the
+downloader at it.
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable
+
+ROOT = Path(__file__).resolve().parent.parent
+JOURNAL_PATH = ROOT / "images" / ".download-journal.jsonl"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+CHUNK_SIZE = 64 * 1024
+MIN_BYTES = 100  # anything smaller is an error page, not an image
+MAX_REDIRECTS = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class DownloadError(Exception):
+    def __init__(self, message: str, retry: bool = False, delay: float | None = None):
+        super().__init__(message)
+        self.retry = retry
+        self.delay = delay
+
+
+class Journal:
+    """Append-only JSON-lines record of download outcomes; the last line per URL wins."""
+
+    def __init__(self, path: Path = JOURNAL_PATH):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                self.entries[record["url"]] = record
+
+    def is_done(self, url: str, dest: Path) -> bool:
+        record = self.entries.get(url)
+        return bool(record) and record["status"] == "done" and dest.exists()
+
+    def record(self, url: str, dest: Path, status: str, **fields) -> dict:
+        entry = {"url": url, "path": _display_path(dest), "status": status, **fields,
+                 "at": datetime.now().isoformat(timespec="seconds")}
+        with self._lock:
+            self.entries[url] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+
+class Downloader:
+    """Thread pool of downloaders sharing a journal.
+
+    Args:
+        journal: Where outcomes are recorded; None keeps no journal (no resume).
+        workers: Concurrent downloads, and so the most connections open to one host.
+        retries: Attempts per URL for transient failures.
+    """
+
+    def __init__(self, journal: Journal | None = None, workers: int = 8, retries: int = 3,
+                 timeout: float = 30, backoff: float = 1.0):
+        self.journal = journal
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self._local = threading.local()
+        self._open: list[http.client.HTTPConnection] = []  # every thread's connections
+        self._open_lock = threading.Lock()
+
+    def download_all(self, jobs: Iterable[tuple[str, Path]],
+                     on_result: Callable[[dict], None] | None = None) -> Counter:
+        """Download every (url, destination) pair; return a count per status.
+
+        URLs already done in the journal, or whose destination already
+        exists, are skipped without a request. The workers' connections are
+        closed once every download has finished.
+        """
+        counts: Counter = Counter()
+        todo = []
+        for url, dest in jobs:
+            if self.journal and self.journal.is_done(url, dest):
+                counts["done before"] += 1
+            elif dest.exists():
+                result = self._record(url, dest, "skipped", reason="exists")
+                counts["skipped"] += 1
+                if on_result:
+                    on_result(result)
+            else:
+                todo.append((url, dest))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for result in pool.map(lambda job: self.download(*job), todo):
+                    counts[result["status"]] += 1
+                    if on_result:
+                        on_result(result)
+        finally:
+            self.close()
+        return counts
+
+    def download(self, url: str, dest: Path) -> dict:
+        """Fetch one URL to dest with retries and record the outcome."""
+        for attempt in range(1, self.retries + 1):
+            try:
+                size = self._fetch(url, dest)
+                return self._record(url, dest, "done", bytes=size)
+            except (DownloadError, OSError, http.client.HTTPException, ValueError) as e:
+                retry = getattr(e, "retry", not isinstance(e, ValueError))
+                if not retry or attempt == self.retries:
+                    return self._record(url, dest, "failed", error=str(e) or type(e).__name__,
+                                        attempts=attempt)
+                time.sleep(getattr(e, "delay", None) or self.backoff * 2 ** (attempt - 1))
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        """Close every connection opened by any thread.
+
+        A closed connection reopens on its next request, so the downloader
+        stays usable.
+        """
+        with self._open_lock:
+            connections, self._open = self._open, []
+        for conn in connections:
+            conn.close()
+        self._connections().clear()
+
+    def __enter__(self) -> Downloader:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _record(self, url: str, dest: Path, status: str, **fields) -> dict:
+        if self.journal:
+            return self.journal.record(url, dest, status, **fields)
+        return {"url": url, "path": _display_path(dest), "status": status, **fields}
+
+    def _connections(self) -> dict:
+        """This thread's open connections, keyed by (scheme, host)."""
+        if not hasattr(self._local, "connections"):
+            self._local.connections = {}
+        return self._local.connections
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        connections = self._connections()
+        key = (scheme, netloc)
+        conn = connections.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = connections[key] = cls(netloc, timeout=self.timeout)
+            with self._open_lock:
+                self._open.append(conn)
+        return conn
+
+    def _drop_connection(self, scheme: str, netloc: str) -> None:
+        conn = self._connections().pop((scheme, netloc), None)
+        if conn:
+            conn.close()
+            with self._open_lock:
+                if conn in self._open:
+                    self._open.remove(conn)
+
+    def _fetch(self, url: str, dest: Path) -> int:
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(target)
+            if parts.scheme not in ("http", "https"):
+                raise DownloadError(f"unsupported URL {target}")
+            # Encode anything raw (spaces, accents) but leave existing %-escapes alone
+            path = urllib.parse.quote(parts.path or "/", safe="/%:@!$&'()*+,;=~")
+            if parts.query:
+                path += "?" + parts.query
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request("GET", path, headers={"User-Agent": USER_AGENT, "Accept": "image/*,*/*"})
+                response = conn.getresponse()
+                if response.status in (301, 302, 303, 307, 308):
+                    response.read()
+                    target = urllib.parse.urljoin(target, response.getheader("Location", ""))
+                    continue
+                if response.status != 200:
+                    response.read()
+                    retry_after = response.getheader("Retry-After", "")
+                    raise DownloadError(
+                        f"HTTP {response.status}",
+                        retry=response.status in RETRY_STATUSES,
+                        delay=float(retry_after) if retry_after.isdigit() else None,
+                    )
+                return self._stream(response, dest)
+            except (OSError, http.client.HTTPException):
+                # The server may have closed a kept-alive connection; reconnect next attempt
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+        raise DownloadError("too many redirects")
+
+    def _stream(self, response: http.client.HTTPResponse, dest: Path) -> int:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        part = dest.with_name(dest.name + ".part")
+        size = 0
+        try:
+            with open(part, "wb") as f:
+                while chunk := response.read(CHUNK_SIZE):
+                    f.write(chunk)
+                    size += len(chunk)
+            expected = response.getheader("Content-Length")
+            if expected and expected.isdigit() and int(expected) != size:
+                raise DownloadError(f"incomplete body: {size} of {expected} bytes", retry=True)
+            if size < MIN_BYTES:
+                raise DownloadError(f"body too small to be an image ({size} bytes)")
+            part.replace(dest)
+        finally:
+            part.unlink(missing_ok=True)
+        return size
+
+
+def _display_path(path: Path) -> str:
+    try:
+        return path.resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return str(path)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""List or quarantine images that no served file references.
+
+Builds the reference index (image_refs.ReferenceIndex) over every file the
+site serves: pages, css/, js/, api/*.json, agent-guide.json, sitemap.xml
+and llms.txt. It then diffs the referenced paths against the files under
+images/. The index is cached in images/.ref-index.json, and reruns re-read
+only files that changed.
+
+Quarantine moves orphans to .image-quarantine/ (gitignored), keeping their
+paths, rather than deleting them. Commit the removal, check the deployed
+site, and --restore if something turns out to be loaded another way (for
+example a path built in JavaScript).
+
+Usage:
+    python3 scripts/image_gc.py                 # list orphans, largest first
+    python3 scripts/image_gc.py --quarantine    # move them out of images/
+    python3 scripts/image_gc.py --restore       # put quarantined files back
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+from image_refs import ROOT, ReferenceIndex, find_images, find_site_files, repo_path
+
+QUARANTINE_DIR = ROOT / ".image-quarantine"
+
+
+def find_orphans(index: ReferenceIndex) -> list[tuple[str, int]]:
+    """(repo path, bytes) for every image nothing references, largest first."""
+    referenced = index.referenced()
+    orphans = []
+    for path in find_images():
+        key = repo_path(path)
+        if key not in referenced:
+            orphans.append((key, path.stat().st_size))
+    return sorted(orphans, key=lambda o: (-o[1], o[0]))
+
+
+def quarantine(paths: list[str]) -> None:
+    for key in paths:
+        dest = QUARANTINE_DIR / key
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(ROOT / key, dest)
+
+
+def restore() -> int:
+    restored = 0
+    for path in sorted(QUARANTINE_DIR.rglob("*")):
+        if not path.is_file():
+            continue
+        dest = ROOT / path.relative_to(QUARANTINE_DIR)
+        if dest.exists():
+            print(f"  {repo_path(dest)} exists again — leaving the quarantined copy")
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(path, dest)
+        restored += 1
+    for path in sorted(QUARANTINE_DIR.rglob("*"), reverse=True):
+        if path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+    if QUARANTINE_DIR.exists() and not any(QUARANTINE_DIR.iterdir()):
+        QUARANTINE_DIR.rmdir()
+    return restored
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find images no served file references")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--quarantine", action="store_true", help=f"Move orphans to {QUARANTINE_DIR.name}/")
+    group.add_argument("--restore", action="store_true", help="Move quarantined files back")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the cached reference index")
+    parser.add_argument("--json", type=Path, help="Also write the orphan list to this file")
+    args = parser.parse_args()
+
+    if args.restore:
+        print(f"Restored {restore()} files")
+        return
+
+    index = ReferenceIndex()
+    if args.rebuild:
+        index.files = {}
+    files = find_site_files()
+    scanned = index.update(files)
+    index.save()
+    referenced = index.referenced()
+    print(f"{len(files)} site files ({scanned} re-read), {len(referenced)} referenced images")
+
+    missing = sorted(ref for ref in referenced if not (ROOT / ref).exists())
+    if missing:
+        print(f"{len(missing)} references point at missing files:")
+        for ref in missing:
+            print(f"  {ref} ← {', '.join(referenced[ref][:3])}")
+
+    orphans = find_orphans(index)
+    total = sum(size for _, size in orphans)
+    for key, size in orphans:
+        print(f"  {size / 1e3:9.1f} KB  {key}")
+    print(f"{len(orphans)} unreferenced images, {total / 1e6:.1f} MB")
+
+    if args.json:
+        args.json.write_text(json.dumps([{"path": k, "bytes": s} for k, s in orphans], indent=1) + "\n")
+    if args.quarantine and orphans:
+        quarantine([key for key, _ in orphans])
+        print(f"Moved {len(orphans)} files to {QUARANTINE_DIR.name}/ (restore with --restore)")
+
+
+if __name__ == "__main__":
+    main()
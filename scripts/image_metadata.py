@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Record image metadata, apply EXIF rotation and strip EXIF from originals.
+
+Phone photos (Podio orders, staff shots) arrive with full EXIF: GPS
+position, an embedded thumbnail, and an orientation flag instead of upright
+pixels. For every JPEG and PNG under images/, this tool:
+
+- records size, original orientation, capture date and camera in
+  images/metadata.json, which is what rewrite_images.py reads for
+  width/height
+- rotates the pixels to match the orientation flag. JPEGs go through
+  jpegtran when it is installed (lossless); otherwise Pillow re-encodes them
+  at JPEG_QUALITY
+- drops EXIF, XMP, IPTC and comments. For JPEGs this rewrites the marker
+  segments and leaves the compressed image data untouched, so it is
+  lossless; ICC colour profiles are kept. PNGs are re-saved without their
+  metadata chunks, which is lossless too
+
+Files run in parallel. Entries record the content hash as received
+("source_hash") and after processing ("hash"). Only a file whose bytes match
+a processed "hash" counts as done, so an unchanged or moved file is never
+reopened. A fresh checkout of an original (source_hash, as in CI, where the
+manifest is restored from cache) is processed again before it ships.
+
+    {"images/blog/foo.jpg": {"hash": "…", "source_hash": "…", "width": 3024,
+      "height": 4032, "orientation": 6, "taken": "2025-10-02T14:31:07",
+      "camera": "Apple iPhone 14", "gps": true, "rotated": true,
+      "stripped": true, "lossless": false}}
+
+Usage:
+    python3 scripts/image_metadata.py --dry-run   # report what would change
+    python3 scripts/image_metadata.py             # normalize files, write the manifest
+    python3 scripts/image_metadata.py images/podio
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from image_refs import IMAGES_DIR, ROOT, file_hash, find_images, repo_path
+
+METADATA_PATH = IMAGES_DIR / "metadata.json"
+JPEG_QUALITY = 92
+
+# EXIF tags
+ORIENTATION = 0x0112
+MAKE, MODEL = 0x010F, 0x0110
+DATETIME, DATETIME_ORIGINAL = 0x0132, 0x9003
+EXIF_IFD, GPS_IFD = 0x8769, 0x8825
+
+# JPEG markers dropped when stripping: APP1 (EXIF, XMP), APP13 (IPTC), COM
+STRIP_MARKERS = {0xE1, 0xED, 0xFE}
+JPEGTRAN_ARGS = {
+    2: ["-flip", "horizontal"], 3: ["-rotate", "180"], 4: ["-flip", "vertical"],
+    5: ["-transpose"], 6: ["-rotate", "90"], 7: ["-transverse"], 8: ["-rotate", "270"],
+}
+
+
+def read_metadata(im: Image.Image) -> dict:
+    """Orientation, capture date and camera from an image's EXIF."""
+    exif = im.getexif()
+    taken = exif.get_ifd(EXIF_IFD).get(DATETIME_ORIGINAL) or exif.get(DATETIME)
+    try:
+        taken = datetime.strptime(str(taken).strip("\x00 "), "%Y:%m:%d %H:%M:%S").isoformat() if taken else None
+    except ValueError:
+        taken = None
+    make = str(exif.get(MAKE, "")).strip("\x00 ")
+    model = str(exif.get(MODEL, "")).strip("\x00 ")
+    camera = model if model.startswith(make) else f"{make} {model}".strip()
+    return {
+        "orientation": exif.get(ORIENTATION, 1),
+        "taken": taken,
+        "camera": camera or None,
+        "gps": bool(exif.get_ifd(GPS_IFD)),
+    }
+
+
+def strip_jpeg(data: bytes) -> bytes:
+    """Drop metadata segments from a JPEG without touching the image data."""
+    if data[:2] != b"\xff\xd8":
+        raise ValueError("not a JPEG")
+    out = [data[:2]]
+    i = 2
+    while i < len(data):
+        if data[i] != 0xFF:
+            raise ValueError(f"bad JPEG marker at byte {i}")
+        marker = data[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0xDA:  # start of scan: the rest is image data
+            out.append(data[i:])
+            break
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:  # markers without a length
+            out.append(data[i:i + 2])
+            i += 2
+            continue
+        end = i + 2 + int.from_bytes(data[i + 2:i + 4], "big")
+        if marker not in STRIP_MARKERS:
+            out.append(data[i:end])
+        i = end
+    return b"".join(out)
+
+
+def has_jpeg_metadata(data: bytes) -> bool:
+    return strip_jpeg(data) != data
+
+
+def rotate_jpeg(path: Path, orientation: int) -> tuple[bytes, bool]:
+    """Upright JPEG bytes for a file, and whether the rotation was lossless."""
+    jpegtran = shutil.which("jpegtran")
+    if jpegtran:
+        result = subprocess.run(
+            [jpegtran, "-copy", "icc", "-perfect", *JPEGTRAN_ARGS[orientation], str(path)],
+            capture_output=True,
+        )
+        if result.returncode == 0:
+            return result.stdout, True
+    # No jpegtran, or dimensions that aren't whole MCUs: re-encode
+    with Image.open(path) as im:
+        icc = im.info.get("icc_profile")
+        upright = ImageOps.exif_transpose(im)
+        buf = io.BytesIO()
+        upright.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True, icc_profile=icc)
+    return buf.getvalue(), False
+
+
+def strip_png(path: Path) -> bytes:
+    """PNG bytes without text, EXIF or other metadata chunks (rotated upright)."""
+    with Image.open(path) as im:
+        icc = im.info.get("icc_profile")
+        transparency = im.info.get("transparency")
+        upright = ImageOps.exif_transpose(im)
+        buf = io.BytesIO()
+        options = {"icc_profile": icc, "optimize": True}
+        if transparency is not None:
+            options["transparency"] = transparency
+        upright.save(buf, format="PNG", **options)
+    return buf.getvalue()
+
+
+def process(source: str, source_hash: str, dry_run: bool) -> dict:
+    """Normalize one file and return its manifest entry.
+
+    Runs in a worker process.
+    """
+    path = ROOT / source
+    with Image.open(path) as im:
+        fmt = im.format
+        meta = read_metadata(im)
+        width, height = im.size
+
+    orientation = meta["orientation"] if meta["orientation"] in JPEGTRAN_ARGS else 1
+    if orientation >= 5:
+        width, height = height, width
+
+    data = path.read_bytes()
+    rotated = orientation != 1
+    stripped = False
+    lossless = True
+    if fmt == "JPEG":
+        stripped = has_jpeg_metadata(data)
+        if rotated:
+            lossless = shutil.which("jpegtran") is not None
+            if not dry_run:
+                data, lossless = rotate_jpeg(path, orientation)
+        if not dry_run:
+            data = strip_jpeg(data)
+    elif fmt == "PNG":
+        with Image.open(path) as im:
+            stripped = bool(im.getexif()) or any(k in im.info for k in ("exif", "XML:com.adobe.xmp", "xmp"))
+        if (rotated or stripped) and not dry_run:
+            data = strip_png(path)
+    else:
+        rotated = False
+
+    if (rotated or stripped) and not dry_run:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    return {
+        "hash": file_hash(path) if not dry_run else source_hash,
+        "source_hash": source_hash,
+        "width": width,
+        "height": height,
+        "orientation": meta["orientation"],
+        "taken": meta["taken"],
+        "camera": meta["camera"],
+        "gps": meta["gps"],
+        "rotated": rotated,
+        "stripped": stripped,
+        "lossless": lossless,
+    }
+
+
+def load_metadata() -> dict:
+    if METADATA_PATH.exists():
+        return json.loads(METADATA_PATH.read_text())
+    return {}
+
+
+def save_metadata(manifest: dict) -> None:
+    METADATA_PATH.write_text(json.dumps(dict(sorted(manifest.items())), indent=1) + "\n")
+
+
+def run(paths: list[Path], dry_run: bool = False, jobs: int | None = None) -> dict:
+    """Bring the metadata manifest up to date for the given paths."""
+    manifest = load_metadata()
+    # Keyed by the processed hash only: a file matching an entry's
+    # source_hash is still the original, with its EXIF and sideways pixels
+    by_hash = {entry["hash"]: entry for entry in manifest.values()}
+
+    sources = []
+    for base in paths:
+        for path in ([base] if base.is_file() else find_images(base)):
+            if path.suffix.lower() in {".jpg", ".jpeg", ".png"}:
+                sources.append(path)
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        keys = [repo_path(p) for p in sources]
+        digests = list(pool.map(file_hash, sources, chunksize=16))
+        todo = {}
+        for key, digest in zip(keys, digests):
+            cached = by_hash.get(digest)
+            if cached:
+                manifest[key] = cached
+            else:
+                todo[key] = pool.submit(process, key, digest, dry_run)
+        print(f"{len(sources)} images, {len(sources) - len(todo)} cached, {len(todo)} to inspect")
+
+        changed = 0
+        for key, future in todo.items():
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"  {key}: {e}")
+                continue
+            manifest[key] = entry
+            if entry["rotated"] or entry["stripped"]:
+                changed += 1
+                actions = [a for a in ("rotated", "stripped") if entry[a]]
+                if entry["gps"]:
+                    actions.append("GPS removed")
+                if not entry["lossless"]:
+                    actions.append("re-encoded")
+                print(f"  {key}: {', '.join(actions)}")
+
+    verb = "Would change" if dry_run else "Changed"
+    print(f"{verb} {changed} files")
+    if not dry_run:
+        for key in [k for k in manifest if not (ROOT / k).exists()]:
+            del manifest[key]
+        save_metadata(manifest)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Normalize image orientation and strip EXIF metadata")
+    parser.add_argument("paths", nargs="*", type=Path, default=[IMAGES_DIR])
+    parser.add_argument("--dry-run", action="store_true", help="Report without changing files or the manifest")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+    run(args.paths, args.dry_run, args.jobs)
+
+
+if __name__ == "__main__":
+    main()
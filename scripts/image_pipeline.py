@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Build responsive WebP/AVIF derivatives for every raster image in images/.
+
+Each JPEG/PNG is encoded at a ladder of widths (WIDTHS, never upscaled) in
+each available format. The output goes to images/variants/, named by the
+source's content hash:
+
+    images/variants/3f2a9c0d1e7b44c1-640.webp
+
+A derivative whose file already exists is never re-encoded, so reruns only
+touch new or changed images, wherever they moved. Sources whose size and
+mtime match the manifest aren't even re-hashed. Images are processed in
+parallel across cores.
+
+The manifest (images/manifest.json) maps each original to its variants:
+
+    {"images/blog/foo.jpg": {"hash": "…", "bytes": 812345, "width": 1500,
+      "height": 1000, "mtime_ns": …,
+      "placeholder": {"color": "#8a7f72", "lqip": "data:image/webp;base64,…"},
+      "variants": [{"path": "images/variants/…-640.avif", "format": "avif",
+                    "width": 640, "height": 427, "bytes": 31234}, …]}}
+
+The placeholder is the image's average colour plus a WebP of at most 16px
+on its long side (PLACEHOLDER_MAX_BYTES or less). rewrite_images.py inlines
+it as the <img> background, so a page shows the picture's shape and colours
+before the real file arrives. The browser's upscaling does the blurring.
+Images with transparency get "placeholder": null, since a background would
+show through them.
+
+Both are build outputs: the Pages deploy workflow regenerates them (with a
+cache) and they are gitignored.
+
+Usage:
+    python3 scripts/image_pipeline.py                 # whole images/ tree
+    python3 scripts/image_pipeline.py images/blog     # one folder
+    python3 scripts/image_pipeline.py --jobs 4 --formats webp
+
+Requires Pillow (AVIF needs Pillow 11.2+ built with libavif; otherwise only
+WebP is produced).
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+from image_refs import file_hash
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGES_DIR = ROOT / "images"
+VARIANTS_DIR = IMAGES_DIR / "variants"
+MANIFEST_PATH = IMAGES_DIR / "manifest.json"
+
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+WIDTHS = (320, 640, 960, 1280, 1920)
+FORMATS = ("avif", "webp")  # preference order, best first
+SAVE_OPTIONS = {
+    "avif": {"quality": 55, "speed": 8},
+    "webp": {"quality": 78, "method": 4},
+}
+PLACEHOLDER_MAX_BYTES = 300
+PLACEHOLDER_STEPS = ((16, 40), (12, 30), (8, 20))  # (long side px, WebP quality), tried in order
+
+
+def available_formats(requested: tuple[str, ...] = FORMATS) -> tuple[str, ...]:
+    return tuple(fmt for fmt in requested if features.check(fmt))
+
+
+def relpath(path: Path) -> str:
+    return path.resolve().relative_to(ROOT).as_posix()
+
+
+def find_sources(paths: list[Path]) -> list[Path]:
+    """Raster originals under the given paths, skipping generated variants."""
+    sources = []
+    for base in paths:
+        candidates = [base] if base.is_file() else base.rglob("*")
+        for path in candidates:
+            if path.suffix.lower() not in SOURCE_EXTENSIONS or not path.is_file():
+                continue
+            if VARIANTS_DIR in path.resolve().parents:
+                continue
+            sources.append(path)
+    return sorted(sources)
+
+
+def ladder(width: int) -> list[int]:
+    """Target widths for an image: the ladder below its width, plus its own width."""
+    widths = [w for w in WIDTHS if w < width]
+    if width <= WIDTHS[-1]:
+        widths.append(width)
+    return widths or [width]
+
+
+def load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text())
+    return {}
+
+
+def save_manifest(manifest: dict) -> None:
+    MANIFEST_PATH.write_text(json.dumps(dict(sorted(manifest.items())), indent=1) + "\n")
+
+
+def placeholder(im: Image.Image) -> dict | None:
+    """Average colour and a tiny WebP data URI for an RGB/RGBA image, or None if it has transparency."""
+    if im.mode == "RGBA" and im.getextrema()[3][0] < 255:
+        return None
+    rgb = im.convert("RGB")
+    color = "#{:02x}{:02x}{:02x}".format(*rgb.resize((1, 1), Image.BOX).getpixel((0, 0)))
+    width, height = rgb.size
+    for side, quality in PLACEHOLDER_STEPS:
+        scale = side / max(width, height)
+        small = rgb.resize((max(1, round(width * scale)), max(1, round(height * scale))), Image.BOX)
+        buf = io.BytesIO()
+        small.save(buf, format="WEBP", quality=quality, method=6)
+        if buf.tell() <= PLACEHOLDER_MAX_BYTES:
+            return {"color": color, "lqip": "data:image/webp;base64," + base64.b64encode(buf.getvalue()).decode()}
+    return {"color": color}
+
+
+def build_variants(source: str, digest: str, formats: tuple[str, ...]) -> dict:
+    """Encode the missing derivatives for one image and return its manifest entry.
+
+    Runs in a worker process.
+    """
+    path = ROOT / source
+    with Image.open(path) as im:
+        # Variants are upright whatever the camera's EXIF orientation says
+        im = ImageOps.exif_transpose(im)
+        if im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA" if "transparency" in im.info or im.mode in ("LA", "PA") else "RGB")
+        width, height = im.size
+        preview = placeholder(im)
+
+        variants = []
+        for target in ladder(width):
+            target_height = max(1, round(height * target / width))
+            resized = None
+            for fmt in formats:
+                out = VARIANTS_DIR / f"{digest[:16]}-{target}.{fmt}"
+                if not out.exists():
+                    if resized is None:
+                        resized = im if target == width else im.resize((target, target_height), Image.LANCZOS)
+                    tmp = out.with_suffix(f".{fmt}.tmp")
+                    resized.save(tmp, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+                    tmp.replace(out)
+                variants.append({
+                    "path": relpath(out),
+                    "format": fmt,
+                    "width": target,
+                    "height": target_height,
+                    "bytes": out.stat().st_size,
+                })
+
+    stat = path.stat()
+    return {
+        "hash": digest,
+        "bytes": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "width": width,
+        "height": height,
+        "placeholder": preview,
+        "variants": variants,
+    }
+
+
+def is_cached(entry: dict | None, path: Path, formats: tuple[str, ...]) -> bool:
+    """True if the manifest entry still describes this file and its variants exist."""
+    if not entry or "placeholder" not in entry:
+        return False
+    stat = path.stat()
+    if entry.get("bytes") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+        return False
+    have = {v["format"] for v in entry["variants"]}
+    return set(formats) <= have and all((ROOT / v["path"]).exists() for v in entry["variants"])
+
+
+def run(paths: list[Path], formats: tuple[str, ...], jobs: int | None = None) -> dict:
+    """Bring the manifest and variants up to date for the given paths."""
+    manifest = load_manifest()
+    sources = find_sources(paths)
+    VARIANTS_DIR.mkdir(parents=True, exist_ok=True)
+
+    todo = []
+    for path in sources:
+        key = relpath(path)
+        if not is_cached(manifest.get(key), path, formats):
+            todo.append(key)
+    print(f"{len(sources)} images, {len(sources) - len(todo)} cached, {len(todo)} to process "
+          f"({', '.join(formats)})")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        digests = list(pool.map(file_hash, [ROOT / key for key in todo], chunksize=8))
+        futures = {key: pool.submit(build_variants, key, digest, formats) for key, digest in zip(todo, digests)}
+        for n, (key, future) in enumerate(futures.items(), 1):
+            try:
+                manifest[key] = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"  [{n}/{len(todo)}] {key}: {e}")
+                continue
+            if n % 50 == 0 or n == len(todo):
+                print(f"  [{n}/{len(todo)}] processed")
+
+    # Drop entries for originals that no longer exist
+    for key in [k for k in manifest if not (ROOT / k).exists()]:
+        del manifest[key]
+
+    save_manifest(manifest)
+    if failed:
+        print(f"{failed} images failed")
+    return manifest
+
+
+def report(manifest: dict) -> None:
+    original = sum(e["bytes"] for e in manifest.values())
+    best = 0
+    for e in manifest.values():
+        full = [v for v in e["variants"] if v["width"] == max(x["width"] for x in e["variants"])]
+        best += min(v["bytes"] for v in full)
+    print(f"Originals: {original / 1e6:.1f} MB; best full-width variants: {best / 1e6:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build responsive image derivatives")
+    parser.add_argument("paths", nargs="*", type=Path, default=[IMAGES_DIR])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes (default: all cores)")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated formats (default: avif,webp)")
+    args = parser.parse_args()
+
+    requested = tuple(f.strip() for f in args.formats.split(",") if f.strip())
+    formats = available_formats(requested)
+    missing = set(requested) - set(formats)
+    if missing:
+        print(f"Pillow has no {', '.join(sorted(missing))} support here — skipping")
+    if not formats:
+        raise SystemExit("No usable output formats")
+
+    manifest = run(args.paths, formats, args.jobs)
+    report(manifest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Shared helpers for finding images and the site files that reference them.
+
+An image reference is any "images/…" path with an image extension in an
+HTML, CSS, JS, JSON, XML, text or Markdown file. It may carry a "../" or "/"
+prefix, a site URL, or URL-encoding. Every reference is normalized to its
+repo path ("images/blog/foo bar.jpg") so references can be compared with
+the files on disk.
+
+Matching the path itself rather than particular attributes means src,
+srcset candidates, inline style backgrounds, og:image meta tags and JSON-LD
+are all covered. ReferenceIndex caches the references of the files the
+site actually serves (SITE_GLOBS) and re-reads only files that changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import urllib.parse
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+IMAGES_DIR = ROOT / "images"
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".svg"}
+TEXT_EXTENSIONS = {".html", ".css", ".js", ".json", ".xml", ".txt", ".md"}
+SKIP_DIRS = {".git", "node_modules", "variants"}
+
+# Files the deployed site serves that can point at an image. Archive pages,
+# docs, data exports and logs are left out: a mention there doesn't keep
+# an image alive.
+SITE_GLOBS = [
+    "*.html", "blog/**/*.html", "summer/**/*.html", "courses/**/*.html",
+    "css/**/*.css", "js/**/*.js", "api/**/*.json",
+    "agent-guide.json", "sitemap.xml", "llms.txt",
+]
+INDEX_PATH = IMAGES_DIR / ".ref-index.json"
+
+# "images/…" up to an image extension, stopping at quotes, brackets or whitespace
+IMAGE_REF_RE = re.compile(
+    r"images/[^\"'()<>\s]*?\.(?:jpe?g|png|gif|webp|avif|svg)(?=[\"'()<>\s?#,;]|$)",
+    re.I,
+)
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _walk(base: Path, extensions: set[str]) -> Iterator[Path]:
+    for path in base.rglob("*"):
+        if path.suffix.lower() not in extensions or not path.is_file():
+            continue
+        if SKIP_DIRS.intersection(path.relative_to(base).parts):
+            continue
+        yield path
+
+
+def find_images(base: Path = IMAGES_DIR) -> list[Path]:
+    """Every image file under images/, excluding generated variants."""
+    return sorted(_walk(base, IMAGE_EXTENSIONS))
+
+
+def find_text_files(base: Path = ROOT) -> list[Path]:
+    """Every site file that can reference an image."""
+    return sorted(p for p in _walk(base, TEXT_EXTENSIONS) if IMAGES_DIR not in p.parents)
+
+
+def find_site_files(base: Path = ROOT) -> list[Path]:
+    """Every served file that can reference an image (SITE_GLOBS)."""
+    files = set()
+    for pattern in SITE_GLOBS:
+        files.update(p for p in base.glob(pattern) if p.is_file())
+    return sorted(files)
+
+
+def repo_path(path: Path) -> str:
+    return path.resolve().relative_to(ROOT).as_posix()
+
+
+def normalize_ref(ref: str) -> str:
+    """Repo path for a matched reference ("images/a%20b.JPG" → "images/a b.JPG")."""
+    return urllib.parse.unquote(ref)
+
+
+def iter_refs(text: str) -> Iterator[str]:
+    """Normalized image repo paths referenced in a text."""
+    for match in IMAGE_REF_RE.finditer(text):
+        yield normalize_ref(match.group(0))
+
+
+def count_refs(files: list[Path]) -> Counter:
+    """How many times each image repo path is referenced across files."""
+    counts: Counter = Counter()
+    for path in files:
+        counts.update(iter_refs(path.read_text(encoding="utf-8", errors="ignore")))
+    return counts
+
+
+def replace_refs(text: str, mapping: dict[str, str]) -> tuple[str, int]:
+    """Point every reference found in mapping at its new repo path, in one pass.
+
+    URL-encoded references stay URL-encoded.
+    """
+    count = 0
+
+    def repl(match: re.Match) -> str:
+        nonlocal count
+        ref = match.group(0)
+        new = mapping.get(normalize_ref(ref))
+        if new is None:
+            return ref
+        count += 1
+        return urllib.parse.quote(new) if "%" in ref else new
+
+    return IMAGE_REF_RE.sub(repl, text), count
+
+
+def rewrite_files(files: list[Path], mapping: dict[str, str], dry_run: bool = False,
+                  on_change: Callable[[Path, int], None] | None = None) -> int:
+    """Apply replace_refs to every file; return the number of references changed."""
+    total = 0
+    for path in files:
+        text = path.read_text(encoding="utf-8", errors="surrogateescape")
+        updated, count = replace_refs(text, mapping)
+        if not count:
+            continue
+        total += count
+        if on_change:
+            on_change(path, count)
+        if not dry_run:
+            path.write_text(updated, encoding="utf-8", errors="surrogateescape")
+    return total
+
+
+class ReferenceIndex:
+    """Image references per site file, cached in images/.ref-index.json.
+
+    update() re-reads only files whose size or mtime changed since the last
+    run, and forgets files that are gone.
+    """
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self.files: dict[str, dict] = {}
+        if path.exists():
+            self.files = json.loads(path.read_text()).get("files", {})
+
+    def update(self, files: list[Path]) -> int:
+        """Bring the index up to date with files; return how many were re-read."""
+        current = {}
+        scanned = 0
+        for path in files:
+            key = repo_path(path)
+            stat = path.stat()
+            entry = self.files.get(key)
+            if not entry or entry["bytes"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                text = path.read_text(encoding="utf-8", errors="ignore")
+                entry = {"bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+                         "refs": sorted(set(iter_refs(text)))}
+                scanned += 1
+            current[key] = entry
+        self.files = current
+        return scanned
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps({"files": self.files}, indent=0) + "\n")
+
+    def referenced(self) -> dict[str, list[str]]:
+        """Image repo path → the site files that reference it."""
+        refs: dict[str, list[str]] = {}
+        for key, entry in self.files.items():
+            for ref in entry["refs"]:
+                refs.setdefault(ref, []).append(key)
+        return refs
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Local stand-in for an image CDN, for exercising image_downloader.py.
+
+Serves files from a directory over HTTP/1.1 with keep-alive and counts the
+connections it accepts, so connection reuse is visible. --flaky N makes the
+first N requests for each path return 503, to exercise retries, and --delay
+slows every response.
+
+Usage:
+    python3 scripts/image_server_stub.py images/staff --port 8792 --flaky 1
+    python3 scripts/download_squarespace_images.py blog/ --cdn-base http://localhost:8792/
+
+Unknown paths get a 404; paths starting with /redirect/ get a 302 to the
+rest of the path.
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+
+def make_handler(root: Path, flaky: int, delay: float, stats: Counter):
+    lock = threading.Lock()
+    attempts: Counter = Counter()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with lock:
+                stats["connections"] += 1
+
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path)
+            with lock:
+                stats["requests"] += 1
+                attempts[path] += 1
+                attempt = attempts[path]
+            if delay:
+                time.sleep(delay)
+            if path.startswith("/redirect/"):
+                return self.reply(302, b"", {"Location": path[len("/redirect"):]})
+            if attempt <= flaky:
+                return self.reply(503, b"try again")
+            file = (root / path.lstrip("/")).resolve()
+            if root not in file.parents or not file.is_file():
+                return self.reply(404, b"not found")
+            self.reply(200, file.read_bytes(), {"Content-Type": "application/octet-stream"})
+
+        def reply(self, status: int, body: bytes, headers: dict | None = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local image CDN stub")
+    parser.add_argument("root", type=Path, help="Directory of files to serve")
+    parser.add_argument("--port", type=int, default=8792)
+    parser.add_argument("--flaky", type=int, default=0, help="Fail the first N requests per path with 503")
+    parser.add_argument("--delay", type=float, default=0, help="Seconds to wait before each response")
+    args = parser.parse_args()
+
+    stats: Counter = Counter()
+    root = args.root.resolve()
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(root, args.flaky, args.delay, stats))
+    print(f"Image stub on http://localhost:{args.port}/ serving {args.root}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{stats['requests']} requests over {stats['connections']} connections")
+
+
+if __name__ == "__main__":
+    main()
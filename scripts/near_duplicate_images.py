@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Find resized or recompressed copies of the same image.
+
+dedupe_images.py only catches byte-identical files. The Squarespace CDN also
+served the same photo at several sizes (format=750w, format=1500w, …), and
+each one was saved separately. Those files differ byte for byte but look
+the same.
+
+Each image gets a 64-bit difference hash (dHash). The image is shrunk to a
+9×8 grayscale thumbnail, and each bit records whether a pixel is brighter
+than its right-hand neighbour. Resizing and recompression barely move these
+bits, so two copies of a photo sit a few bits apart (Hamming distance),
+while unrelated photos sit around 32 apart.
+
+Hashes go into a BK-tree. A lookup within distance d uses the triangle
+inequality to skip every subtree that can't hold a match, so finding all
+near pairs costs far less than comparing every pair. Pairs are merged into
+clusters with union-find. Each cluster recommends a keeper: the
+most-referenced copy, so live pages keep the file they already use, then
+the largest pixel area, then the shortest path.
+
+JPEGs are decoded at reduced scale (Image.draft), so hashing is cheap.
+Hashes are cached in images/.dhash-cache.json by size and mtime, so reruns
+only hash new or changed files.
+
+Usage:
+    python3 scripts/near_duplicate_images.py                 # report clusters
+    python3 scripts/near_duplicate_images.py --distance 2    # stricter match
+    python3 scripts/near_duplicate_images.py --json clusters.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from image_refs import IMAGES_DIR, count_refs, find_images, find_text_files, repo_path
+
+CACHE_PATH = IMAGES_DIR / ".dhash-cache.json"
+RASTER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif"}
+DEFAULT_DISTANCE = 4  # bits out of 64; 5+ starts pairing similar-looking shots
+
+
+def dhash(path: Path) -> tuple[int, int, int]:
+    """64-bit difference hash plus the image's pixel size.
+
+    Runs in a worker process.
+    """
+    with Image.open(path) as im:
+        width, height = im.size
+        if im.getexif().get(0x0112, 1) > 4:  # EXIF orientation rotates by 90°
+            width, height = height, width
+        im.draft("L", (64, 64))  # JPEG only: decode at 1/2–1/8 scale
+        if im.mode == "P":
+            im = im.convert("RGBA")
+        small = im.convert("L").resize((9, 8), Image.BILINEAR)
+    px = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (px[row * 9 + col] > px[row * 9 + col + 1])
+    return bits, width, height
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """Metric tree over integer hashes with Hamming distance."""
+
+    def __init__(self) -> None:
+        self.root: list | None = None  # [hash, items, {distance: child}]
+
+    def add(self, value: int, item) -> None:
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value: int, radius: int) -> list:
+        """Every item whose hash is within radius of value."""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found.extend(node[1])
+            for edge, child in node[2].items():
+                if d - radius <= edge <= d + radius:
+                    stack.append(child)
+        return found
+
+
+def load_cache() -> dict:
+    if CACHE_PATH.exists():
+        return json.loads(CACHE_PATH.read_text())
+    return {}
+
+
+def hash_images(paths: list[Path], jobs: int | None = None) -> dict[str, dict]:
+    """{repo path: {"dhash", "width", "height"}}, hashing only uncached files."""
+    cache = load_cache()
+    hashes: dict[str, dict] = {}
+    todo = []
+    for path in paths:
+        key = repo_path(path)
+        stat = path.stat()
+        entry = cache.get(key)
+        if entry and entry["bytes"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            hashes[key] = entry
+        else:
+            todo.append((key, path, stat))
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = pool.map(_try_dhash, [path for _, path, _ in todo], chunksize=16)
+            for (key, _, stat), result in zip(todo, results):
+                if result is None:
+                    continue
+                bits, width, height = result
+                hashes[key] = {"dhash": bits, "width": width, "height": height,
+                               "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        CACHE_PATH.write_text(json.dumps(dict(sorted(hashes.items())), indent=0) + "\n")
+    print(f"{len(paths)} images, {len(paths) - len(todo)} cached, {len(todo)} hashed")
+    return hashes
+
+
+def _try_dhash(path: Path) -> tuple[int, int, int] | None:
+    try:
+        return dhash(path)
+    except Exception as e:
+        print(f"  {repo_path(path)}: {e}")
+        return None
+
+
+def find_clusters(hashes: dict[str, dict], distance: int) -> list[list[str]]:
+    """Groups of paths connected by pairs at most `distance` bits apart."""
+    tree = BKTree()
+    for key, entry in hashes.items():
+        tree.add(entry["dhash"], key)
+
+    parent = {key: key for key in hashes}
+
+    def find(x: str) -> str:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for key, entry in hashes.items():
+        for other in tree.search(entry["dhash"], distance):
+            a, b = find(key), find(other)
+            if a != b:
+                parent[b] = a
+
+    groups: dict[str, list[str]] = {}
+    for key in hashes:
+        groups.setdefault(find(key), []).append(key)
+    return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+
+
+def pick_keeper(cluster: list[str], hashes: dict[str, dict], ref_counts: Counter) -> str:
+    def rank(key: str) -> tuple:
+        entry = hashes[key]
+        return (-ref_counts[key], -entry["width"] * entry["height"], len(key), key)
+    return min(cluster, key=rank)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find near-duplicate images by perceptual hash")
+    parser.add_argument("--distance", type=int, default=DEFAULT_DISTANCE,
+                        help=f"Max differing hash bits, 0–64 (default: {DEFAULT_DISTANCE})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--json", type=Path, help="Also write clusters to this file")
+    args = parser.parse_args()
+
+    paths = [p for p in find_images() if p.suffix.lower() in RASTER_EXTENSIONS]
+    hashes = hash_images(paths, args.jobs)
+    clusters = find_clusters(hashes, args.distance)
+    ref_counts = count_refs(find_text_files())
+
+    report = []
+    redundant = 0
+    for cluster in clusters:
+        keeper = pick_keeper(cluster, hashes, ref_counts)
+        entry = hashes[keeper]
+        print(f"keep {keeper} ({entry['width']}×{entry['height']}, {ref_counts[keeper]} refs)")
+        others = []
+        for key in cluster:
+            if key == keeper:
+                continue
+            other = hashes[key]
+            redundant += other["bytes"]
+            print(f"  ~{hamming(entry['dhash'], other['dhash']):2d} {key} "
+                  f"({other['width']}×{other['height']}, {ref_counts[key]} refs)")
+            others.append(key)
+        report.append({"keep": keeper, "duplicates": others})
+
+    files = sum(len(c) - 1 for c in clusters)
+    print(f"{len(clusters)} clusters, {files} near-duplicates ({redundant / 1e6:.1f} MB)")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,9 +14,14 @@ Usage:
     # Dry run — prints what would happen, no API calls to send or comment
     python auto_reply_emails.py --dry-run
 
+    # Backlog mode — classify 8 emails per OpenAI request
+    python auto_reply_emails.py --lookback 30 --batch-size 8
+
 Environment variables:
     PODIO_CLIENT_ID, PODIO_CLIENT_SECRET, PODIO_USERNAME, PODIO_PASSWORD
     OPENAI_API_KEY
+    OPENAI_BASE_URL (optional — point at a local mock model endpoint for testing,
+                     e.g. mock_model_server.py: http://localhost:8793/v1)
     SENDGRID_API_KEY (only needed in --send mode)
 """
 
@@ -31,13 +36,17 @@ from openai import OpenAI
 from dotenv import load_dotenv
 from podio_client import get_client
 from website_context import get_website_context
-from smtp_sender import send_email
+from smtp_sender import SMTPSender
+from processed_journal import ProcessedJournal, content_hash
 
 load_dotenv()
 
 EMAIL_APP_ID = 12703942
 LOOKBACK_DAYS = 7
 MAX_EMAILS_PER_RUN = 20
+MODEL = "gpt-4o-mini"
+MODEL_CALL_INTERVAL = 0.5  # seconds between OpenAI requests (rate limit)
+VALID_CLASSIFICATIONS = {"ANSWERABLE", "NEEDS_HUMAN", "SKIP"}
 
 SYSTEM_PROMPT = """You are an email assistant for the Illinois MakerLab at the University of Illinois.
 Your job is to classify incoming emails and draft helpful replies based on the website content provided.
@@ -69,6 +78,23 @@ Respond in this exact JSON format:
   "reply_html": "HTML reply text (only if ANSWERABLE, otherwise null)"
 }"""
 
+BATCH_PROMPT = """
+
+BATCH MODE: You will receive several emails, each marked with an ID.
+Classify each email independently using the rules above. Do not mix details between emails.
+Respond in this exact JSON format, with exactly one entry per email:
+{
+  "results": [
+    {
+      "id": <email ID>,
+      "classification": "ANSWERABLE" | "NEEDS_HUMAN" | "SKIP",
+      "confidence": 0.0-1.0,
+      "reason": "Brief explanation of classification",
+      "reply_html": "HTML reply text (only if ANSWERABLE, otherwise null)"
+    }
+  ]
+}"""
+
 
 def get_field_value(item, external_id):
     """Get a field value from a Podio item."""
@@ -109,9 +135,61 @@ def get_sender_email(item):
     return None
 
 
-def fetch_unreplied_emails(client, lookback_days=LOOKBACK_DAYS):
-    """Fetch recent unreplied emails from Podio."""
-    since_dt = datetime.now() - timedelta(days=lookback_days)
+def email_from_item(client, item, journal=None):
+    """Build an email dict from a Podio item, or None if it needs no reply.
+
+    Skips noreply senders, items without a sender address and items that
+    already have a reply or auto-action comment. With a journal, items that
+    were already settled are skipped without fetching their comments.
+    """
+    from_name = get_field_value(item, "from")
+    subject = get_field_value(item, "title")
+    body = get_field_value(item, "body")
+    sender_email = get_sender_email(item)
+
+    # Skip noreply addresses
+    if sender_email and "noreply" in sender_email.lower():
+        return None
+
+    # Skip if no sender email found
+    if not sender_email:
+        return None
+
+    digest = content_hash(sender_email, subject, body)
+    if journal and journal.is_settled(item["item_id"], digest):
+        return None
+
+    # Check for existing replies
+    time.sleep(0.3)
+    comments = client.get(f"/comment/item/{item['item_id']}/")
+
+    if has_reply(comments):
+        if journal:
+            journal.record(item["item_id"], "replied", digest)
+        return None
+
+    # Strip HTML from body
+    body_text = re.sub(r"<[^>]+>", " ", body).strip()
+    body_text = re.sub(r"\s+", " ", body_text)
+
+    return {
+        "item_id": item["item_id"],
+        "from_name": from_name,
+        "from_email": sender_email,
+        "subject": subject,
+        "body": body_text[:1000],
+        "created": item.get("created_on", ""),
+        "hash": digest,
+    }
+
+
+def fetch_unreplied_emails(client, lookback_days=LOOKBACK_DAYS, journal=None, now=None):
+    """Fetch recent unreplied emails from Podio.
+
+    The lookback window ends at now (default: the current time); replays
+    pass the time a run was recorded.
+    """
+    since_dt = (now or datetime.now()) - timedelta(days=lookback_days)
     emails = []
     offset = 0
     batch_size = 30
@@ -138,38 +216,11 @@ def fetch_unreplied_emails(client, lookback_days=LOOKBACK_DAYS):
             if created_dt < since_dt:
                 return emails
 
-            from_name = get_field_value(item, "from")
-            subject = get_field_value(item, "title")
-            body = get_field_value(item, "body")
-            sender_email = get_sender_email(item)
-
-            # Skip noreply addresses
-            if sender_email and "noreply" in sender_email.lower():
-                continue
-
-            # Skip if no sender email found
-            if not sender_email:
+            email = email_from_item(client, item, journal)
+            if not email:
                 continue
 
-            # Check for existing replies
-            time.sleep(0.3)
-            comments = client.get(f"/comment/item/{item['item_id']}/")
-
-            if has_reply(comments):
-                continue
-
-            # Strip HTML from body
-            body_text = re.sub(r"<[^>]+>", " ", body).strip()
-            body_text = re.sub(r"\s+", " ", body_text)
-
-            emails.append({
-                "item_id": item["item_id"],
-                "from_name": from_name,
-                "from_email": sender_email,
-                "subject": subject,
-                "body": body_text[:1000],
-                "created": created,
-            })
+            emails.append(email)
 
             if len(emails) >= MAX_EMAILS_PER_RUN:
                 return emails
@@ -183,6 +234,45 @@ def fetch_unreplied_emails(client, lookback_days=LOOKBACK_DAYS):
     return emails
 
 
+_last_model_call = None
+
+
+def wait_for_model():
+    """Space OpenAI requests MODEL_CALL_INTERVAL apart.
+
+    Only waits when another request went out less than the interval ago, so
+    the first request and work between requests cost no extra time.
+    """
+    global _last_model_call
+    if _last_model_call is not None:
+        wait = _last_model_call + MODEL_CALL_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+    _last_model_call = time.monotonic()
+
+
+def format_email(email):
+    """Format an email for the LLM prompt."""
+    return f"""From: {email['from_name']} <{email['from_email']}>
+Subject: {email['subject']}
+Date: {email['created']}
+
+Body:
+{email['body']}"""
+
+
+def is_valid_result(result):
+    """Check that a parsed LLM result has a usable classification."""
+    if not isinstance(result, dict):
+        return False
+    classification = result.get("classification")
+    if classification not in VALID_CLASSIFICATIONS:
+        return False
+    if classification == "ANSWERABLE" and not result.get("reply_html"):
+        return False
+    return True
+
+
 def classify_and_draft(openai_client, email, website_context):
     """Use OpenAI to classify an email and optionally draft a reply."""
     user_prompt = f"""Website content for reference:
@@ -192,19 +282,15 @@ def classify_and_draft(openai_client, email, website_context):
 
 Incoming email to classify and potentially reply to:
 
-From: {email['from_name']} <{email['from_email']}>
-Subject: {email['subject']}
-Date: {email['created']}
-
-Body:
-{email['body']}
+{format_email(email)}
 
 ---
 
 Classify this email and draft a reply if ANSWERABLE. Respond in JSON format."""
 
+    wait_for_model()
     response = openai_client.chat.completions.create(
-        model="gpt-4o-mini",
+        model=MODEL,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": user_prompt},
@@ -221,6 +307,76 @@ Classify this email and draft a reply if ANSWERABLE. Respond in JSON format."""
         return {"classification": "NEEDS_HUMAN", "confidence": 0, "reason": "Failed to parse LLM response"}
 
 
+def classify_batch(openai_client, emails, website_context):
+    """Classify several emails in a single OpenAI request.
+
+    The website context and system prompt are sent once for the whole group
+    instead of once per email. Any email whose result is missing or malformed
+    falls back to an individual classify_and_draft call.
+
+    Returns:
+        Dict mapping item_id -> result dict
+    """
+    blocks = "\n\n".join(
+        f"=== EMAIL ID {email['item_id']} ===\n{format_email(email)}" for email in emails
+    )
+    user_prompt = f"""Website content for reference:
+{website_context}
+
+---
+
+Incoming emails to classify and potentially reply to:
+
+{blocks}
+
+---
+
+Classify each email and draft a reply for each ANSWERABLE one. Respond in JSON format."""
+
+    parsed = {}
+    try:
+        wait_for_model()
+        response = openai_client.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT + BATCH_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+            max_tokens=500 * len(emails),
+        )
+        data = json.loads(response.choices[0].message.content)
+        for entry in data.get("results", []):
+            if isinstance(entry, dict) and "id" in entry:
+                parsed[str(entry["id"])] = entry
+    except Exception as e:
+        print(f"  Warning: batch request failed ({e}), falling back to single requests")
+
+    results = {}
+    for email in emails:
+        result = parsed.get(str(email["item_id"]))
+        if not is_valid_result(result):
+            print(f"  Batch result missing for {email['item_id']}, retrying individually")
+            result = classify_and_draft(openai_client, email, website_context)
+        results[email["item_id"]] = result
+    return results
+
+
+def classify_all(openai_client, emails, website_context, batch_size):
+    """Classify a list of emails in groups of batch_size.
+
+    Returns:
+        Dict mapping item_id -> result dict
+    """
+    results = {}
+    for start in range(0, len(emails), batch_size):
+        chunk = emails[start:start + batch_size]
+        print(f"Classifying emails {start + 1}-{start + len(chunk)} of {len(emails)}...")
+        results.update(classify_batch(openai_client, chunk, website_context))
+    return results
+
+
 def log_to_podio(client, item_id, classification, reply_html, mode):
     """Log the auto-reply action as a Podio comment."""
     if classification == "NEEDS_HUMAN":
@@ -238,11 +394,81 @@ def log_to_podio(client, item_id, classification, reply_html, mode):
         print(f"  Warning: failed to add comment: {e}")
 
 
+def process_email(podio, email, result, mode, stats, sender=None, journal=None):
+    """Act on a classification result: flag, draft, send or skip.
+
+    In send mode, sender is the SMTPSender shared across the run. The action
+    taken is recorded in the journal, if one is given.
+    """
+    def record(action):
+        if journal:
+            journal.record(email["item_id"], action, email["hash"])
+
+    classification = result.get("classification", "NEEDS_HUMAN")
+    confidence = result.get("confidence", 0)
+    reason = result.get("reason", "")
+    reply_html = result.get("reply_html")
+
+    print(f"  Classification: {classification} (confidence: {confidence})")
+    print(f"  Reason: {reason}")
+
+    if classification == "SKIP":
+        stats["skip"] += 1
+        record("skipped")
+        print(f"  -> Skipping\n")
+        return
+
+    if classification == "NEEDS_HUMAN":
+        stats["needs_human"] += 1
+        if mode != "dry-run":
+            log_to_podio(podio, email["item_id"], classification, None, mode)
+            record("flagged")
+        print(f"  -> Flagged for human reply\n")
+        return
+
+    if classification == "ANSWERABLE" and reply_html:
+        stats["answerable"] += 1
+
+        # Show the draft
+        reply_preview = re.sub(r"<[^>]+>", " ", reply_html).strip()[:200]
+        print(f"  Draft: {reply_preview}...")
+
+        if mode == "send":
+            # Actually send the email
+            success = sender.send(
+                to_email=email["from_email"],
+                subject=email["subject"],
+                body_html=reply_html,
+                reply_to="uimakerlab@illinois.edu",
+            )
+            if success:
+                stats["sent"] += 1
+                print(f"  -> SENT to {email['from_email']}")
+                log_to_podio(podio, email["item_id"], classification, reply_html, mode)
+                record("sent")
+            else:
+                stats["errors"] += 1
+                record("failed")
+                print(f"  -> SEND FAILED")
+        elif mode == "draft":
+            log_to_podio(podio, email["item_id"], classification, reply_html, mode)
+            record("drafted")
+            print(f"  -> Draft saved to Podio comment")
+        else:
+            print(f"  -> Dry run, no action taken")
+
+        print()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Auto-reply to MakerLab emails")
     parser.add_argument("--send", action="store_true", help="Actually send emails (default is draft mode)")
     parser.add_argument("--dry-run", action="store_true", help="Print what would happen, no API writes")
     parser.add_argument("--lookback", type=int, default=LOOKBACK_DAYS, help="Days to look back (default: 7)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Emails per OpenAI request (default: 1, i.e. one request per email)")
+    parser.add_argument("--no-journal", action="store_true",
+                        help="Ignore the processed-item journal and re-check every item's comments")
     args = parser.parse_args()
 
     mode = "dry-run" if args.dry_run else ("send" if args.send else "draft")
@@ -260,73 +486,46 @@ def main():
     website_context = get_website_context()
     print(f"Context: {len(website_context)} chars\n")
 
+    # Items settled on earlier runs are skipped without a comments lookup
+    journal = None if args.no_journal else ProcessedJournal(read_only=mode == "dry-run")
+    if journal:
+        print(f"Journal: {len(journal.entries)} items already processed")
+
     # Fetch unreplied emails
     print("Fetching unreplied emails...")
-    emails = fetch_unreplied_emails(podio, lookback_days=args.lookback)
+    emails = fetch_unreplied_emails(podio, lookback_days=args.lookback, journal=journal)
     print(f"Found {len(emails)} unreplied emails\n")
 
     if not emails:
         print("No unreplied emails. Done!")
         return
 
+    # Batch mode classifies everything up front
+    results = None
+    if args.batch_size > 1:
+        results = classify_all(openai_client, emails, website_context, args.batch_size)
+        print()
+
     # Process each email
     stats = {"answerable": 0, "needs_human": 0, "skip": 0, "sent": 0, "errors": 0}
+    # One SMTP connection for the whole run instead of one per reply
+    sender = SMTPSender() if mode == "send" else None
 
-    for i, email in enumerate(emails, 1):
-        print(f"[{i}/{len(emails)}] {email['from_name']} — {email['subject'][:50]}")
-
-        # Classify with OpenAI
-        result = classify_and_draft(openai_client, email, website_context)
-        classification = result.get("classification", "NEEDS_HUMAN")
-        confidence = result.get("confidence", 0)
-        reason = result.get("reason", "")
-        reply_html = result.get("reply_html")
-
-        print(f"  Classification: {classification} (confidence: {confidence})")
-        print(f"  Reason: {reason}")
-
-        if classification == "SKIP":
-            stats["skip"] += 1
-            print(f"  -> Skipping\n")
-            continue
-
-        if classification == "NEEDS_HUMAN":
-            stats["needs_human"] += 1
-            if mode != "dry-run":
-                log_to_podio(podio, email["item_id"], classification, None, mode)
-            print(f"  -> Flagged for human reply\n")
-            continue
+    try:
+        for i, email in enumerate(emails, 1):
+            print(f"[{i}/{len(emails)}] {email['from_name']} — {email['subject'][:50]}")
 
-        if classification == "ANSWERABLE" and reply_html:
-            stats["answerable"] += 1
-
-            # Show the draft
-            reply_preview = re.sub(r"<[^>]+>", " ", reply_html).strip()[:200]
-            print(f"  Draft: {reply_preview}...")
-
-            if mode == "send":
-                # Actually send the email
-                success = send_email(
-                    to_email=email["from_email"],
-                    subject=email["subject"],
-                    body_html=reply_html,
-                    reply_to="uimakerlab@illinois.edu",
-                )
-                if success:
-                    stats["sent"] += 1
-                    print(f"  -> SENT to {email['from_email']}")
-                    log_to_podio(podio, email["item_id"], classification, reply_html, mode)
-                else:
-                    stats["errors"] += 1
-                    print(f"  -> SEND FAILED")
-            elif mode == "draft":
-                log_to_podio(podio, email["item_id"], classification, reply_html, mode)
-                print(f"  -> Draft saved to Podio comment")
+            if results is not None:
+                result = results[email["item_id"]]
             else:
-                print(f"  -> Dry run, no action taken")
+                # Classify with OpenAI
+                result = classify_and_draft(openai_client, email, website_context)
 
-            print()
-        time.sleep(0.5)
+            process_email(podio, email, result, mode, stats, sender=sender,
+                          journal=journal if mode != "dry-run" else None)
+    finally:
+        if sender:
+            sender.close()
 
     # Summary
     print(f"\n{'=' * 50}")
@@ -339,6 +538,7 @@ def main():
     if mode == "send":
         print(f"Sent: {stats['sent']}")
         print(f"Errors: {stats['errors']}")
+        print(f"SMTP connections: {sender.connections}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,299 @@
+"""
+Record/replay benchmark harness for the auto-reply pipeline.
+
+Records a read-only run of auto_reply_emails.py (Podio responses and model
+responses) to a fixture file, then replays it offline so changes such as
+context trimming, batching or caching can be measured against a fixed corpus
+before touching the live inbox.
+
+Usage:
+    # Record a live run (dry-run semantics: no comments, no emails sent)
+    python bench_auto_reply.py record --lookback 7 --out fixtures/week.json
+
+    # Replay offline and report metrics
+    python bench_auto_reply.py replay fixtures/week.json
+    python bench_auto_reply.py replay fixtures/week.json --batch-size 8
+
+Replay reports end-to-end latency, Podio and model calls per email, prompt
+and completion tokens per email, and classification agreement with the
+recorded run. The lookback window is measured from the recording time and
+the website context is stored in the fixture, so a fixture replays the same
+emails and prompts on any later day, whatever has changed on the site. When a prompt changed since
+recording there is no recorded response for it: the model call returns an
+empty result, is counted as a prompt mismatch, and its prompt tokens are
+estimated from the new prompt length (~4 chars/token). Mismatched emails are
+left out of the agreement figure.
+
+Fixtures contain real email content — they stay in fixtures/ and are
+gitignored with the other *.json output in this directory.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+import auto_reply_emails
+from auto_reply_emails import classify_all, classify_and_draft, fetch_unreplied_emails
+from website_context import get_website_context
+
+CHARS_PER_TOKEN = 4
+
+
+def request_key(method, endpoint, data=None):
+    """Stable key for a Podio request."""
+    return f"{method} {endpoint} {json.dumps(data, sort_keys=True)}"
+
+
+def prompt_key(messages):
+    """Stable hash of the messages sent to the model."""
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class RecordingPodio:
+    """Wraps a PodioClient and records every response."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def get(self, endpoint, params=None):
+        response = self.client.get(endpoint, params=params)
+        self.calls.append({"key": request_key("GET", endpoint, params), "response": response})
+        return response
+
+    def post(self, endpoint, data=None):
+        response = self.client.post(endpoint, data)
+        self.calls.append({"key": request_key("POST", endpoint, data), "response": response})
+        return response
+
+    def get_item(self, item_id):
+        return self.get(f"/item/{item_id}")
+
+
+class ReplayPodio:
+    """Serves recorded Podio responses; counts calls."""
+
+    def __init__(self, calls):
+        self.responses = defaultdict(deque)
+        for call in calls:
+            self.responses[call["key"]].append(call["response"])
+        self.count = 0
+        self.misses = 0
+
+    def _lookup(self, key):
+        self.count += 1
+        recorded = self.responses.get(key)
+        if not recorded:
+            self.misses += 1
+            raise KeyError(f"No recorded Podio response for {key}")
+        # Repeat the last response if the pipeline asks more often than recorded
+        return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    def get(self, endpoint, params=None):
+        return self._lookup(request_key("GET", endpoint, params))
+
+    def post(self, endpoint, data=None):
+        return self._lookup(request_key("POST", endpoint, data))
+
+    def get_item(self, item_id):
+        return self.get(f"/item/{item_id}")
+
+
+class _Completions:
+    def __init__(self, create):
+        self.create = create
+
+
+class RecordingOpenAI:
+    """Wraps an OpenAI client and records every chat completion."""
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, **kwargs):
+        response = self.client.chat.completions.create(**kwargs)
+        usage = response.usage
+        self.calls.append({
+            "key": prompt_key(kwargs["messages"]),
+            "content": response.choices[0].message.content,
+            "prompt_tokens": usage.prompt_tokens if usage else None,
+            "completion_tokens": usage.completion_tokens if usage else None,
+        })
+        return response
+
+
+class ReplayOpenAI:
+    """Serves recorded completions by exact prompt; counts calls and mismatches.
+
+    A prompt that was not recorded gets an empty JSON object back rather
+    than some other email's response.
+    """
+
+    def __init__(self, calls):
+        self.by_key = defaultdict(deque)
+        for call in calls:
+            self.by_key[call["key"]].append(call)
+        self.count = 0
+        self.mismatches = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.chat = SimpleNamespace(completions=_Completions(self._create))
+
+    def _create(self, **kwargs):
+        self.count += 1
+        messages = kwargs["messages"]
+        exact = self.by_key.get(prompt_key(messages))
+        if exact:
+            call = exact.popleft()
+        else:
+            # Prompt changed since recording: no response to replay
+            self.mismatches += 1
+            call = {"content": "{}", "prompt_tokens": None, "completion_tokens": 0}
+
+        prompt_tokens = call["prompt_tokens"]
+        if prompt_tokens is None:
+            prompt_tokens = sum(len(m["content"]) for m in messages) // CHARS_PER_TOKEN
+        completion_tokens = call["completion_tokens"]
+        if completion_tokens is None:
+            completion_tokens = len(call["content"]) // CHARS_PER_TOKEN
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=call["content"]))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        )
+
+
+def run_pipeline(podio, openai_client, lookback_days, batch_size, now, website_context):
+    """Run the fetch + classify stages of auto_reply_emails.py, no writes.
+
+    now is the end of the lookback window; website_context is the site
+    excerpt the prompts are built from.
+
+    Returns:
+        (emails, results) where results maps item_id -> classification result
+    """
+    emails = fetch_unreplied_emails(podio, lookback_days=lookback_days, now=now)
+    if batch_size > 1:
+        results = classify_all(openai_client, emails, website_context, batch_size)
+    else:
+        results = {
+            email["item_id"]: classify_and_draft(openai_client, email, website_context)
+            for email in emails
+        }
+    return emails, results
+
+
+def record(args):
+    """Record a live, read-only run to a fixture file."""
+    from openai import OpenAI
+    from podio_client import get_client
+
+    podio = RecordingPodio(get_client())
+    openai_client = RecordingOpenAI(OpenAI(api_key=os.getenv("OPENAI_API_KEY")))
+
+    now = datetime.now().replace(microsecond=0)
+    website_context = get_website_context()
+    start = time.perf_counter()
+    emails, results = run_pipeline(podio, openai_client, args.lookback, args.batch_size, now, website_context)
+    elapsed = time.perf_counter() - start
+
+    fixture = {
+        "recorded_at": now.isoformat(),
+        "website_context": website_context,
+        "lookback": args.lookback,
+        "batch_size": args.batch_size,
+        "elapsed": elapsed,
+        "podio": podio.calls,
+        "model": openai_client.calls,
+        "classifications": {
+            str(item_id): result.get("classification") for item_id, result in results.items()
+        },
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(fixture, f, indent=2)
+
+    print(f"Recorded {len(emails)} emails, {len(podio.calls)} Podio calls, "
+          f"{len(openai_client.calls)} model calls in {elapsed:.1f}s -> {args.out}")
+
+
+def replay(args):
+    """Replay a fixture offline and print metrics."""
+    with open(args.fixture) as f:
+        fixture = json.load(f)
+
+    podio = ReplayPodio(fixture["podio"])
+    openai_client = ReplayOpenAI(fixture["model"])
+    batch_size = args.batch_size or fixture["batch_size"]
+    website_context = fixture.get("website_context")
+    if website_context is None:
+        # Fixtures recorded before the context was stored: prompts only match
+        # while the site is unchanged since recording
+        print("Note: fixture has no website context; using the live site")
+        website_context = get_website_context()
+
+    # Rate-limit sleeps only make sense against the live APIs
+    with mock.patch.object(auto_reply_emails.time, "sleep"):
+        start = time.perf_counter()
+        emails, results = run_pipeline(podio, openai_client, fixture["lookback"], batch_size,
+                                       datetime.fromisoformat(fixture["recorded_at"]), website_context)
+        elapsed = time.perf_counter() - start
+
+    n = max(len(emails), 1)
+    expected = fixture["classifications"]
+    compared = [
+        item_id for item_id, result in results.items()
+        if str(item_id) in expected and result.get("classification")
+    ]
+    agree = sum(results[item_id].get("classification") == expected[str(item_id)] for item_id in compared)
+
+    print(f"=== Replay: {args.fixture} (batch size {batch_size}) ===")
+    print(f"Emails: {len(emails)}")
+    print(f"End-to-end latency: {elapsed * 1000:.1f} ms (recorded live run: {fixture['elapsed']:.1f} s)")
+    print(f"Podio calls per email: {podio.count / n:.2f}")
+    print(f"Model calls per email: {openai_client.count / n:.2f}")
+    print(f"Prompt tokens per email: {openai_client.prompt_tokens / n:.0f}")
+    print(f"Completion tokens per email: {openai_client.completion_tokens / n:.0f}")
+    if compared:
+        print(f"Classification agreement: {agree}/{len(compared)} ({agree / len(compared):.0%})")
+    if openai_client.mismatches:
+        print(f"Warning: {openai_client.mismatches} prompts differ from the recording "
+              "(no recorded response, prompt tokens estimated; emails left unclassified "
+              "are excluded from agreement)")
+    if podio.misses:
+        print(f"Warning: {podio.misses} Podio requests were not in the recording")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay benchmark for auto_reply_emails.py")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record a live read-only run")
+    rec.add_argument("--lookback", type=int, default=auto_reply_emails.LOOKBACK_DAYS)
+    rec.add_argument("--batch-size", type=int, default=1)
+    rec.add_argument("--out", default="fixtures/auto_reply_run.json")
+
+    rep = sub.add_parser("replay", help="Replay a fixture offline")
+    rep.add_argument("fixture")
+    rep.add_argument("--batch-size", type=int, default=None,
+                     help="Override the recorded batch size")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args)
+    else:
+        replay(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Webhook-driven email triage daemon for the uimakerlab-emails app.
+
+Receives Podio item.create hooks, queues the new item and runs it through the
+same classify/draft pipeline as auto_reply_emails.py within seconds of the
+email arriving. A slow catch-up poll over the last day picks up anything a
+missed hook left behind.
+
+Usage:
+    # Run the receiver (draft mode by default, same flags as auto_reply_emails.py)
+    python email_hook_daemon.py --port 8080
+    python email_hook_daemon.py --port 8080 --send
+
+    # Register the hook on the Emails app (URL must be reachable by Podio)
+    python email_hook_daemon.py --register https://example.org/podio-hook
+
+    # Local hook simulator — POST an item.create event to a running daemon
+    python email_hook_daemon.py --simulate 3211041335 --url http://localhost:8080/
+
+Podio API docs referenced:
+    - Create hook: POST /hook/app/{app_id}/
+    - Request verification: POST /hook/{hook_id}/verify/request
+    - Validate verification: POST /hook/{hook_id}/verify/validate
+    - Hooks are delivered as form-encoded POSTs with type, hook_id and item_id
+
+Environment variables: same as auto_reply_emails.py
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import requests
+from openai import OpenAI
+from dotenv import load_dotenv
+from podio_client import get_client
+from website_context import get_website_context
+from smtp_sender import SMTPSender
+from processed_journal import ProcessedJournal
+from auto_reply_emails import (
+    EMAIL_APP_ID,
+    classify_and_draft,
+    email_from_item,
+    fetch_unreplied_emails,
+    process_email,
+)
+
+load_dotenv()
+
+DEFAULT_PORT = 8080
+CATCH_UP_INTERVAL = 15 * 60  # seconds between catch-up polls
+CATCH_UP_LOOKBACK_DAYS = 1
+
+
+class TriageDaemon:
+    """Work queue of Podio email items, drained by a single worker thread."""
+
+    def __init__(self, podio, openai_client, mode):
+        self.podio = podio
+        self.openai_client = openai_client
+        self.mode = mode
+        self.queue = queue.Queue()
+        self.seen = set()
+        self.lock = threading.Lock()
+        self.website_context = get_website_context()
+        self.sender = SMTPSender() if mode == "send" else None
+        self.journal = ProcessedJournal(read_only=mode == "dry-run")
+        self.stats = {"answerable": 0, "needs_human": 0, "skip": 0, "sent": 0, "errors": 0}
+
+    def enqueue(self, item_id, email=None):
+        """Queue an item unless it has already been queued this session."""
+        with self.lock:
+            if item_id in self.seen:
+                return False
+            self.seen.add(item_id)
+        self.queue.put((item_id, email))
+        return True
+
+    def podio_call(self, fn, *args):
+        """Call the Podio API, re-authenticating once if the token expired."""
+        try:
+            return fn(*args)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 401:
+                raise
+            self.podio.authenticate()
+            return fn(*args)
+
+    def handle(self, item_id, email=None):
+        """Fetch, classify and act on a single email item."""
+        if email is None:
+            item = self.podio_call(self.podio.get_item, item_id)
+            app_id = item.get("app", {}).get("app_id")
+            if app_id and app_id != EMAIL_APP_ID:
+                print(f"Item {item_id} is not in the Emails app, ignoring")
+                return
+            email = self.podio_call(email_from_item, self.podio, item, self.journal)
+            if not email:
+                print(f"Item {item_id} needs no reply")
+                return
+
+        print(f"[{item_id}] {email['from_name']} — {email['subject'][:50]}")
+        result = classify_and_draft(self.openai_client, email, self.website_context)
+        process_email(self.podio, email, result, self.mode, self.stats, sender=self.sender,
+                      journal=self.journal if self.mode != "dry-run" else None)
+
+    def work(self):
+        """Worker loop: drain the queue forever."""
+        while True:
+            item_id, email = self.queue.get()
+            try:
+                self.handle(item_id, email)
+            except Exception as e:
+                print(f"  Error processing item {item_id}: {e}")
+                # Let the next catch-up poll retry it
+                with self.lock:
+                    self.seen.discard(item_id)
+            finally:
+                self.queue.task_done()
+
+    def catch_up(self, interval):
+        """Poll the recent inbox periodically for items a hook missed."""
+        while True:
+            try:
+                emails = self.podio_call(fetch_unreplied_emails, self.podio,
+                                         CATCH_UP_LOOKBACK_DAYS, self.journal)
+                queued = sum(self.enqueue(email["item_id"], email) for email in emails)
+                if queued:
+                    print(f"Catch-up poll queued {queued} emails")
+            except Exception as e:
+                print(f"Catch-up poll failed: {e}")
+            time.sleep(interval)
+
+
+def make_handler(daemon):
+    """Build an HTTP handler class bound to a TriageDaemon."""
+
+    class HookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            fields = parse_qs(self.rfile.read(length).decode("utf-8"))
+            event = {k: v[0] for k, v in fields.items()}
+            hook_type = event.get("type")
+
+            if hook_type == "hook.verify":
+                try:
+                    daemon.podio_call(daemon.podio.post,
+                                      f"/hook/{event['hook_id']}/verify/validate",
+                                      {"code": event["code"]})
+                    print(f"Verified hook {event['hook_id']}")
+                except Exception as e:
+                    print(f"Hook verification failed: {e}")
+            elif hook_type == "item.create" and event.get("item_id"):
+                item_id = int(event["item_id"])
+                if daemon.enqueue(item_id):
+                    print(f"Hook queued item {item_id}")
+
+            # Podio only needs a fast 2xx; work happens on the queue
+            self.send_response(200)
+            self.end_headers()
+
+        def do_GET(self):
+            body = f"ok, {daemon.queue.qsize()} queued\n".encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HookHandler
+
+
+def register_hook(podio, url):
+    """Create an item.create hook on the Emails app and request verification."""
+    hook = podio.post(f"/hook/app/{EMAIL_APP_ID}/", {"url": url, "type": "item.create"})
+    hook_id = hook.get("hook_id")
+    podio.post(f"/hook/{hook_id}/verify/request")
+    print(f"Created hook {hook_id} -> {url}")
+    print("Podio will now send a hook.verify request; the daemon must be running to answer it.")
+
+
+def simulate_hook(url, item_id, hook_id=0):
+    """POST a fake item.create event, the way Podio delivers it."""
+    response = requests.post(url, data={
+        "type": "item.create",
+        "hook_id": hook_id,
+        "item_id": item_id,
+        "item_revision_id": 0,
+    })
+    response.raise_for_status()
+    print(f"Simulated item.create for {item_id}: HTTP {response.status_code}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook-driven MakerLab email triage")
+    parser.add_argument("--send", action="store_true", help="Actually send emails (default is draft mode)")
+    parser.add_argument("--dry-run", action="store_true", help="Print what would happen, no API writes")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Listen port (default: {DEFAULT_PORT})")
+    parser.add_argument("--catch-up", type=int, default=CATCH_UP_INTERVAL,
+                        help="Seconds between catch-up polls, 0 to disable (default: 900)")
+    parser.add_argument("--register", metavar="URL", help="Register the item.create hook and exit")
+    parser.add_argument("--simulate", type=int, metavar="ITEM_ID", help="Send a fake hook to a running daemon and exit")
+    parser.add_argument("--url", default=f"http://localhost:{DEFAULT_PORT}/", help="Daemon URL for --simulate")
+    args = parser.parse_args()
+
+    if args.simulate:
+        simulate_hook(args.url, args.simulate)
+        return
+
+    print("Authenticating with Podio...")
+    podio = get_client()
+
+    if args.register:
+        register_hook(podio, args.register)
+        return
+
+    mode = "dry-run" if args.dry_run else ("send" if args.send else "draft")
+    print(f"=== MakerLab Email Hook Daemon ({mode} mode) ===")
+
+    openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    daemon = TriageDaemon(podio, openai_client, mode)
+
+    threading.Thread(target=daemon.work, daemon=True).start()
+    if args.catch_up > 0:
+        threading.Thread(target=daemon.catch_up, args=(args.catch_up,), daemon=True).start()
+
+    server = ThreadingHTTPServer(("", args.port), make_handler(daemon))
+    print(f"Listening for Podio hooks on port {args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        if daemon.sender:
+            daemon.sender.close()
+        print(f"Stats: {daemon.stats}")
+
+
+if __name__ == "__main__":
+    main()
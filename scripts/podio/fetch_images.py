@@ -1,15 +1,46 @@
 """
 Fetch images from Podio orders for blog posts.
+
+Item and comment lookups for every order run concurrently. Then all image
+attachments download concurrently, deduplicated by Podio file_id. Each
+download is streamed to disk and converted for the web: rotated upright,
+scaled to at most MAX_DIMENSION on the long side, and saved as JPEG (PNG
+when it has transparency), with EXIF (GPS, thumbnails) dropped.
+
+Every stored file is recorded in fetched_files.jsonl (gitignored) as
+file_id -> path. A file_id already recorded, or already on disk under the
+usual <title>_<file_id>.<ext> name, is never downloaded again, even if the
+order title has changed. Delete the journal to re-fetch everything.
+
+HEIC photos need the optional pillow-heif package.
 """
 
-import os
 import json
-import requests
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from podio_client import get_client
+
+import requests
+from PIL import Image, ImageOps
+from podio_client import BASE_URL, get_client
+
+try:
+    from pillow_heif import register_heif_opener
+    register_heif_opener()
+except ImportError:
+    pass
 
 ORDERS_APP_ID = 6976602
 IMAGE_DIR = str(Path(__file__).parent.parent.parent / "images" / "blog")
+INDEX_PATH = Path(__file__).parent / "fetched_files.jsonl"
+
+WORKERS = 8
+MAX_IMAGES_PER_ORDER = 10
+MAX_DIMENSION = 2000  # px, long side; blog content is ~800px wide
+JPEG_QUALITY = 85
 
 # Orders to fetch images for
 BLOG_ORDERS = [
@@ -26,76 +57,155 @@ BLOG_ORDERS = [
 ]
 
 
-def get_files_for_order(client, item_id):
-    """Get all files attached to an order."""
-    item = client.get_item(item_id)
-    files = []
-
-    # Files from fields
-    for field in item.get("fields", []):
-        for val in field.get("values", []):
-            if "file" in val:
-                f = val["file"]
-                files.append({
-                    "file_id": f.get("file_id"),
-                    "name": f.get("name"),
-                    "link": f.get("link"),
-                    "mimetype": f.get("mimetype"),
-                    "size": f.get("size"),
-                })
-
-    # Files from comments
-    comments = client.get(f"/comment/item/{item_id}/")
-    for comment in comments:
-        for f in comment.get("files", []):
-            files.append({
-                "file_id": f.get("file_id"),
-                "name": f.get("name"),
-                "link": f.get("link"),
-                "mimetype": f.get("mimetype"),
-                "size": f.get("size"),
-                "from_comment": True,
-            })
-
-    return item, files
+class FileIndex:
+    """file_id -> stored path, backed by an append-only JSONL file.
 
+    Files already in IMAGE_DIR named <title>_<file_id>.<ext> are picked up
+    too, so downloads from before the index existed are not repeated.
+    """
+
+    def __init__(self, path=INDEX_PATH, image_dir=IMAGE_DIR):
+        self.path = Path(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        for existing in Path(image_dir).glob("*_*.*"):
+            match = re.search(r"_(\d{9,})\.\w+$", existing.name)
+            if match:
+                self.entries[int(match.group(1))] = str(existing)
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Tolerate a torn final line from an interrupted run
+                        continue
+                    self.entries[entry["file_id"]] = entry["path"]
+
+    def get(self, file_id):
+        """Stored path for a file_id, if it is still on disk."""
+        path = self.entries.get(file_id)
+        return path if path and os.path.exists(path) else None
+
+    def record(self, file_id, path, item_id):
+        entry = {
+            "file_id": file_id,
+            "path": path,
+            "item_id": item_id,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries[file_id] = path
+
+
+def file_entry(f, from_comment=False):
+    entry = {
+        "file_id": f.get("file_id"),
+        "name": f.get("name"),
+        "link": f.get("link"),
+        "mimetype": f.get("mimetype"),
+        "size": f.get("size"),
+    }
+    if from_comment:
+        entry["from_comment"] = True
+    return entry
 
-def download_file(client, file_info, order_title, output_dir):
-    """Download a file from Podio."""
-    file_id = file_info.get("file_id")
-    name = file_info.get("name", f"file_{file_id}")
-    mimetype = file_info.get("mimetype", "")
 
-    # Only download images
-    if not mimetype.startswith("image/"):
-        return None
+def get_files_for_orders(client, item_ids, pool):
+    """Fetch every order and its comments concurrently.
+
+    Returns {item_id: (item, files)} or {item_id: exception} on failure.
+    """
+    items = {i: pool.submit(client.get_item, i) for i in item_ids}
+    comments = {i: pool.submit(client.get, f"/comment/item/{i}/") for i in item_ids}
+
+    results = {}
+    for item_id in item_ids:
+        try:
+            item = items[item_id].result()
+            files = []
+            # Files from fields
+            for field in item.get("fields", []):
+                for val in field.get("values", []):
+                    if "file" in val:
+                        files.append(file_entry(val["file"]))
+            # Files from comments
+            for comment in comments[item_id].result():
+                for f in comment.get("files", []):
+                    files.append(file_entry(f, from_comment=True))
+            results[item_id] = (item, files)
+        except Exception as e:
+            results[item_id] = e
+    return results
 
-    # Create safe filename
-    safe_title = "".join(c if c.isalnum() or c in "-_" else "_" for c in order_title)
-    ext = name.split(".")[-1] if "." in name else "jpg"
-    filename = f"{safe_title}_{file_id}.{ext}"
-    filepath = os.path.join(output_dir, filename)
 
-    if os.path.exists(filepath):
-        print(f"    Already exists: {filename}")
-        return filename
+def safe_name(order_title):
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in order_title)
+
+
+_sessions = threading.local()
+
+
+def _session():
+    """One keep-alive session per worker thread."""
+    if not hasattr(_sessions, "session"):
+        _sessions.session = requests.Session()
+    return _sessions.session
+
+
+def web_image(src, dest_stem):
+    """Convert a downloaded file into a web-ready JPEG/PNG and return its path.
+
+    Applies the EXIF rotation, scales to MAX_DIMENSION and drops metadata.
+    """
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        if max(im.size) > MAX_DIMENSION:
+            im.thumbnail((MAX_DIMENSION, MAX_DIMENSION), Image.LANCZOS)
+        has_alpha = im.mode in ("RGBA", "LA", "PA") or "transparency" in im.info
+        if has_alpha:
+            dest = f"{dest_stem}.png"
+            im.convert("RGBA").save(dest, format="PNG", optimize=True)
+        else:
+            dest = f"{dest_stem}.jpg"
+            im.convert("RGB").save(dest, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return dest
+
+
+def download_file(client, file_info, order_title, output_dir):
+    """Download a file from Podio and store a web-ready copy."""
+    file_id = file_info.get("file_id")
+    name = file_info.get("name") or f"file_{file_id}"
+
+    stem = os.path.join(output_dir, f"{safe_name(order_title)}_{file_id}")
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else "jpg"
+    part = f"{stem}.{ext}.part"
 
-    # Download via Podio API
     try:
-        url = f"https://api.podio.com/file/{file_id}/raw"
-        headers = {"Authorization": f"OAuth2 {client.access_token}"}
-        response = requests.get(url, headers=headers, stream=True)
+        response = _session().get(
+            f"{BASE_URL}/file/{file_id}/raw",
+            headers={"Authorization": f"OAuth2 {client.access_token}"},
+            stream=True,
+            timeout=60,
+        )
         response.raise_for_status()
-
-        with open(filepath, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
+        with open(part, "wb") as f:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
                 f.write(chunk)
-
-        print(f"    Downloaded: {filename}")
-        return filename
-    except Exception as e:
-        print(f"    Error downloading {name}: {e}")
-        return None
+        try:
+            return web_image(part, stem)
+        except (OSError, ValueError) as e:
+            print(f"    Can't convert {name} ({e}); keeping the original")
+            os.replace(part, f"{stem}.{ext}")
+            return f"{stem}.{ext}"
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
 
 
 def main():
@@ -103,38 +213,61 @@ def main():
     client = get_client()
 
     os.makedirs(IMAGE_DIR, exist_ok=True)
+    index = FileIndex()
 
     results = {}
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        print(f"Fetching {len(BLOG_ORDERS)} orders...")
+        orders = get_files_for_orders(client, BLOG_ORDERS, pool)
 
-    for item_id in BLOG_ORDERS:
-        print(f"\nFetching order {item_id}...")
-        try:
-            item, files = get_files_for_order(client, item_id)
-            title = item.get("title", str(item_id))
-            print(f"  Title: {title}")
-            print(f"  Found {len(files)} files")
+        downloads = {}  # file_id -> future, shared across orders
+        for item_id in BLOG_ORDERS:
+            found = orders[item_id]
+            if isinstance(found, Exception):
+                print(f"\n{item_id}: Error: {found}")
+                results[item_id] = {"error": str(found)}
+                continue
 
+            item, files = found
+            title = item.get("title", str(item_id))
             # Filter to images only
-            images = [f for f in files if f.get("mimetype", "").startswith("image/")]
-            print(f"  Images: {len(images)}")
+            images = [f for f in files if (f.get("mimetype") or "").startswith("image/")]
+            print(f"\n{title}: {len(files)} files, {len(images)} images")
 
-            downloaded = []
-            for f in images[:10]:  # Limit to 10 images per order
-                filename = download_file(client, f, title, IMAGE_DIR)
-                if filename:
-                    downloaded.append(filename)
+            wanted = []
+            for f in images[:MAX_IMAGES_PER_ORDER]:
+                file_id = f["file_id"]
+                if file_id in wanted:
+                    continue
+                wanted.append(file_id)
+                stored = index.get(file_id)
+                if stored:
+                    print(f"    Already stored: {os.path.basename(stored)}")
+                elif file_id not in downloads:
+                    downloads[file_id] = (item_id, pool.submit(download_file, client, f, title, IMAGE_DIR))
 
             results[item_id] = {
                 "title": title,
                 "created": item.get("created_on", ""),
                 "total_files": len(files),
                 "images_found": len(images),
-                "downloaded": downloaded,
+                "file_ids": wanted,
             }
 
-        except Exception as e:
-            print(f"  Error: {e}")
-            results[item_id] = {"error": str(e)}
+        print(f"\nDownloading {len(downloads)} new images...")
+        for file_id, (item_id, future) in downloads.items():
+            try:
+                path = future.result()
+            except Exception as e:
+                print(f"    Error downloading {file_id}: {e}")
+                continue
+            index.record(file_id, path, item_id)
+            print(f"    Downloaded: {os.path.basename(path)}")
+
+    for info in results.values():
+        if "file_ids" in info:
+            stored = [index.get(file_id) for file_id in info.pop("file_ids")]
+            info["downloaded"] = [os.path.basename(p) for p in stored if p]
 
     # Save results
     with open("blog_images.json", "w") as f:
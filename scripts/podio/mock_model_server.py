@@ -0,0 +1,127 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Answers auto_reply_emails.py's single and batch classification prompts
+with deterministic JSON, so batching, fallbacks and rate limiting can be
+tried without an API key or token costs. Emails are classified by keyword:
+noreply senders and newsletters are SKIP, questions about camps, hours or
+pricing are ANSWERABLE, everything else is NEEDS_HUMAN.
+
+Usage:
+    python mock_model_server.py --port 8793
+    OPENAI_BASE_URL=http://localhost:8793/v1 OPENAI_API_KEY=test \\
+        python auto_reply_emails.py --dry-run --batch-size 8
+
+--drop-batch N leaves the last N emails out of every batch response, to
+exercise the single-request fallback. --delay adds latency per request.
+Each request is logged with the number of emails it carried.
+"""
+
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHARS_PER_TOKEN = 4
+
+SKIP_WORDS = ("noreply", "no-reply", "newsletter", "unsubscribe", "out of office")
+ANSWERABLE_WORDS = ("camp", "hours", "price", "pricing", "cost", "birthday", "3d print")
+
+EMAIL_BLOCK_RE = re.compile(r"=== EMAIL ID (\d+) ===\n(.*?)(?=\n\n=== EMAIL ID |\n\n---|\Z)", re.S)
+
+
+def classify(email_text):
+    """Keyword classification of one formatted email."""
+    text = email_text.lower()
+    if any(word in text for word in SKIP_WORDS):
+        return {"classification": "SKIP", "confidence": 0.9, "reason": "Automated message", "reply_html": None}
+    if any(word in text for word in ANSWERABLE_WORDS):
+        name = re.search(r"From: (\S+)", email_text)
+        first = name.group(1) if name else "there"
+        return {
+            "classification": "ANSWERABLE",
+            "confidence": 0.8,
+            "reason": "Covered by the website",
+            "reply_html": f"<p>Hi {first},</p><p>Thanks for reaching out! (mock reply)</p>",
+        }
+    return {"classification": "NEEDS_HUMAN", "confidence": 0.6, "reason": "Not covered by the website", "reply_html": None}
+
+
+def respond(messages, drop_batch):
+    """Completion content for a request, and how many emails it carried."""
+    prompt = messages[-1]["content"]
+    blocks = EMAIL_BLOCK_RE.findall(prompt)
+    if blocks:
+        kept = blocks[:max(len(blocks) - drop_batch, 0)]
+        results = [{"id": int(item_id), **classify(text)} for item_id, text in kept]
+        return json.dumps({"results": results}), len(blocks)
+    email = prompt.split("Incoming email to classify and potentially reply to:", 1)[-1]
+    return json.dumps(classify(email)), 1
+
+
+def make_handler(drop_batch, delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        requests = 0
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_error(404)
+                return
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            if delay:
+                time.sleep(delay)
+            content, emails = respond(request["messages"], drop_batch)
+
+            Handler.requests += 1
+            print(f"request {Handler.requests}: {emails} email{'s' if emails != 1 else ''}")
+
+            prompt_tokens = sum(len(m["content"]) for m in request["messages"]) // CHARS_PER_TOKEN
+            completion_tokens = len(content) // CHARS_PER_TOKEN
+            body = json.dumps({
+                "id": f"mock-{Handler.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI chat completions endpoint")
+    parser.add_argument("--port", type=int, default=8793)
+    parser.add_argument("--drop-batch", type=int, default=0,
+                        help="Leave this many emails out of each batch response")
+    parser.add_argument("--delay", type=float, default=0, help="Seconds of latency per request")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(args.drop_batch, args.delay))
+    print(f"Mock model endpoint on http://localhost:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -60,7 +60,8 @@ class PodioClient:
             json=data,
         )
         response.raise_for_status()
-        return response.json()
+        # Some endpoints (e.g. hook verification) return 204 No Content
+        return response.json() if response.content else None
 
     # --- Convenience methods ---
 
@@ -0,0 +1,70 @@
+"""
+Append-only journal of Podio email items the auto-reply pipeline has handled.
+
+One JSON line per action, keyed by item_id, with a hash of the email content.
+An item is settled once it has been skipped, flagged, drafted, sent or found
+to already have a reply; settled items with an unchanged hash are skipped at
+fetch time without calling the comments API.
+
+The journal lives next to this script (processed_emails.jsonl, gitignored).
+Delete it to force a full re-check against Podio comments.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+JOURNAL_PATH = Path(__file__).parent / "processed_emails.jsonl"
+
+# Actions after which an unchanged item never needs another look
+SETTLED_ACTIONS = {"skipped", "flagged", "drafted", "sent", "replied"}
+
+
+def content_hash(*parts):
+    """Short stable hash of the email fields that drive classification."""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class ProcessedJournal:
+    """Latest journal entry per item, backed by an append-only JSONL file.
+
+    A read_only journal (dry runs) still skips settled items, but records
+    only in memory, so the next real run sees the file unchanged.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, read_only=False):
+        self.path = Path(path)
+        self.read_only = read_only
+        self.entries = {}
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Tolerate a torn final line from an interrupted run
+                        continue
+                    self.entries[entry["item_id"]] = entry
+
+    def is_settled(self, item_id, digest):
+        """True if the item was already handled and its content is unchanged."""
+        entry = self.entries.get(item_id)
+        return bool(entry) and entry["action"] in SETTLED_ACTIONS and entry["hash"] == digest
+
+    def record(self, item_id, action, digest):
+        """Append an action for an item."""
+        entry = {
+            "item_id": item_id,
+            "action": action,
+            "hash": digest,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if not self.read_only:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(entry) + "\n")
+        self.entries[item_id] = entry
@@ -2,6 +2,13 @@
 Send emails via SendGrid SMTP.
 
 Requires SENDGRID_API_KEY environment variable.
+
+For a whole run, use SMTPSender so every message shares one authenticated
+connection. For local testing, point it at a debugging server instead of
+SendGrid:
+
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_HOST=localhost SMTP_PORT=1025 python auto_reply_emails.py --send
 """
 
 import os
@@ -16,6 +23,10 @@ SENDGRID_SMTP_HOST = "smtp.sendgrid.net"
 SENDGRID_SMTP_PORT = 587
 SENDGRID_USERNAME = "apikey"
 
+# Override to use a local debugging SMTP server (no STARTTLS, no login)
+SMTP_HOST = os.getenv("SMTP_HOST", SENDGRID_SMTP_HOST)
+SMTP_PORT = int(os.getenv("SMTP_PORT", SENDGRID_SMTP_PORT))
+
 FROM_NAME = "Illinois MakerLab"
 FROM_EMAIL = "uimakerlab@illinois.edu"
 
@@ -27,23 +38,8 @@ University of Illinois at Urbana-Champaign<br>
 """
 
 
-def send_email(to_email, subject, body_html, reply_to=None):
-    """Send an email via SendGrid SMTP.
-
-    Args:
-        to_email: Recipient email address
-        subject: Email subject (will be prefixed with Re: if not already)
-        body_html: HTML body of the email
-        reply_to: Optional Reply-To address
-
-    Returns:
-        True if sent successfully, False otherwise
-    """
-    api_key = os.getenv("SENDGRID_API_KEY")
-    if not api_key:
-        raise ValueError("SENDGRID_API_KEY not set")
-
-    # Build the message
+def build_message(to_email, subject, body_html, reply_to=None):
+    """Build the MIME message for a reply, with signature."""
     msg = MIMEMultipart("alternative")
     msg["From"] = f"{FROM_NAME} <{FROM_EMAIL}>"
     msg["To"] = to_email
@@ -54,21 +50,126 @@ def send_email(to_email, subject, body_html, reply_to=None):
     # Add signature to body
     full_html = f"<html><body>{body_html}{SIGNATURE_HTML}</body></html>"
     msg.attach(MIMEText(full_html, "html"))
+    return msg
+
+
+class SMTPSender:
+    """Keeps one authenticated SMTP connection open for a whole run.
 
-    # Send via SendGrid SMTP
-    try:
-        with smtplib.SMTP(SENDGRID_SMTP_HOST, SENDGRID_SMTP_PORT) as server:
+    Reconnects transparently if the server drops the connection. Use as a
+    context manager so the connection is closed at the end:
+
+        with SMTPSender() as sender:
+            sender.send("a@example.com", "Hello", "<p>Hi</p>")
+    """
+
+    def __init__(self, host=None, port=None, api_key=None):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        # A local debugging server speaks plain SMTP without auth
+        self.local = self.host in ("localhost", "127.0.0.1")
+        self.api_key = api_key or os.getenv("SENDGRID_API_KEY")
+        if not self.api_key and not self.local:
+            raise ValueError("SENDGRID_API_KEY not set")
+        self.server = None
+        self.connections = 0
+
+    def connect(self):
+        """Open the connection, run STARTTLS and log in."""
+        self.close()
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        if not self.local:
             server.starttls()
-            server.login(SENDGRID_USERNAME, api_key)
-            server.sendmail(FROM_EMAIL, to_email, msg.as_string())
-        return True
-    except Exception as e:
-        print(f"  SMTP error sending to {to_email}: {e}")
-        return False
+            server.login(SENDGRID_USERNAME, self.api_key)
+        self.server = server
+        self.connections += 1
+
+    def close(self):
+        """Close the connection if open."""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            # quit() only releases the socket when QUIT succeeds
+            self.server.close()
+        self.server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _sendmail(self, to_email, msg):
+        if self.server is None:
+            self.connect()
+        self.server.sendmail(FROM_EMAIL, to_email, msg.as_string())
+
+    def send(self, to_email, subject, body_html, reply_to=None):
+        """Send one email over the shared connection.
+
+        Returns:
+            True if sent successfully, False otherwise
+        """
+        msg = build_message(to_email, subject, body_html, reply_to)
+        try:
+            try:
+                self._sendmail(to_email, msg)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # Connection went stale between messages — close its socket, reconnect once
+                self.close()
+                self._sendmail(to_email, msg)
+            return True
+        except Exception as e:
+            print(f"  SMTP error sending to {to_email}: {e}")
+            self.close()
+            return False
+
+    def send_many(self, messages):
+        """Send several emails over the shared connection.
+
+        Args:
+            messages: List of dicts with to_email, subject, body_html and
+                optional reply_to
+
+        Returns:
+            List of (to_email, success) tuples, in input order
+        """
+        results = []
+        for message in messages:
+            success = self.send(
+                message["to_email"],
+                message["subject"],
+                message["body_html"],
+                reply_to=message.get("reply_to"),
+            )
+            results.append((message["to_email"], success))
+        return results
+
+
+def send_email(to_email, subject, body_html, reply_to=None):
+    """Send a single email via SendGrid SMTP.
+
+    Opens and closes its own connection; prefer SMTPSender when sending
+    more than one message.
+
+    Args:
+        to_email: Recipient email address
+        subject: Email subject (will be prefixed with Re: if not already)
+        body_html: HTML body of the email
+        reply_to: Optional Reply-To address
+
+    Returns:
+        True if sent successfully, False otherwise
+    """
+    with SMTPSender() as sender:
+        return sender.send(to_email, subject, body_html, reply_to=reply_to)
 
 
 if __name__ == "__main__":
     # Test with a dry-run (prints message instead of sending)
     print("SMTP sender module loaded.")
     print(f"From: {FROM_NAME} <{FROM_EMAIL}>")
+    print(f"SMTP server: {SMTP_HOST}:{SMTP_PORT}")
     print(f"SendGrid API key set: {'Yes' if os.getenv('SENDGRID_API_KEY') else 'No'}")
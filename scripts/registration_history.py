@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Append-only history of per-session registration counts.
+
+update_availability.py appends one record per FormBuilder poll. A record is
+one text line holding the seconds since the previous record and only the
+sessions whose count moved:
+
+    60 minecraft:0+1 genai:1-1
+    60
+
+A poll where nothing moved costs a few bytes. Records go to an active
+segment (current.log) that is opened in append mode. When it grows past
+ROLL_BYTES it is gzipped into a numbered, read-only segment. Each segment
+starts with an absolute "@<epoch>" line, so segments decode on their own.
+A season of minute-by-minute polls fits in well under a megabyte.
+
+Usage (print fill curves):
+    python3 scripts/registration_history.py                 # summary of every session
+    python3 scripts/registration_history.py minecraft       # curves for one camp
+    python3 scripts/registration_history.py minecraft 0     # one session
+"""
+
+from __future__ import annotations
+
+import gzip
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+HISTORY_DIR = ROOT / "data" / "registration-history"
+ACTIVE_NAME = "current.log"
+ROLL_BYTES = 256 * 1024
+
+
+def encode_record(dt: int, deltas: dict[tuple[str, int], int]) -> str:
+    parts = [str(dt)]
+    parts.extend(f"{cid}:{idx}{delta:+d}" for (cid, idx), delta in sorted(deltas.items()))
+    return " ".join(parts)
+
+
+def decode_deltas(fields: list[str]) -> dict[tuple[str, int], int]:
+    deltas = {}
+    for field in fields:
+        cid, rest = field.rsplit(":", 1)
+        sign = max(rest.find("+"), rest.find("-"))
+        deltas[(cid, int(rest[:sign]))] = int(rest[sign:])
+    return deltas
+
+
+class RegistrationHistory:
+    """Delta-encoded, segment-compressed time series of session counts."""
+
+    def __init__(self, path: Path = HISTORY_DIR, roll_bytes: int = ROLL_BYTES):
+        self.path = Path(path)
+        self.roll_bytes = roll_bytes
+        self.counts: dict[tuple[str, int], int] = {}
+        self.first_time: int | None = None
+        self.last_time: int | None = None
+        # Polls where something moved, kept in memory for curve queries
+        self.changes: list[tuple[int, dict[tuple[str, int], int]]] = []
+        for t, deltas in self.records():
+            if self.first_time is None:
+                self.first_time = t
+            self.last_time = t
+            if deltas:
+                self.changes.append((t, deltas))
+            for key, delta in deltas.items():
+                self.counts[key] = self.counts.get(key, 0) + delta
+
+    @property
+    def active(self) -> Path:
+        return self.path / ACTIVE_NAME
+
+    def segments(self) -> list[Path]:
+        """Sealed segments, oldest first."""
+        return sorted(self.path.glob("*.log.gz"))
+
+    def _segment_lines(self) -> Iterator[str]:
+        for segment in self.segments():
+            with gzip.open(segment, "rt") as f:
+                yield from f
+        if self.active.exists():
+            with open(self.active) as f:
+                yield from f
+
+    def records(self) -> Iterator[tuple[int, dict[tuple[str, int], int]]]:
+        """Yield (epoch seconds, {(camp ID, session index): delta}) per poll."""
+        t = 0
+        for line in self._segment_lines():
+            fields = line.split()
+            if not fields:
+                continue
+            if fields[0].startswith("@"):
+                t = int(fields[0][1:])
+                continue
+            t += int(fields[0])
+            yield t, decode_deltas(fields[1:])
+
+    def append(self, counts: dict[str, list[int]], at: float | None = None) -> dict[tuple[str, int], int]:
+        """Record a poll of {camp ID: [count per session]}; return what moved."""
+        now = int(at if at is not None else time.time())
+        deltas = {}
+        for cid, session_counts in counts.items():
+            for idx, count in enumerate(session_counts):
+                delta = count - self.counts.get((cid, idx), 0)
+                if delta:
+                    deltas[(cid, idx)] = delta
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        lines = []
+        if self.last_time is None or not self.active.exists() or self.active.stat().st_size == 0:
+            # New segment: anchor it to an absolute time
+            lines.append(f"@{now}")
+            self.last_time = now
+            if self.first_time is None:
+                self.first_time = now
+        dt = max(now - self.last_time, 0)
+        lines.append(encode_record(dt, deltas))
+        with open(self.active, "a") as f:
+            f.write("\n".join(lines) + "\n")
+
+        self.last_time += dt
+        if deltas:
+            self.changes.append((self.last_time, deltas))
+        for key, delta in deltas.items():
+            self.counts[key] = self.counts.get(key, 0) + delta
+
+        if self.active.stat().st_size >= self.roll_bytes:
+            self.roll()
+        return deltas
+
+    def roll(self) -> Path | None:
+        """Compress the active segment into the next sealed segment."""
+        if not self.active.exists() or self.active.stat().st_size == 0:
+            return None
+        existing = self.segments()
+        number = int(existing[-1].name.split(".")[0]) + 1 if existing else 1
+        sealed = self.path / f"{number:06d}.log.gz"
+        with open(self.active, "rb") as src, gzip.open(sealed, "wb") as dst:
+            dst.write(src.read())
+        self.active.unlink()
+        return sealed
+
+    def fill_curves(self, camp_id: str | None = None) -> dict[tuple[str, int], list[tuple[int, int]]]:
+        """Map (camp ID, session index) → [(epoch seconds, count)] at every change.
+
+        Each curve ends with a point at the latest poll, so a flat tail is
+        visible.
+        """
+        curves: dict[tuple[str, int], list[tuple[int, int]]] = {}
+        counts: dict[tuple[str, int], int] = {}
+        last = self.last_time
+        for t, deltas in self.changes:
+            for key, delta in deltas.items():
+                if camp_id is not None and key[0] != camp_id:
+                    continue
+                counts[key] = counts.get(key, 0) + delta
+                curves.setdefault(key, []).append((t, counts[key]))
+        for key, curve in curves.items():
+            if last is not None and curve[-1][0] != last:
+                curve.append((last, curve[-1][1]))
+        return curves
+
+    def fill_curve(self, camp_id: str, session: int) -> list[tuple[int, int]]:
+        """[(epoch seconds, count)] for one session."""
+        return self.fill_curves(camp_id).get((camp_id, session), [])
+
+    def size(self) -> int:
+        """Bytes on disk across all segments."""
+        files = self.segments() + ([self.active] if self.active.exists() else [])
+        return sum(f.stat().st_size for f in files)
+
+
+def main() -> None:
+    history = RegistrationHistory()
+    camp_id = sys.argv[1] if len(sys.argv) > 1 else None
+    session = int(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    polls = sum(1 for _ in history.records())
+    print(f"{polls} polls, {len(history.segments())} sealed segments, {history.size():,} bytes")
+
+    for (cid, idx), curve in sorted(history.fill_curves(camp_id).items()):
+        if session is not None and idx != session:
+            continue
+        start = datetime.fromtimestamp(curve[0][0]).strftime("%Y-%m-%d %H:%M")
+        print(f"{cid} session {idx}: {curve[-1][1]} (first seen {start}, {len(curve)} points)")
+        if session is not None:
+            for t, count in curve:
+                print(f"  {datetime.fromtimestamp(t).isoformat(timespec='minutes')}  {count}")
+
+
+if __name__ == "__main__":
+    main()
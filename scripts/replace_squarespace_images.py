@@ -1,81 +1,30 @@
 #!/usr/bin/env python3
 """
 Replace all Squarespace CDN image URLs with local GitHub paths
+
+URLs are looked up in the shared CDN map (cdn_image_map.py), which ignores
+query strings, format= variants, encoding and case, and remembers what it
+resolved for the next run.
 """
-import re
-import os
 from pathlib import Path
-from urllib.parse import unquote
-
-def get_local_image_map():
-    """Build a map of filename -> local path"""
-    image_map = {}
-    for category in ['general', 'summer', 'blog', 'events', 'staff']:
-        dir_path = Path(f'images/{category}')
-        if dir_path.exists():
-            for img_file in dir_path.iterdir():
-                if img_file.is_file():
-                    # Store both original and lowercase versions
-                    filename = img_file.name
-                    image_map[filename.lower()] = f'images/{category}/{filename}'
-                    image_map[filename] = f'images/{category}/{filename}'
-    return image_map
 
-def extract_filename_from_url(url):
-    """Extract filename from Squarespace URL"""
-    # Remove query parameters
-    url = url.split('?')[0]
-    # Get the last part after the last /
-    filename = url.split('/')[-1]
-    # URL decode
-    filename = unquote(filename)
-    return filename
+from cdn_image_map import CdnImageMap
+from download_squarespace_images import categorize_image
 
-def replace_images_in_file(file_path, image_map):
+def replace_images_in_file(file_path, cdn_map):
     """Replace Squarespace URLs with local paths in a file"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        
-        original_content = content
-        replacements = 0
-        
-        # Find all Squarespace CDN URLs (both http and https)
-        # Match URLs in src, href, and other attributes
-        patterns = [
-            r'https://images\.squarespace-cdn\.com[^\s"\'<>\)]+',
-            r'http://images\.squarespace-cdn\.com[^\s"\'<>\)]+',
-        ]
-        
-        all_urls = set()
-        for pattern in patterns:
-            urls = re.findall(pattern, content)
-            all_urls.update(urls)
-        
-        # Sort by length (longest first) to avoid partial replacements
-        for url in sorted(all_urls, key=len, reverse=True):
-            filename = extract_filename_from_url(url)
-            local_path = None
-            
-            # Try exact match first
-            if filename in image_map:
-                local_path = image_map[filename]
-            # Try lowercase match
-            elif filename.lower() in image_map:
-                local_path = image_map[filename.lower()]
-            
-            if local_path:
-                # Replace all occurrences of this URL
-                count = content.count(url)
-                content = content.replace(url, local_path)
-                replacements += count
-        
-        if content != original_content:
+
+        # Prefer the copy in the folder this page's images were downloaded to
+        prefer = categorize_image(file_path, '')
+        content, replacements = cdn_map.replace(content, prefer=prefer)
+
+        if replacements:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
-            return replacements
-        
-        return 0
+        return replacements
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return 0
@@ -86,15 +35,13 @@ def main():
     # Allow targeting specific directory (e.g., blog/)
     target_dir = sys.argv[1] if len(sys.argv) > 1 else '.'
     
-    print("Building local image map...")
-    image_map = get_local_image_map()
-    print(f"Found {len(image_map)} local images")
+    print("Loading CDN image map...")
+    cdn_map = CdnImageMap()
+    print(f"Found {len(cdn_map.urls)} known CDN URLs")
     
     print(f"\nScanning HTML files for Squarespace URLs in {target_dir}...")
-    if target_dir == '.':
-        html_files = list(Path('.').rglob('*.html'))
-    else:
-        html_files = list(Path(target_dir).rglob('*.html'))
+    target = Path(target_dir)
+    html_files = [target] if target.is_file() else list(target.rglob('*.html'))
     
     total_replacements = 0
     files_updated = 0
@@ -103,14 +50,14 @@ def main():
         if '.git' in str(file_path) or 'node_modules' in str(file_path):
             continue
         
-        replacements = replace_images_in_file(file_path, image_map)
+        replacements = replace_images_in_file(file_path, cdn_map)
         if replacements > 0:
             files_updated += 1
             total_replacements += replacements
             print(f"  {file_path}: {replacements} replacements")
     
+    cdn_map.save()
     print(f"\nDone! Updated {files_updated} files with {total_replacements} total replacements")
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Rewrite <img> tags into responsive <picture> elements at build time.
+
+For every page in the site root, blog/, summer/ and courses/, each
+<img src="images/..."> whose original is in images/manifest.json (built by
+image_pipeline.py) becomes:
+
+    <picture data-variants>
+      <source type="image/avif" srcset="…-320.avif 320w, …" sizes="…">
+      <source type="image/webp" srcset="…-320.webp 320w, …" sizes="…">
+      <img src="images/blog/foo.jpg" width="1500" height="1000" loading="lazy" decoding="async" …>
+    </picture>
+
+The original src stays as the fallback, and the tag keeps its other
+attributes. Intrinsic width/height, taken from images/metadata.json
+(image_metadata.py) when present and from the variant manifest otherwise, let the browser reserve space before the
+image arrives, and the manifest's placeholder (average colour plus a tiny
+WebP) is inlined as the <img> background so the space shows the picture's
+rough shape and colours meanwhile. The first image on a page gets fetchpriority="high" and
+loads eagerly. Every later one gets loading="lazy" and decoding="async" in
+the HTML, so the preload scanner sees them without waiting for js/main.js.
+Attributes already present are left alone, and rewritten tags are skipped
+on later runs.
+
+Images with metadata but no variants still get width/height and the
+loading attributes, just no <picture>.
+
+Run after image_metadata.py and image_pipeline.py. The deploy workflow runs them on the checkout
+it uploads, so committed pages keep plain <img> tags.
+
+Usage:
+    python3 scripts/rewrite_images.py            # rewrite in place
+    python3 scripts/rewrite_images.py --dry-run  # count what would change
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import urllib.parse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MANIFEST_PATH = ROOT / "images" / "manifest.json"
+METADATA_PATH = ROOT / "images" / "metadata.json"
+PAGE_GLOBS = ["*.html", "blog/**/*.html", "summer/**/*.html", "courses/**/*.html"]
+
+# Content column is ~800px wide; full width below that
+DEFAULT_SIZES = "(max-width: 800px) 100vw, 800px"
+SOURCE_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+IMG_RE = re.compile(r"<img\b[^>]*>", re.I)
+ATTR_RE = re.compile(r'([\w:-]+)\s*=\s*("[^"]*"|\'[^\']*\')')
+PICTURE_RE = re.compile(r"<picture data-variants>.*?</picture>", re.S)
+FETCHPRIORITY_RE = re.compile(r"<img\b[^>]*\bfetchpriority\s*=", re.I)
+
+
+def load_manifest() -> dict:
+    if not MANIFEST_PATH.exists():
+        raise SystemExit("No images/manifest.json — run scripts/image_pipeline.py first")
+    return json.loads(MANIFEST_PATH.read_text())
+
+
+def load_metadata() -> dict:
+    """Sizes from image_metadata.py, or {} to fall back on the variant manifest."""
+    return json.loads(METADATA_PATH.read_text()) if METADATA_PATH.exists() else {}
+
+
+def find_pages() -> list[Path]:
+    pages = set()
+    for pattern in PAGE_GLOBS:
+        pages.update(ROOT.glob(pattern))
+    return sorted(pages)
+
+
+def img_attrs(tag: str) -> dict[str, str]:
+    return {name.lower(): value[1:-1] for name, value in ATTR_RE.findall(tag)}
+
+
+def resolve_src(page: Path, src: str) -> str | None:
+    """Repo-relative path of a local image src, or None for remote/data URLs."""
+    if re.match(r"^(?:[a-z]+:|//|#)", src, re.I):
+        return None
+    path = urllib.parse.unquote(src.split("?")[0].split("#")[0])
+    target = (ROOT / path.lstrip("/")) if path.startswith("/") else (page.parent / path)
+    try:
+        return target.resolve().relative_to(ROOT).as_posix()
+    except ValueError:
+        return None
+
+
+def page_url(page: Path, repo_path: str) -> str:
+    """URL for a repo path as seen from a page, encoded for use in srcset."""
+    rel = os.path.relpath(ROOT / repo_path, page.parent)
+    return urllib.parse.quote(Path(rel).as_posix())
+
+
+def add_attrs(tag: str, extra: dict[str, str]) -> str:
+    """Insert attributes before the tag's closing bracket."""
+    if not extra:
+        return tag
+    insert = "".join(f' {name}="{value}"' for name, value in extra.items())
+    end = -2 if tag.endswith("/>") else -1
+    return tag[:end].rstrip() + insert + (" />" if end == -2 else ">")
+
+
+def placeholder_css(entry: dict) -> str | None:
+    preview = entry.get("placeholder")
+    if not preview:
+        return None
+    if "lqip" in preview:
+        return f"background:{preview['color']} url({preview['lqip']}) center/cover no-repeat"
+    return f"background:{preview['color']}"
+
+
+def add_style(tag: str, css: str) -> str:
+    """Append declarations to the tag's style attribute, adding one if needed."""
+    match = re.search(r'\bstyle\s*=\s*("([^"]*)"|\'([^\']*)\')', tag, re.I)
+    if not match:
+        return add_attrs(tag, {"style": css})
+    quote = match.group(1)[0]
+    existing = (match.group(2) if quote == '"' else match.group(3)).strip().rstrip(";")
+    value = f"{existing};{css}" if existing else css
+    return tag[:match.start()] + f"style={quote}{value}{quote}" + tag[match.end():]
+
+
+def picture_html(page: Path, tag: str, entry: dict | None, size: dict, first: bool) -> str:
+    """The rewritten tag: entry is the variant manifest entry (None if the
+    image has no variants), size the metadata (or entry) width/height."""
+    attrs = img_attrs(tag)
+    extra = {}
+    if "width" not in attrs and "height" not in attrs:
+        extra["width"] = str(size["width"])
+        extra["height"] = str(size["height"])
+    if first or "fetchpriority" in attrs:
+        if "loading" not in attrs:
+            extra["loading"] = "eager"
+        if "fetchpriority" not in attrs:
+            extra["fetchpriority"] = "high"
+    else:
+        if "loading" not in attrs:
+            extra["loading"] = "lazy"
+        if "decoding" not in attrs:
+            extra["decoding"] = "async"
+
+    if entry is None:
+        return add_attrs(tag, extra)
+
+    css = placeholder_css(entry)
+    if css and "background" not in attrs.get("style", ""):
+        tag = add_style(tag, css)
+
+    sizes = f'{attrs["width"]}px' if attrs.get("width", "").isdigit() else DEFAULT_SIZES
+    sources = []
+    for fmt, mime in SOURCE_TYPES.items():
+        variants = sorted((v for v in entry["variants"] if v["format"] == fmt), key=lambda v: v["width"])
+        if not variants:
+            continue
+        srcset = ", ".join(f'{page_url(page, v["path"])} {v["width"]}w' for v in variants)
+        sources.append(f'<source type="{mime}" srcset="{srcset}" sizes="{sizes}">')
+    if not sources:
+        return add_attrs(tag, extra)
+    return "<picture data-variants>" + "".join(sources) + add_attrs(tag, extra) + "</picture>"
+
+
+def rewrite_page(page: Path, manifest: dict, metadata: dict | None = None) -> tuple[str, int]:
+    """Return the rewritten page and how many images changed."""
+    content = page.read_text(encoding="utf-8")
+    done = [m.span() for m in PICTURE_RE.finditer(content)]
+    # A page rewritten before already has its fetchpriority image
+    first = not FETCHPRIORITY_RE.search(content)
+    changed = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal first, changed
+        if any(start <= match.start() < end for start, end in done):
+            return match.group(0)
+        src = img_attrs(match.group(0)).get("src")
+        key = resolve_src(page, src) if src else None
+        entry = manifest.get(key) if key else None
+        size = (metadata or {}).get(key) or entry
+        if size is None:
+            return match.group(0)
+        html = picture_html(page, match.group(0), entry, size, first)
+        first = False
+        if html != match.group(0):
+            changed += 1
+        return html
+
+    return IMG_RE.sub(replace, content), changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rewrite <img> tags into responsive <picture> elements")
+    parser.add_argument("--dry-run", action="store_true", help="Report counts without writing")
+    args = parser.parse_args()
+
+    manifest = load_manifest()
+    metadata = load_metadata()
+    pages = images = 0
+    for page in find_pages():
+        updated, changed = rewrite_page(page, manifest, metadata)
+        if not changed:
+            continue
+        pages += 1
+        images += changed
+        if not args.dry_run:
+            page.write_text(updated, encoding="utf-8")
+    verb = "Would rewrite" if args.dry_run else "Rewrote"
+    print(f"{verb} {images} images on {pages} pages")
+
+
+if __name__ == "__main__":
+    main()
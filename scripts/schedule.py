@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Schedule checks for camps, workshops and private events.
+
+Session labels from the canonical data ("Jun 1–5", "9:00 AM – 12:00 PM") are
+parsed into real datetime intervals, one per meeting day. Each resource (the
+lab room, an instructor, a robot kit) gets its own interval tree. Any two
+bookings that share a resource and overlap in time, even partially, are a
+conflict. Capacity rules cover per-booking limits, such as robot camps
+against robot_max_capacity, and per-resource limits on concurrent attendees.
+
+A booking is a dict:
+
+    {"name": "Minecraft + 3D Printing — Jun 1–5", "start": datetime, "end": datetime,
+     "resources": ["lab", "P1"], "attendees": 8}
+
+Camps in the canonical data become one booking per day. Unless a camp or
+session lists its own "resources", camps default to the shared "lab", which
+keeps the old rule that no two camps can run at once. Other sources
+(workshops, private events, other years) can add bookings to the same
+Schedule.
+
+Usage:
+    python3 scripts/schedule.py      # check data/summer-camps-2026.json
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Iterable, Iterator
+
+ROOT = Path(__file__).resolve().parent.parent
+DATA_PATH = ROOT / "data" / "summer-camps-2026.json"
+
+DEFAULT_CAMP_RESOURCES = ["lab"]
+# Camps held to data["robot_max_capacity"]
+ROBOT_CAMPS = {"robot-arm", "reachy"}
+
+MONTHS = {m: i for i, m in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1)}
+DASH = r"\s*[–—-]\s*"
+
+
+def parse_date_range(dates: str, year: int) -> tuple[date, date]:
+    """Parse "Jun 1–5" or "Jun 29 – Jul 3" into (first day, last day), inclusive."""
+    match = re.fullmatch(rf"([A-Z][a-z]{{2}})\s+(\d+)(?:{DASH}(?:([A-Z][a-z]{{2}})\s+)?(\d+))?", dates.strip())
+    if not match:
+        raise ValueError(f"Unrecognized session dates: {dates!r}")
+    start_month, start_day, end_month, end_day = match.groups()
+    start = date(year, MONTHS[start_month], int(start_day))
+    end = date(year, MONTHS[end_month or start_month], int(end_day or start_day))
+    if end < start:
+        raise ValueError(f"Session dates run backwards: {dates!r}")
+    return start, end
+
+
+def parse_clock(text: str) -> time:
+    """Parse "9:00 AM" into time(9, 0)."""
+    return datetime.strptime(text.strip(), "%I:%M %p").time()
+
+
+def parse_time_range(times: str) -> tuple[time, time]:
+    """Parse "9:00 AM – 12:00 PM" into (time(9, 0), time(12, 0))."""
+    parts = re.split(DASH, times.strip())
+    if len(parts) != 2:
+        raise ValueError(f"Unrecognized session time: {times!r}")
+    start, end = parse_clock(parts[0]), parse_clock(parts[1])
+    if end <= start:
+        raise ValueError(f"Session time runs backwards: {times!r}")
+    return start, end
+
+
+def session_days(dates: str, times: str, year: int) -> Iterator[tuple[datetime, datetime]]:
+    """Yield (start, end) for each meeting day of a session."""
+    first, last = parse_date_range(dates, year)
+    start_time, end_time = parse_time_range(times)
+    day = first
+    while day <= last:
+        yield datetime.combine(day, start_time), datetime.combine(day, end_time)
+        day += timedelta(days=1)
+
+
+class IntervalTree:
+    """Static interval tree over half-open [start, end) intervals.
+
+    Built balanced from the intervals sorted by start. Each node records the
+    largest end in its subtree, so a query skips any subtree that ends before
+    the query starts. Queries cost O(log n + matches).
+    """
+
+    def __init__(self, items: Iterable[tuple]):
+        # items are (start, end, payload)
+        self.items = sorted(items, key=lambda item: item[0])
+        self.max_end: list = [None] * len(self.items)
+        self._build(0, len(self.items))
+
+    def _build(self, lo: int, hi: int):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        ends = [self.items[mid][1]]
+        for child in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child is not None:
+                ends.append(child)
+        self.max_end[mid] = max(ends)
+        return self.max_end[mid]
+
+    def overlapping(self, start, end) -> list[tuple]:
+        """Items whose interval overlaps [start, end)."""
+        found = []
+        stack = [(0, len(self.items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_end[mid] <= start:
+                continue  # nothing in this subtree reaches the query
+            item = self.items[mid]
+            stack.append((lo, mid))
+            if item[0] < end:
+                if start < item[1]:
+                    found.append(item)
+                stack.append((mid + 1, hi))
+        return found
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class Schedule:
+    """Bookings indexed per resource for overlap and capacity checks."""
+
+    def __init__(self, bookings: Iterable[dict] = (), capacities: dict[str, int] | None = None):
+        self.bookings: list[dict] = []
+        # Max concurrent attendees per resource (e.g. {"lab": 16})
+        self.capacities = dict(capacities or {})
+        self._trees: dict[str, IntervalTree] | None = None
+        for booking in bookings:
+            self.add(booking)
+
+    def add(self, booking: dict) -> None:
+        if booking["end"] <= booking["start"]:
+            raise ValueError(f"Booking ends before it starts: {booking['name']}")
+        self.bookings.append(booking)
+        self._trees = None
+
+    def trees(self) -> dict[str, IntervalTree]:
+        """Interval tree per resource, rebuilt lazily after adds."""
+        if self._trees is None:
+            by_resource: dict[str, list[tuple]] = {}
+            for n, b in enumerate(self.bookings):
+                for resource in b["resources"]:
+                    by_resource.setdefault(resource, []).append((b["start"], b["end"], n))
+            self._trees = {r: IntervalTree(items) for r, items in by_resource.items()}
+        return self._trees
+
+    def overlapping(self, start: datetime, end: datetime, resource: str | None = None) -> list[dict]:
+        """Bookings overlapping [start, end), on one resource or any."""
+        trees = self.trees()
+        names = [resource] if resource is not None else list(trees)
+        hits = {n for r in names if r in trees for _, _, n in trees[r].overlapping(start, end)}
+        return [self.bookings[n] for n in sorted(hits)]
+
+    def conflicts(self) -> dict[tuple[str, str, str], list[date]]:
+        """Map (resource, booking name, booking name) → days they overlap."""
+        found: dict[tuple[str, str, str], list[date]] = {}
+        for resource, tree in self.trees().items():
+            for start, end, n in tree.items:
+                for _, _, m in tree.overlapping(start, end):
+                    if m <= n:
+                        continue
+                    a, b = sorted((self.bookings[n]["name"], self.bookings[m]["name"]))
+                    if a == b:
+                        continue
+                    days = found.setdefault((resource, a, b), [])
+                    if start.date() not in days:
+                        days.append(start.date())
+        return found
+
+    def capacity_violations(self) -> list[str]:
+        """Resources whose concurrent attendees exceed their capacity."""
+        problems = []
+        trees = self.trees()
+        for resource, capacity in sorted(self.capacities.items()):
+            if resource not in trees:
+                continue
+            reported = set()
+            for start, end, n in trees[resource].items:
+                overlapping = trees[resource].overlapping(start, end)
+                # Peak load is reached at some booking's start
+                load = sum(self.bookings[m]["attendees"] for s, e, m in overlapping if s <= start < e)
+                names = tuple(sorted({self.bookings[m]["name"] for s, e, m in overlapping if s <= start < e}))
+                if load > capacity and names not in reported:
+                    reported.add(names)
+                    problems.append(
+                        f"{resource} over capacity ({load} > {capacity}) on {start:%b %d %H:%M}: {', '.join(names)}"
+                    )
+        return problems
+
+
+def camp_bookings(data: dict) -> list[dict]:
+    """One booking per camp session meeting day from canonical summer data."""
+    bookings = []
+    for camp in data["camps"]:
+        for s in camp["sessions"]:
+            resources = s.get("resources") or camp.get("resources") or DEFAULT_CAMP_RESOURCES
+            for start, end in session_days(s["dates"], s["time"], data["year"]):
+                bookings.append({
+                    "name": f"{camp['name']} — {s['dates']} | {s['time']}",
+                    "camp": camp["id"],
+                    "start": start,
+                    "end": end,
+                    "resources": resources,
+                    "attendees": camp["max_campers"],
+                })
+    return bookings
+
+
+def check_camp_data(data: dict) -> list[str]:
+    """Every schedule and capacity problem in canonical summer data."""
+    problems = []
+    robot_cap = data.get("robot_max_capacity")
+    if robot_cap is not None:
+        for camp in data["camps"]:
+            if camp["id"] in ROBOT_CAMPS and camp["max_campers"] > robot_cap:
+                problems.append(
+                    f"{camp['name']} allows {camp['max_campers']} campers, above robot_max_capacity {robot_cap}"
+                )
+
+    schedule = Schedule(camp_bookings(data), data.get("resource_capacities"))
+    for (resource, a, b), days in sorted(schedule.conflicts().items()):
+        problems.append(f"{resource}: {a} overlaps {b} ({len(days)} day{'s' if len(days) != 1 else ''})")
+    problems.extend(schedule.capacity_violations())
+    return problems
+
+
+def main() -> None:
+    data = json.loads(DATA_PATH.read_text())
+    problems = check_camp_data(data)
+    if problems:
+        print("Schedule problems:")
+        for p in problems:
+            print(f"- {p}")
+        raise SystemExit(1)
+    print(f"No schedule conflicts in {DATA_PATH.relative_to(ROOT)}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Marker-delimited regions for generated content in site pages.
+
+Pages mark every block a sync script owns with a pair of HTML comments:
+
+    <!-- sync:camp=minecraft:sessions -->...generated...<!-- /sync -->
+
+find_regions() locates every region in one linear scan and splice() swaps in
+new content in a single pass, so updating a page costs O(file size) no matter
+how many camps or regions it has. A region named in an update but missing
+from the page is an error rather than a silent no-op.
+
+Usage (list the regions in a page):
+    python3 scripts/sync_regions.py summer.html
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+OPEN_PREFIX = "<!-- sync:"
+OPEN_SUFFIX = " -->"
+CLOSE = "<!-- /sync -->"
+
+
+def open_marker(name: str) -> str:
+    return f"{OPEN_PREFIX}{name}{OPEN_SUFFIX}"
+
+
+def find_regions(content: str) -> dict[str, tuple[int, int]]:
+    """Map region name → (start, end) offsets of the content between markers."""
+    regions: dict[str, tuple[int, int]] = {}
+    pos = 0
+    while True:
+        start = content.find(OPEN_PREFIX, pos)
+        if start == -1:
+            return regions
+        name_end = content.find(OPEN_SUFFIX, start + len(OPEN_PREFIX))
+        if name_end == -1:
+            raise ValueError(f"Unterminated sync marker at offset {start}")
+        name = content[start + len(OPEN_PREFIX):name_end]
+        inner_start = name_end + len(OPEN_SUFFIX)
+        inner_end = content.find(CLOSE, inner_start)
+        if inner_end == -1:
+            raise ValueError(f"Sync region {name!r} has no closing marker")
+        nested = content.find(OPEN_PREFIX, inner_start, inner_end)
+        if nested != -1:
+            raise ValueError(f"Sync region {name!r} contains a nested region")
+        if name in regions:
+            raise ValueError(f"Duplicate sync region {name!r}")
+        regions[name] = (inner_start, inner_end)
+        pos = inner_end + len(CLOSE)
+
+
+def get_region(content: str, name: str) -> str:
+    """Return the current content of a region."""
+    regions = find_regions(content)
+    if name not in regions:
+        raise ValueError(f"Sync region not found: {name}")
+    start, end = regions[name]
+    return content[start:end]
+
+
+def splice(content: str, replacements: dict[str, str]) -> str:
+    """Replace the content of the named regions, leaving markers in place."""
+    regions = find_regions(content)
+    missing = sorted(set(replacements) - set(regions))
+    if missing:
+        raise ValueError(f"Sync regions not found: {', '.join(missing)}")
+
+    pieces = []
+    pos = 0
+    for name, (start, end) in sorted(regions.items(), key=lambda kv: kv[1][0]):
+        if name not in replacements:
+            continue
+        pieces.append(content[pos:start])
+        pieces.append(replacements[name])
+        pos = end
+    pieces.append(content[pos:])
+    return "".join(pieces)
+
+
+def splice_file(path: Path, replacements: dict[str, str]) -> bool:
+    """Splice regions in a file; write it only if something changed."""
+    content = path.read_text()
+    updated = splice(content, replacements)
+    if updated == content:
+        return False
+    path.write_text(updated)
+    return True
+
+
+def main() -> None:
+    for arg in sys.argv[1:]:
+        content = Path(arg).read_text()
+        print(arg)
+        for name, (start, end) in find_regions(content).items():
+            print(f"  {name}: {end - start} chars")
+
+
+if __name__ == "__main__":
+    main()
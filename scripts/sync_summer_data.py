@@ -11,6 +11,17 @@ import json
 import re
 from pathlib import Path
 
+from schedule import check_camp_data
+from sync_regions import splice
+from update_availability import (
+    AVAILABILITY_PATH,
+    FEED_PATH,
+    availability_from_feed,
+    load_json,
+    render_session_rows,
+    render_sessions_line,
+)
+
 
 ROOT = Path(__file__).resolve().parent.parent
 DATA_PATH = ROOT / "data" / "summer-camps-2026.json"
@@ -27,43 +38,43 @@ def replace_regex(content: str, pattern: str, repl: str, flags: int = 0, count:
     return updated
 
 
-def sessions_label(n: int) -> str:
-    return "session" if n == 1 else "sessions"
+def load_availability(data: dict) -> dict:
+    """Stored availability per camp, or None where it doesn't match the sessions.
+
+    Lets a sync keep the availability badges instead of wiping them until the
+    next update_availability.py run. Falls back to the committed public feed
+    where data/session-availability.json doesn't exist, as publish() does.
+    """
+    stored = load_json(AVAILABILITY_PATH) or availability_from_feed(load_json(FEED_PATH)) or {}
+    result = {}
+    for camp in data["camps"]:
+        avail = stored.get(camp["id"])
+        result[camp["id"]] = avail if avail and len(avail) == len(camp["sessions"]) else None
+    return result
 
 
 def ensure_no_time_conflicts(data: dict) -> None:
-    by_slot: dict[tuple[str, str], list[str]] = {}
-    for camp in data["camps"]:
-        for s in camp["sessions"]:
-            key = (s["dates"], s["time"])
-            by_slot.setdefault(key, []).append(camp["name"])
-    conflicts = {k: v for k, v in by_slot.items() if len(v) > 1}
-    if conflicts:
+    problems = check_camp_data(data)
+    if problems:
         lines = ["Found schedule conflicts in canonical summer data:"]
-        for (dates, time), camps in sorted(conflicts.items()):
-            lines.append(f"- {dates} | {time}: {', '.join(camps)}")
+        lines.extend(f"- {p}" for p in problems)
         raise ValueError("\n".join(lines))
 
 
 def sync_summer_main(data: dict) -> None:
     path = ROOT / "summer.html"
     content = path.read_text()
+    availability = load_availability(data)
 
     pricing = data["pricing"]
+    regions = {}
     if pricing["early_bird_price"] is not None:
-        content = replace_regex(
-            content,
-            r"<p style=\"font-size: 1\.2rem; margin: 0;?\">.*?</p>\s*(?:<p style=\"font-size: 1\.2rem; margin: 0\.5rem 0 0 0;\">.*?</p>)?",
-            f"<p style=\"font-size: 1.2rem; margin: 0;\"><strong>Early Bird: ${pricing['early_bird_price']}</strong> (register by {pricing['early_bird_deadline_main']})</p>\n              <p style=\"font-size: 1.2rem; margin: 0.5rem 0 0 0;\"><strong>Regular: ${pricing['regular_price']}</strong></p>",
-            count=1,
+        regions["pricing"] = (
+            f"<p style=\"font-size: 1.2rem; margin: 0;\"><strong>Early Bird: ${pricing['early_bird_price']}</strong> (register by {pricing['early_bird_deadline_main']})</p>\n"
+            f"              <p style=\"font-size: 1.2rem; margin: 0.5rem 0 0 0;\"><strong>Regular: ${pricing['regular_price']}</strong></p>"
         )
     else:
-        content = replace_regex(
-            content,
-            r"<p style=\"font-size: 1\.2rem; margin: 0;?\">.*?</p>\s*(?:<p style=\"font-size: 1\.2rem; margin: 0\.5rem 0 0 0;\">.*?</p>)?",
-            f"<p style=\"font-size: 1.2rem; margin: 0;\"><strong>${pricing['regular_price']}/week</strong></p>",
-            count=1,
-        )
+        regions["pricing"] = f"<p style=\"font-size: 1.2rem; margin: 0;\"><strong>${pricing['regular_price']}/week</strong></p>"
     content = replace_regex(
         content,
         r"robot camps \(Robot Arm and Reachy Mini\) are limited to \d+\.",
@@ -72,36 +83,19 @@ def sync_summer_main(data: dict) -> None:
     )
 
     for camp in data["camps"]:
-        href = re.escape(camp["card_href"])
-        sessions_br = "<br>".join(
-            s.strip() for s in camp["summary_sessions_line"].split(", ")
+        cid = camp["id"]
+        regions[f"camp={cid}:meta"] = (
+            f"<strong>Ages:</strong> {camp['age_summary']} &nbsp;|&nbsp; "
+            f"<strong>Max:</strong> {camp['max_campers']} campers"
         )
-        block_pattern = (
-            rf"(<h3><a href=\"{href}\">.*?</a></h3>\s*"
-            rf"<p>.*?</p>\s*"
-            rf"<p><strong>Ages:</strong> )[^<]+"
-            rf"(&nbsp;\|&nbsp; <strong>Max:</strong> )\d+( campers</p>\s*"
-            rf"<p style=\"font-size: 0\.9rem; color: #555;[^\"]*\"><strong>)\d+ (?:session|sessions):</strong>.+?(</p>)"
-        )
-        repl = (
-            rf"\g<1>{camp['age_summary']} \g<2>{camp['max_campers']}\g<3>"
-            rf"{len(camp['sessions'])} {sessions_label(len(camp['sessions']))}:</strong><br>{sessions_br}\4"
-        )
-        content = replace_regex(content, block_pattern, repl, flags=re.S, count=1)
-
-    path.write_text(content)
-
+        regions[f"camp={cid}:sessions"] = render_sessions_line(camp, availability[cid])
 
-def render_sessions_rows(sessions: list[dict]) -> str:
-    rows = []
-    for idx, session in enumerate(sessions, start=1):
-        border = ' style="padding: 0.5rem; border-bottom: 1px solid #ddd;"' if idx < len(sessions) else ' style="padding: 0.5rem;"'
-        rows.append(f'<tr><td{border}>{idx}</td><td{border}>{session["dates"]}</td><td{border}>{session["time"]}</td></tr>')
-    return "\n                ".join(rows)
+    path.write_text(splice(content, regions))
 
 
 def sync_detail_pages(data: dict) -> None:
     pricing = data["pricing"]
+    availability = load_availability(data)
     for camp in data["camps"]:
         path = ROOT / camp["detail_file"]
         content = path.read_text()
@@ -129,17 +123,9 @@ def sync_detail_pages(data: dict) -> None:
             count=1,
         )
 
-        tbody_pattern = (
-            r"(<h3>Summer 2026 Dates</h3>\s*<table style=\"width: 100%; border-collapse: collapse; margin-top: 0\.5rem;\">\s*"
-            r"<thead>.*?</thead>\s*<tbody>)(.*?)(</tbody>)"
-        )
-        content = replace_regex(
-            content,
-            tbody_pattern,
-            rf"\g<1>\n                {render_sessions_rows(camp['sessions'])}\n              \3",
-            flags=re.S,
-            count=1,
-        )
+        content = splice(content, {
+            f"camp={camp['id']}:session-rows": render_session_rows(camp, availability[camp["id"]]),
+        })
 
         content = re.sub(
             r"https://appserv7\.admin\.uillinois\.edu/FormBuilderSurvey/Survey/gies_college_of_business/illinois_makerlab/summer_\d{4}/",
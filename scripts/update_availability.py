@@ -4,6 +4,23 @@
 Usage:
     python3 scripts/update_availability.py          # fetch + update
     python3 scripts/update_availability.py --dry-run # fetch + show counts, don't write files
+    python3 scripts/update_availability.py --full    # recount from scratch, ignore previous snapshot
+    python3 scripts/update_availability.py --force   # rewrite every page even if no counts changed
+    python3 scripts/update_availability.py --watch   # keep polling, faster while seats are moving
+
+Seat counts are published to api/availability.json, which summer.html and
+the camp detail pages read to render their badges (js/main.js). The badges
+baked into the HTML are only a fallback for visitors without JavaScript, so
+a page is rewritten only when one of its sessions sells out, reopens or
+drops to its last spots. Changes since the stored
+data/session-availability.json are printed and saved to
+data/availability-changes.json, and every poll's counts are appended to
+data/registration-history/ (see registration_history.py).
+
+--watch polls FormBuilder every minute right after a change or while any
+session is within 2 seats of full, doubles the wait (up to 30 minutes) while
+nothing moves, and exits once every session is sold out or the token expires.
+Set FORMBUILDER_API_URL to point it at a local stub (scripts/formbuilder_stub.py).
 
 Requires: Bearer token in FORMBUILDER_TOKEN env var or data/.env file.
 """
@@ -15,16 +32,40 @@ import json
 import os
 import re
 import ssl
+import time
+import urllib.error
 import urllib.request
+from datetime import datetime
 from pathlib import Path
 
+from availability_forecast import feed_forecast, forecast_sessions
+from registration_history import RegistrationHistory
+from sync_regions import splice_file
+
 ROOT = Path(__file__).resolve().parent.parent
 DATA_PATH = ROOT / "data" / "summer-camps-2026.json"
 SNAPSHOT_PATH = ROOT / "data" / "registrations-snapshot.json"
 AVAILABILITY_PATH = ROOT / "data" / "session-availability.json"
+CHANGES_PATH = ROOT / "data" / "availability-changes.json"
+# Public feed read by the pages — counts only, no registration data
+FEED_PATH = ROOT / "api" / "availability.json"
 
 ENDPOINT_ID = "d182387d-ce09-4fbd-b114-b40f011cdd90"
-API_URL = f"https://appserv7.admin.uillinois.edu/FormBuilderService/api/DataEndpoint/{ENDPOINT_ID}"
+API_URL = os.environ.get(
+    "FORMBUILDER_API_URL",
+    f"https://appserv7.admin.uillinois.edu/FormBuilderService/api/DataEndpoint/{ENDPOINT_ID}",
+)
+
+# No-JS badge for a session with more than 2 seats left
+OPEN_BADGE = "Spots available"
+
+# Seconds before a stalled FormBuilder request is abandoned
+FETCH_TIMEOUT = 60
+
+# --watch cadence (seconds)
+WATCH_MIN_INTERVAL = 60
+WATCH_MAX_INTERVAL = 30 * 60
+WATCH_NEAR_FULL = 2  # poll fast while any session has this many seats or fewer left
 
 # Map API field names → camp IDs in summer-camps-2026.json
 FIELD_TO_CAMP = {
@@ -80,13 +121,31 @@ def fetch_registrations(token: str) -> list[dict]:
         "Accept": "application/json",
         "Authorization": f"Bearer {token}",
     })
-    with urllib.request.urlopen(req, context=_ssl_context()) as resp:
+    with urllib.request.urlopen(req, context=_ssl_context(), timeout=FETCH_TIMEOUT) as resp:
         return json.loads(resp.read())
 
 
-def compute_availability(registrations: list[dict], camps: list[dict]) -> dict:
-    """Compute per-session availability from registration data."""
-    # Count registrations per session code.
+# Inverted index: API field → (camp ID, {session code → session index}).
+# Built once so counting never searches CODE_TO_SESSION.
+FIELD_INDEX = [(field, cid, CODE_TO_SESSION.get(cid, {})) for field, cid in FIELD_TO_CAMP.items()]
+
+
+def registration_key(r: dict) -> str | None:
+    """Stable identity of a registration record across fetches."""
+    key = r.get("FormResponseId")
+    return str(key) if key is not None else None
+
+
+def count_sessions(
+    registrations: list[dict],
+    camps: list[dict],
+    counts: dict[str, list[int]] | None = None,
+    sign: int = 1,
+) -> dict[str, list[int]]:
+    """Count seats per session in a single pass over the registrations.
+
+    Adds (or with sign=-1, subtracts) into an existing counts dict if given.
+    """
     # NOTE: no status filtering here is intentional. The FormBuilder data
     # endpoint is configured to exclude cancelled and unpaid responses
     # ("not cancelled" + only "registered"), so `registrations` already
@@ -94,33 +153,183 @@ def compute_availability(registrations: list[dict], camps: list[dict]) -> dict:
     # see CLAUDE.md "Camp Operations (FormBuilder)" (data-endpoint filter,
     # PaymentProcessing notes). Filtering twice (or filtering on a field the
     # feed doesn't return) would silently undercount.
-    camp_counts: dict[str, dict[str, int]] = {}
-    for field, cid in FIELD_TO_CAMP.items():
-        codes: dict[str, int] = {}
-        for r in registrations:
+    if counts is None:
+        counts = {camp["id"]: [0] * len(camp["sessions"]) for camp in camps}
+    for r in registrations:
+        for field, cid, mapping in FIELD_INDEX:
             val = r.get(field, "").strip()
-            if val:
-                for code in val.split(", "):
-                    codes[code] = codes.get(code, 0) + 1
-        camp_counts[cid] = codes
-
-    # Build availability per camp
+            if not val or cid not in counts:
+                continue
+            session_counts = counts[cid]
+            for code in val.split(", "):
+                idx = mapping.get(code)
+                if idx is not None and idx < len(session_counts):
+                    session_counts[idx] += sign
+    return counts
+
+
+def build_availability(camps: list[dict], counts: dict[str, list[int]]) -> dict:
+    """Turn per-session counts into the availability structure."""
     availability = {}
     for camp in camps:
         cid = camp["id"]
         max_c = camp["max_campers"]
-        mapping = CODE_TO_SESSION.get(cid, {})
-        counts = camp_counts.get(cid, {})
-        avail = []
-        for i in range(len(camp["sessions"])):
-            code = next((c for c, idx in mapping.items() if idx == i), None)
-            count = counts.get(code, 0) if code else 0
-            remaining = max(0, max_c - count)
-            avail.append({"count": count, "max": max_c, "remaining": remaining})
-        availability[cid] = avail
+        availability[cid] = [
+            {"count": count, "max": max_c, "remaining": max(0, max_c - count)}
+            for count in counts[cid]
+        ]
     return availability
 
 
+def compute_availability(registrations: list[dict], camps: list[dict]) -> dict:
+    """Compute per-session availability from registration data."""
+    return build_availability(camps, count_sessions(registrations, camps))
+
+
+def compute_availability_delta(
+    registrations: list[dict],
+    camps: list[dict],
+    previous_registrations: list[dict],
+    previous_availability: dict,
+) -> dict | None:
+    """Update the previous availability with only the registrations that changed.
+
+    Registrations are matched on FormResponseId; added, removed and edited
+    records adjust the previous counts. Returns None when a full recount is
+    needed (no previous data, missing IDs, or the camp layout changed).
+    """
+    if not previous_registrations or not previous_availability:
+        return None
+    for camp in camps:
+        prev = previous_availability.get(camp["id"])
+        if prev is None or len(prev) != len(camp["sessions"]):
+            return None
+        if any(a["max"] != camp["max_campers"] for a in prev):
+            return None
+
+    previous_by_key = {}
+    for r in previous_registrations:
+        key = registration_key(r)
+        if key is None:
+            return None
+        previous_by_key[key] = r
+
+    added = []
+    removed = []
+    seen = set()
+    for r in registrations:
+        key = registration_key(r)
+        if key is None:
+            return None
+        seen.add(key)
+        old = previous_by_key.get(key)
+        if old is None:
+            added.append(r)
+        elif old != r:
+            # Edited answer — swap the old sessions for the new ones
+            removed.append(old)
+            added.append(r)
+    removed.extend(r for key, r in previous_by_key.items() if key not in seen)
+
+    counts = {cid: [a["count"] for a in avail] for cid, avail in previous_availability.items()}
+    count_sessions(removed, camps, counts, sign=-1)
+    count_sessions(added, camps, counts)
+    return build_availability(camps, counts)
+
+
+def load_json(path: Path):
+    """Read a JSON file, or None if it doesn't exist or is unreadable."""
+    try:
+        return json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def diff_availability(camps: list[dict], old: dict | None, new: dict) -> list[dict]:
+    """List sessions whose seat count differs between two availability dicts."""
+    changes = []
+    for camp in camps:
+        cid = camp["id"]
+        parts = camp["summary_sessions_line"].split(", ")
+        old_avail = (old or {}).get(cid) or []
+        for i, a in enumerate(new[cid]):
+            old_count = old_avail[i]["count"] if i < len(old_avail) else None
+            if old_count != a["count"]:
+                session = parts[i] if i < len(parts) else f'{camp["sessions"][i]["dates"]}'
+                changes.append({"camp": cid, "session": session, "old": old_count, "new": a["count"]})
+    return changes
+
+
+def fallback_state(remaining: int) -> int:
+    """What the no-JS fallback badge needs to reflect: sold out, 1, 2, or open."""
+    return min(max(remaining, 0), 3)
+
+
+def stale_fallback_camps(camps: list[dict], old: dict | None, new: dict) -> set[str]:
+    """Camp IDs whose server-rendered fallback badges no longer match."""
+    stale = set()
+    for camp in camps:
+        cid = camp["id"]
+        old_avail = (old or {}).get(cid)
+        if not old_avail or len(old_avail) != len(new[cid]):
+            stale.add(cid)
+            continue
+        if any(fallback_state(o["remaining"]) != fallback_state(n["remaining"])
+               for o, n in zip(old_avail, new[cid])):
+            stale.add(cid)
+    return stale
+
+
+def build_feed(camps: list[dict], availability: dict, forecast: dict | None = None) -> dict:
+    """Public availability feed for client-side badge rendering.
+
+    forecast (per-session sell-out projections, see availability_forecast.py)
+    sits outside "camps" so badge change detection ignores it.
+    """
+    feed = {
+        "updated": datetime.now().isoformat(timespec="seconds"),
+        "camps": {
+            camp["id"]: {
+                "name": camp["name"],
+                "max": camp["max_campers"],
+                "remaining": [a["remaining"] for a in availability[camp["id"]]],
+            }
+            for camp in camps
+        },
+    }
+    if forecast is not None:
+        feed["forecast"] = forecast
+    return feed
+
+
+def availability_from_feed(feed: dict | None) -> dict | None:
+    """Rebuild availability from the public feed.
+
+    Used as the baseline where data/session-availability.json doesn't exist
+    (e.g. a fresh CI checkout, since data/ isn't committed).
+    """
+    if not feed or "camps" not in feed:
+        return None
+    return {
+        cid: [
+            {"count": camp["max"] - r, "max": camp["max"], "remaining": r}
+            for r in camp["remaining"]
+        ]
+        for cid, camp in feed["camps"].items()
+    }
+
+
+def print_changes(changes: list[dict]) -> None:
+    """Print the change log to stdout."""
+    if not changes:
+        print("No availability changes.")
+        return
+    print(f"{len(changes)} session(s) changed:")
+    for c in changes:
+        old = "—" if c["old"] is None else c["old"]
+        print(f"  {c['camp']} {c['session']}: {old} → {c['new']}")
+
+
 def waitlist_mailto(camp_name: str, session_summary: str) -> str:
     """Generate a mailto link for waitlist requests."""
     import urllib.parse
@@ -134,7 +343,12 @@ def waitlist_mailto(camp_name: str, session_summary: str) -> str:
 
 
 def badge_html(remaining: int, camp_name: str = "", session_summary: str = "") -> str:
-    """Generate availability badge HTML."""
+    """Generate the server-rendered (no-JS) availability badge HTML.
+
+    Only the coarse state is baked in (sold out, 1, 2, or open), so a page
+    only changes when fallback_state() does; js/main.js shows exact counts
+    from api/availability.json.
+    """
     if remaining <= 0:
         sold_out = '<span style="color: #d32f2f; font-weight: bold;">SOLD OUT</span>'
         if camp_name and session_summary:
@@ -143,45 +357,65 @@ def badge_html(remaining: int, camp_name: str = "", session_summary: str = "") -
     elif remaining <= 2:
         return f'<span style="color: #e04e39; font-weight: bold;">{remaining} spot{"" if remaining == 1 else "s"} left</span>'
     else:
-        return f"{remaining} spots left"
-
-
-def update_summer_html(camps: list[dict], availability: dict) -> None:
-    """Update session lines on summer.html with availability badges."""
-    path = ROOT / "summer.html"
-    content = path.read_text()
-
-    for camp in camps:
-        cid = camp["id"]
-        avail = availability[cid]
-        parts = camp["summary_sessions_line"].split(", ")
+        return OPEN_BADGE
+
+
+def render_sessions_line(camp: dict, avail: list[dict] | None = None) -> str:
+    """Render the summer.html session summary for a camp, with badges if avail is given."""
+    parts = [p.strip() for p in camp["summary_sessions_line"].split(", ")]
+    if avail is not None:
+        # data-availability lets js/main.js refresh the badge from the feed
+        parts = [
+            f'{part} — <span data-availability="{camp["id"]}:{i}" data-session="{part}">'
+            f'{badge_html(avail[i]["remaining"], camp["name"], part)}</span>'
+            for i, part in enumerate(parts)
+        ]
+    n = len(camp["sessions"])
+    return f'<strong>{n} {"session" if n == 1 else "sessions"}:</strong><br>' + "<br>".join(parts)
+
+
+def render_session_rows(camp: dict, avail: list[dict] | None = None) -> str:
+    """Render a detail page's session table rows, with an availability cell if avail is given."""
+    sessions = camp["sessions"]
+    rows = []
+    for idx, session in enumerate(sessions, start=1):
+        border = ' style="padding: 0.5rem; border-bottom: 1px solid #ddd;"' if idx < len(sessions) else ' style="padding: 0.5rem;"'
+        row = f'<tr><td{border}>{idx}</td><td{border}>{session["dates"]}</td><td{border}>{session["time"]}</td>'
+        if avail is not None:
+            session_summary = f'{session["dates"]} ({session["time"]})'
+            badge = badge_html(avail[idx - 1]["remaining"], camp["name"], session_summary)
+            row += (
+                f'<td style="padding: 0.5rem;" data-availability="{camp["id"]}:{idx - 1}" '
+                f'data-session="{session_summary}">{badge}</td>'
+            )
+        rows.append(row + "</tr>")
+    indent = "\n                "
+    return indent + indent.join(rows) + indent
 
-        # Build regex that matches the session line with or without existing badges
-        # Each part like "Jun 1–5 (AM)" possibly followed by " — ..." (badge text or plain)
-        old_pattern_parts = []
-        for part in parts:
-            escaped = re.escape(part)
-            old_pattern_parts.append(escaped + r"(?:\s*—\s*(?:<span[^>]*>.*?</span>(?:\s*·\s*<a[^>]*>.*?</a>)?|\d+ spots? left))?")
-        old_pattern = r"<br>".join(old_pattern_parts)
 
-        # Build new line with badges for ALL sessions
-        new_parts = []
-        for i, part in enumerate(parts):
-            new_parts.append(f'{part} — {badge_html(avail[i]["remaining"], camp["name"], part)}')
-        new_line = "<br>".join(new_parts)
+def update_summer_html(camps: list[dict], availability: dict, only: set[str] | None = None) -> None:
+    """Update session lines on summer.html with availability badges.
 
-        content = re.sub(old_pattern, new_line, content, count=1)
+    If only is given, just those camp IDs are touched.
+    """
+    splice_file(ROOT / "summer.html", {
+        f'camp={camp["id"]}:sessions': render_sessions_line(camp, availability[camp["id"]])
+        for camp in camps
+        if only is None or camp["id"] in only
+    })
 
-    path.write_text(content)
 
+def update_detail_pages(camps: list[dict], availability: dict, only: set[str] | None = None) -> None:
+    """Update session tables on detail pages with availability column.
 
-def update_detail_pages(camps: list[dict], availability: dict) -> None:
-    """Update session tables on detail pages with availability column."""
+    If only is given, just those camp IDs' pages are touched.
+    """
     for camp in camps:
         cid = camp["id"]
+        if only is not None and cid not in only:
+            continue
         path = ROOT / camp["detail_file"]
         content = path.read_text()
-        avail = availability[cid]
 
         # Ensure Availability header exists
         if "Availability</th>" not in content:
@@ -189,25 +423,9 @@ def update_detail_pages(camps: list[dict], availability: dict) -> None:
                 '<th style="padding: 0.5rem; text-align: left;">Time</th>\n                </tr>',
                 '<th style="padding: 0.5rem; text-align: left;">Time</th>\n                  <th style="padding: 0.5rem; text-align: left;">Availability</th>\n                </tr>',
             )
+            path.write_text(content)
 
-        # Update or add availability cell for each session row
-        for i, session in enumerate(camp["sessions"]):
-            remaining = avail[i]["remaining"]
-            session_summary = f'{session["dates"]} ({session["time"]})'
-            badge = badge_html(remaining, camp["name"], session_summary)
-            date_str = re.escape(session["dates"])
-            time_str = re.escape(session["time"])
-
-            # Match the full row: date cell + time cell, optionally existing availability cell, then </tr>
-            pattern = (
-                rf"({date_str}</td><td[^>]*>{time_str}</td>)"
-                rf"(?:<td[^>]*>.*?</td>)?"
-                rf"(</tr>)"
-            )
-            replacement = rf'\1<td style="padding: 0.5rem;">{badge}</td>\2'
-            content = re.sub(pattern, replacement, content, count=1)
-
-        path.write_text(content)
+        splice_file(path, {f"camp={cid}:session-rows": render_session_rows(camp, availability[cid])})
 
 
 def print_report(camps: list[dict], availability: dict, registrations: list[dict]) -> None:
@@ -239,34 +457,181 @@ def print_report(camps: list[dict], availability: dict, registrations: list[dict
     print(f"Total: {total_filled}/{total_cap} filled, {total_cap - total_filled} spots remaining")
 
 
+def publish(
+    camps: list[dict],
+    registrations: list[dict],
+    dry_run: bool = False,
+    full: bool = False,
+    force: bool = False,
+    year: int | None = None,
+) -> tuple[dict, list[dict]]:
+    """Compute availability and write only what changed.
+
+    The snapshot is rewritten only when the registrations differ; the
+    availability file, change log and public feed only when a seat count
+    moved; the fallback pages only when a badge state changed (or force is
+    set). Every poll is appended to the registration history (a few bytes
+    when nothing moved); the feed carries sell-out forecasts fitted to that
+    history, or keeps its previous ones where there is too little history
+    (e.g. CI). Dry runs write nothing.
+
+    Returns:
+        (availability, changes)
+    """
+    previous_registrations = load_json(SNAPSHOT_PATH)
+    stored_availability = load_json(AVAILABILITY_PATH) or availability_from_feed(load_json(FEED_PATH))
+
+    availability = None
+    if not full:
+        availability = compute_availability_delta(
+            registrations, camps, previous_registrations, stored_availability
+        )
+    if availability is None:
+        availability = compute_availability(registrations, camps)
+
+    changes = diff_availability(camps, stored_availability, availability)
+    if dry_run:
+        return availability, changes
+
+    history = RegistrationHistory()
+    history.append({
+        camp["id"]: [a["count"] for a in availability[camp["id"]]] for camp in camps
+    })
+
+    # Snapshot and availability must stay in step for the next delta
+    if registrations != previous_registrations:
+        SNAPSHOT_PATH.write_text(json.dumps(registrations, indent=2) + "\n")
+
+    if not changes and not force:
+        return availability, changes
+
+    AVAILABILITY_PATH.write_text(json.dumps(availability, indent=2) + "\n")
+    CHANGES_PATH.write_text(json.dumps({
+        "updated": datetime.now().isoformat(timespec="seconds"),
+        "changes": changes,
+    }, indent=2) + "\n")
+    forecast = forecast_sessions(history, camps, availability, year or json.loads(DATA_PATH.read_text())["year"])
+    if forecast is not None:
+        forecast = feed_forecast(forecast)
+    else:
+        forecast = (load_json(FEED_PATH) or {}).get("forecast")
+    FEED_PATH.write_text(json.dumps(build_feed(camps, availability, forecast), indent=2) + "\n")
+
+    stale = None if force else stale_fallback_camps(camps, stored_availability, availability)
+    if stale is None or stale:
+        update_summer_html(camps, availability, stale)
+        update_detail_pages(camps, availability, stale)
+    return availability, changes
+
+
+def all_sold_out(availability: dict) -> bool:
+    """True once no session has a seat left."""
+    return all(a["remaining"] <= 0 for avail in availability.values() for a in avail)
+
+
+def next_interval(
+    availability: dict,
+    changed: bool,
+    interval: float,
+    min_interval: float = WATCH_MIN_INTERVAL,
+    max_interval: float = WATCH_MAX_INTERVAL,
+) -> float:
+    """Poll fast after a change or near capacity, otherwise back off."""
+    near_full = any(
+        0 < a["remaining"] <= WATCH_NEAR_FULL for avail in availability.values() for a in avail
+    )
+    if changed or near_full:
+        return min_interval
+    return min(interval * 2, max_interval)
+
+
+def watch(
+    camps: list[dict],
+    token: str,
+    year: int | None = None,
+    min_interval: float = WATCH_MIN_INTERVAL,
+    max_interval: float = WATCH_MAX_INTERVAL,
+) -> None:
+    """Poll FormBuilder and publish changes until everything is sold out."""
+    interval = min_interval
+    while True:
+        stamp = datetime.now().strftime("%H:%M:%S")
+        try:
+            registrations = fetch_registrations(token)
+        except urllib.error.HTTPError as e:
+            if e.code == 401:
+                print(f"[{stamp}] FormBuilder token expired — stopping")
+                return
+            print(f"[{stamp}] FormBuilder API error: HTTP {e.code}")
+            registrations = None
+        except urllib.error.URLError as e:
+            print(f"[{stamp}] FormBuilder unreachable: {e.reason}")
+            registrations = None
+        except (OSError, ValueError) as e:
+            # Timeouts, dropped connections, a truncated or non-JSON body
+            print(f"[{stamp}] FormBuilder request failed: {e or type(e).__name__}")
+            registrations = None
+
+        if registrations is None:
+            interval = min(interval * 2, max_interval)
+        else:
+            availability, changes = publish(camps, registrations, year=year)
+            if changes:
+                print(f"[{stamp}] {len(registrations)} registrations")
+                print_changes(changes)
+            else:
+                print(f"[{stamp}] {len(registrations)} registrations, no changes")
+            if all_sold_out(availability):
+                print(f"[{stamp}] All sessions sold out — stopping")
+                return
+            interval = next_interval(availability, bool(changes), interval, min_interval, max_interval)
+
+        print(f"  next poll in {interval:.0f}s")
+        time.sleep(interval)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Update camp session availability")
     parser.add_argument("--dry-run", action="store_true", help="Show counts without updating files")
+    parser.add_argument("--full", action="store_true", help="Recount every registration instead of applying a delta")
+    parser.add_argument("--force", action="store_true", help="Rewrite every page even if no counts changed")
+    parser.add_argument("--watch", action="store_true", help="Keep polling with adaptive cadence until sold out")
+    parser.add_argument("--min-interval", type=float, default=WATCH_MIN_INTERVAL,
+                        help=f"Fastest --watch poll in seconds (default: {WATCH_MIN_INTERVAL})")
+    parser.add_argument("--max-interval", type=float, default=WATCH_MAX_INTERVAL,
+                        help=f"Slowest --watch poll in seconds (default: {WATCH_MAX_INTERVAL})")
     args = parser.parse_args()
 
     camps_data = json.loads(DATA_PATH.read_text())
     camps = camps_data["camps"]
 
     token = get_token()
-    registrations = fetch_registrations(token)
-
-    # Save snapshot
-    SNAPSHOT_PATH.write_text(json.dumps(registrations, indent=2) + "\n")
+    if args.watch:
+        try:
+            watch(camps, token, camps_data["year"], args.min_interval, args.max_interval)
+        except KeyboardInterrupt:
+            print("\nStopped.")
+        return
 
-    availability = compute_availability(registrations, camps)
+    registrations = fetch_registrations(token)
 
-    # Save availability
-    AVAILABILITY_PATH.write_text(json.dumps(availability, indent=2) + "\n")
+    availability, changes = publish(
+        camps, registrations, dry_run=args.dry_run, full=args.full, force=args.force,
+        year=camps_data["year"],
+    )
 
     print_report(camps, availability, registrations)
+    print()
+    print_changes(changes)
 
     if args.dry_run:
         print("\n(dry run — no files updated)")
         return
 
-    update_summer_html(camps, availability)
-    update_detail_pages(camps, availability)
-    print("\nWebsite updated.")
+    if changes or args.force:
+        print("\nWebsite updated.")
+    else:
+        print("\nNothing to write.")
 
 
 if __name__ == "__main__":
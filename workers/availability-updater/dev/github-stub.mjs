@@ -0,0 +1,140 @@
+/**
+ * Local GitHub API stub for testing the availability worker offline.
+ *
+ * Serves the handful of endpoints the worker uses, backed by files on disk
+ * (the repo checkout by default), and keeps commits in memory:
+ *
+ *   GET   /repos/:owner/:repo/git/ref/heads/:branch
+ *   GET   /repos/:owner/:repo/git/commits/:sha
+ *   GET   /repos/:owner/:repo/contents/:path?ref=:sha
+ *   POST  /repos/:owner/:repo/git/trees
+ *   POST  /repos/:owner/:repo/git/commits
+ *   PATCH /repos/:owner/:repo/git/refs/heads/:branch
+ *
+ * With --registrations it also serves a FormBuilder export at
+ * /formbuilder/:endpointId, so a whole run needs no network.
+ *
+ * Usage:
+ *   node dev/github-stub.mjs --root ../.. --registrations /tmp/regs.json
+ *   npx wrangler dev --test-scheduled \
+ *     --var GITHUB_API:http://localhost:8790 \
+ *     --var FORMBUILDER_API:http://localhost:8790/formbuilder
+ *   curl "http://localhost:8787/__scheduled?cron=0+12+*+*+*"
+ *
+ * Every request is logged, so round trips per run can be counted; each
+ * commit prints the files it touched. Pass --write to apply commits to disk.
+ */
+
+import { createServer } from "node:http";
+import { createHash } from "node:crypto";
+import { existsSync, readFileSync, writeFileSync } from "node:fs";
+import { join, resolve } from "node:path";
+
+const args = process.argv.slice(2);
+const option = (name, fallback) => {
+  const i = args.indexOf(name);
+  return i === -1 ? fallback : args[i + 1];
+};
+
+const PORT = Number(option("--port", 8790));
+const ROOT = resolve(option("--root", "../.."));
+const REGISTRATIONS = option("--registrations", null);
+const WRITE = args.includes("--write");
+
+// commit sha -> { tree, parents, message, files: { path: content } }
+const commits = {};
+const trees = {};
+let head = "0".repeat(40);
+commits[head] = { tree: "base-tree", parents: [], message: "checkout", files: {} };
+trees["base-tree"] = {};
+let requestCount = 0;
+
+const sha = (text) => createHash("sha1").update(text).digest("hex");
+
+function readFile(commitSha, path) {
+  // Walk back through stub commits, then fall back to the checkout on disk
+  for (let c = commits[commitSha]; c; c = commits[c.parents[0]]) {
+    if (path in c.files) return c.files[path];
+  }
+  const file = join(ROOT, path);
+  return existsSync(file) ? readFileSync(file, "utf8") : null;
+}
+
+function send(res, status, body) {
+  res.writeHead(status, { "Content-Type": "application/json" });
+  res.end(JSON.stringify(body));
+}
+
+async function readBody(req) {
+  let data = "";
+  for await (const chunk of req) data += chunk;
+  return data ? JSON.parse(data) : {};
+}
+
+createServer(async (req, res) => {
+  requestCount++;
+  const url = new URL(req.url, `http://localhost:${PORT}`);
+  console.log(`#${requestCount} ${req.method} ${url.pathname}${url.search}`);
+
+  const formbuilder = url.pathname.match(/^\/formbuilder\/[^/]+$/);
+  if (formbuilder && REGISTRATIONS) {
+    return send(res, 200, JSON.parse(readFileSync(REGISTRATIONS, "utf8")));
+  }
+
+  const m = url.pathname.match(/^\/repos\/[^/]+\/[^/]+(\/.*)$/);
+  if (!m) return send(res, 404, { message: "Not Found" });
+  const path = m[1];
+  let match;
+
+  if (req.method === "GET" && path.startsWith("/git/ref/heads/")) {
+    return send(res, 200, { object: { sha: head, type: "commit" } });
+  }
+  if (req.method === "GET" && (match = path.match(/^\/git\/commits\/(\w+)$/))) {
+    const commit = commits[match[1]];
+    if (!commit) return send(res, 404, { message: "Not Found" });
+    return send(res, 200, { sha: match[1], tree: { sha: commit.tree }, message: commit.message });
+  }
+  if (req.method === "GET" && (match = path.match(/^\/contents\/(.+)$/))) {
+    const filePath = decodeURIComponent(match[1]);
+    const content = readFile(url.searchParams.get("ref") || head, filePath);
+    if (content === null) return send(res, 404, { message: "Not Found" });
+    return send(res, 200, {
+      path: filePath,
+      sha: sha(content),
+      encoding: "base64",
+      content: Buffer.from(content, "utf8").toString("base64"),
+    });
+  }
+  if (req.method === "POST" && path === "/git/trees") {
+    const body = await readBody(req);
+    const files = Object.fromEntries(body.tree.map((entry) => [entry.path, entry.content]));
+    const treeSha = sha(JSON.stringify([body.base_tree, files]));
+    trees[treeSha] = files;
+    return send(res, 201, { sha: treeSha });
+  }
+  if (req.method === "POST" && path === "/git/commits") {
+    const body = await readBody(req);
+    const commitSha = sha(JSON.stringify(body));
+    commits[commitSha] = { tree: body.tree, parents: body.parents, message: body.message, files: trees[body.tree] || {} };
+    return send(res, 201, { sha: commitSha });
+  }
+  if (req.method === "PATCH" && path.startsWith("/git/refs/heads/")) {
+    const body = await readBody(req);
+    const commit = commits[body.sha];
+    if (!commit) return send(res, 422, { message: "Object does not exist" });
+    if (!body.force && commit.parents[0] !== head) {
+      return send(res, 422, { message: "Update is not a fast forward" });
+    }
+    head = body.sha;
+    const paths = Object.keys(commit.files);
+    console.log(`  commit ${head.slice(0, 7)} "${commit.message}": ${paths.join(", ")}`);
+    if (WRITE) {
+      for (const p of paths) writeFileSync(join(ROOT, p), commit.files[p]);
+    }
+    return send(res, 200, { object: { sha: head, type: "commit" } });
+  }
+
+  send(res, 404, { message: "Not Found" });
+}).listen(PORT, () => {
+  console.log(`GitHub API stub on http://localhost:${PORT} serving ${ROOT}`);
+});
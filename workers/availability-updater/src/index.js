@@ -4,13 +4,23 @@
  * Cloudflare Worker with Cron Trigger that:
  * 1. Fetches registration data from UIUC FormBuilder API
  * 2. Computes per-session availability
- * 3. Updates summer.html and detail pages via GitHub API
- * 4. Commits changes (only if availability actually changed)
+ * 3. Publishes api/availability.json (only if availability actually changed)
+ *    — the pages render their badges from this feed
+ * 4. Refreshes the server-rendered fallback badges in summer.html and the
+ *    detail pages when a session sells out, reopens or drops to 1–2 spots
+ *
+ * All files are read concurrently at the branch head and every change lands as
+ * a single commit through the Git trees/commits API, so a run triggers at
+ * most one Pages deploy.
  *
  * Secrets (set via `wrangler secret put`):
  *   FORMBUILDER_TOKEN - Bearer token for FormBuilder API
  *   GITHUB_TOKEN      - GitHub PAT with repo write access
  *
+ * Optional vars for local testing (see dev/github-stub.mjs):
+ *   GITHUB_API       - GitHub API base URL (default https://api.github.com)
+ *   FORMBUILDER_API  - FormBuilder DataEndpoint base URL
+ *
  * Gracefully stops if the FormBuilder token expires (401) or all sessions are sold out.
  */
 
@@ -81,7 +91,11 @@ const CAMPS = [
       { dates: "Jul 6–10", time: "1:00 PM – 4:00 PM", summary: "Jul 6–10 (PM)" },
       { dates: "Jul 27–31", time: "9:00 AM – 12:00 PM", summary: "Jul 27–31 (AM)" },
     ],
-    codes: { AIROBOTICS_JUN1: 0, AIROBOTICS_JUL1: 1, AIROBOTICS_JUL2: 2 },
+    // FormBuilder's Reachy July codes are NOT chronological: JUL2 is Jul 6–10
+    // and JUL1 is Jul 27–31. Copied from CODE_TO_SESSION in
+    // scripts/update_availability.py; scripts/check_availability_worker.py
+    // fails if the two drift apart.
+    codes: { AIROBOTICS_JUN1: 0, AIROBOTICS_JUL2: 1, AIROBOTICS_JUL1: 2 },
   },
 ];
 
@@ -112,110 +126,143 @@ function computeAvailability(registrations) {
   return availability;
 }
 
-function badgeHtml(remaining) {
-  if (remaining <= 0) {
-    return '<span style="color: #d32f2f; font-weight: bold;">SOLD OUT</span>';
-  } else if (remaining <= 2) {
-    return `<span style="color: #e04e39; font-weight: bold;">${remaining} spot${remaining === 1 ? "" : "s"} left</span>`;
+function buildFeed(availability, updated) {
+  // Same shape as build_feed() in scripts/update_availability.py
+  const camps = {};
+  for (const camp of CAMPS) {
+    camps[camp.id] = {
+      name: camp.name,
+      max: camp.maxCampers,
+      remaining: availability[camp.id].map((a) => a.remaining),
+    };
   }
-  return `${remaining} spots left`;
+  return { updated, camps };
 }
 
-// --- HTML update functions ---
-
-function updateSummerHtml(content, availability) {
-  for (const camp of CAMPS) {
-    const avail = availability[camp.id];
-    const parts = camp.sessions.map((s) => s.summary);
-
-    // Build regex matching existing session line (with or without badges)
-    const oldParts = parts.map(
-      (p) => escapeRegex(p) + String.raw`(?:\s*—\s*(?:<span[^>]*>.*?<\/span>|\d+ spots? left))?`
-    );
-    const oldPattern = new RegExp(oldParts.join("<br>"));
+// --- Fallback badges (mirror badge_html in scripts/update_availability.py) ---
 
-    // Build replacement with badges for every session
-    const newLine = parts
-      .map((p, i) => `${p} — ${badgeHtml(avail[i].remaining)}`)
-      .join("<br>");
+const OPEN_BADGE = "Spots available";
 
-    content = content.replace(oldPattern, newLine);
-  }
-  return content;
+function fallbackState(remaining) {
+  // What the no-JS badge needs to reflect: sold out, 1, 2, or open
+  return Math.min(Math.max(remaining, 0), 3);
 }
 
-function updateDetailPage(content, camp, avail) {
-  // Add Availability header if missing
-  if (!content.includes("Availability</th>")) {
-    content = content.replace(
-      '<th style="padding: 0.5rem; text-align: left;">Time</th>\n                </tr>',
-      '<th style="padding: 0.5rem; text-align: left;">Time</th>\n                  <th style="padding: 0.5rem; text-align: left;">Availability</th>\n                </tr>'
-    );
+function staleFallbackCamps(oldCamps, newCamps) {
+  const stale = new Set();
+  for (const camp of CAMPS) {
+    const before = oldCamps && oldCamps[camp.id] ? oldCamps[camp.id].remaining : null;
+    const after = newCamps[camp.id].remaining;
+    if (!before || before.length !== after.length ||
+        before.some((r, i) => fallbackState(r) !== fallbackState(after[i]))) {
+      stale.add(camp.id);
+    }
   }
+  return stale;
+}
 
-  // Update each session row
-  for (let i = 0; i < camp.sessions.length; i++) {
-    const badge = badgeHtml(avail[i].remaining);
-    const dates = escapeRegex(camp.sessions[i].dates);
-    const time = escapeRegex(camp.sessions[i].time);
+function pyQuote(str) {
+  // urllib.parse.quote(): like encodeURIComponent, but also escapes !'()* and keeps /
+  return encodeURIComponent(str)
+    .replace(/[!'()*]/g, (c) => "%" + c.charCodeAt(0).toString(16).toUpperCase())
+    .replace(/%2F/g, "/");
+}
 
-    // Match: date cell + time cell, optional existing availability cell, then </tr>
-    const pattern = new RegExp(
-      `(${dates}<\\/td><td[^>]*>${time}<\\/td>)(?:<td[^>]*>.*?<\\/td>)?(<\\/tr>)`
-    );
-    content = content.replace(
-      pattern,
-      `$1<td style="padding: 0.5rem;">${badge}</td>$2`
+function badgeHtml(remaining, campName, session) {
+  if (remaining <= 0) {
+    const subject = pyQuote(`Waitlist Request: ${campName} — ${session}`);
+    const body = pyQuote(
+      `Hi,\n\nI would like to join the waitlist for:\n\n` +
+      `Camp: ${campName}\nSession: ${session}\n\n` +
+      `Camper Name: \nParent/Guardian Name: \nEmail: \nPhone: \n\nThank you!`
     );
+    return `<span style="color: #d32f2f; font-weight: bold;">SOLD OUT</span> · <a href="mailto:uimakerlab@illinois.edu?subject=${subject}&body=${body}" style="color: #0455A4; text-decoration: underline;">Join Waitlist</a>`;
+  } else if (remaining <= 2) {
+    return `<span style="color: #e04e39; font-weight: bold;">${remaining} spot${remaining === 1 ? "" : "s"} left</span>`;
   }
-
-  return content;
+  // Only the coarse state is baked in, so pages change only with fallbackState()
+  return OPEN_BADGE;
 }
 
-function escapeRegex(str) {
-  return str.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+function updateFallbackBadges(content, feed, campIds) {
+  // Rewrite the badge inside every data-availability element of the given camps
+  const pattern = /(data-availability="([^":]+):(\d+)" data-session="([^"]*)">)(<span[^>]*>[^<]*<\/span>(?: · <a [^>]*>Join Waitlist<\/a>)?|Spots available|\d+ spots left)/g;
+  return content.replace(pattern, (match, open, campId, idx, session) => {
+    const camp = feed.camps[campId];
+    if (!campIds.has(campId) || !camp || camp.remaining[idx] === undefined) return match;
+    return open + badgeHtml(camp.remaining[idx], camp.name, session);
+  });
 }
 
 // --- GitHub API helpers ---
 
-async function githubGet(path, token, repo) {
-  const resp = await fetch(`https://api.github.com/repos/${repo}/contents/${path}?ref=main`, {
-    headers: {
-      Authorization: `token ${token}`,
-      Accept: "application/vnd.github.v3+json",
-      "User-Agent": "makerlab-availability-worker",
-    },
-  });
-  if (!resp.ok) throw new Error(`GitHub GET ${path}: ${resp.status}`);
-  const data = await resp.json();
-  return { content: atob(data.content), sha: data.sha };
+function githubHeaders(token) {
+  return {
+    Authorization: `token ${token}`,
+    Accept: "application/vnd.github.v3+json",
+    "User-Agent": "makerlab-availability-worker",
+  };
 }
 
-async function githubUpdate(path, content, sha, message, token, repo) {
-  const resp = await fetch(`https://api.github.com/repos/${repo}/contents/${path}`, {
-    method: "PUT",
-    headers: {
-      Authorization: `token ${token}`,
-      Accept: "application/vnd.github.v3+json",
-      "User-Agent": "makerlab-availability-worker",
-    },
-    body: JSON.stringify({
-      message,
-      content: btoa(unescape(encodeURIComponent(content))),
-      sha,
-      branch: "main",
-    }),
+async function githubApi(env, method, path, body) {
+  const base = env.GITHUB_API || "https://api.github.com";
+  const resp = await fetch(`${base}/repos/${env.GITHUB_REPO}${path}`, {
+    method,
+    headers: githubHeaders(env.GITHUB_TOKEN),
+    body: body ? JSON.stringify(body) : undefined,
   });
+  if (method === "GET" && resp.status === 404) return null;
   if (!resp.ok) {
     const text = await resp.text();
-    throw new Error(`GitHub PUT ${path}: ${resp.status} ${text}`);
+    throw new Error(`GitHub ${method} ${path}: ${resp.status} ${text}`);
   }
+  return resp.json();
+}
+
+async function githubReadFiles(env, paths) {
+  // Resolve the branch head once, then read every file at that commit in parallel
+  const branch = env.GITHUB_BRANCH || "main";
+  const ref = await githubApi(env, "GET", `/git/ref/heads/${branch}`);
+  const head = ref.object.sha;
+  const [commit, ...files] = await Promise.all([
+    githubApi(env, "GET", `/git/commits/${head}`),
+    ...paths.map((path) => githubApi(env, "GET", `/contents/${path}?ref=${head}`)),
+  ]);
+  const contents = {};
+  paths.forEach((path, i) => {
+    contents[path] = files[i] ? decodeURIComponent(escape(atob(files[i].content.replace(/\n/g, "")))) : null;
+  });
+  return { head, tree: commit.tree.sha, contents };
+}
+
+async function githubCommitFiles(env, base, changes, message) {
+  // One tree, one commit, one ref update — however many files changed
+  const branch = env.GITHUB_BRANCH || "main";
+  const tree = await githubApi(env, "POST", "/git/trees", {
+    base_tree: base.tree,
+    tree: Object.entries(changes).map(([path, content]) => ({
+      path,
+      mode: "100644",
+      type: "blob",
+      content,
+    })),
+  });
+  const commit = await githubApi(env, "POST", "/git/commits", {
+    message,
+    tree: tree.sha,
+    parents: [base.head],
+  });
+  // Not forced: fails if someone pushed since we read, rather than clobbering it
+  await githubApi(env, "PATCH", `/git/refs/heads/${branch}`, { sha: commit.sha, force: false });
+  return commit.sha;
 }
 
 // --- FormBuilder API ---
 
-async function fetchRegistrations(endpointId, token) {
-  const url = `https://appserv7.admin.uillinois.edu/FormBuilderService/api/DataEndpoint/${endpointId}`;
+const FORMBUILDER_API = "https://appserv7.admin.uillinois.edu/FormBuilderService/api/DataEndpoint";
+
+async function fetchRegistrations(endpointId, token, base = FORMBUILDER_API) {
+  const url = `${base}/${endpointId}`;
   const resp = await fetch(url, {
     headers: {
       Accept: "application/json",
@@ -234,6 +281,9 @@ async function fetchRegistrations(endpointId, token) {
   return { error: null, data };
 }
 
+// Pure helpers, for scripts/check_availability_worker.py
+export { CAMPS, computeAvailability, buildFeed, updateFallbackBadges };
+
 // --- Main handler ---
 
 export default {
@@ -245,7 +295,8 @@ export default {
     // 1. Fetch registrations (graceful on token expiry)
     const { error, data: registrations } = await fetchRegistrations(
       env.ENDPOINT_ID,
-      env.FORMBUILDER_TOKEN
+      env.FORMBUILDER_TOKEN,
+      env.FORMBUILDER_API
     );
 
     if (error === "token_expired") {
@@ -275,41 +326,52 @@ export default {
     const remaining = totalCap - totalFilled;
     log.push(`${totalFilled}/${totalCap} filled, ${remaining} spots remaining`);
 
-    // 3. Update files via GitHub API
-    const filesToUpdate = [
-      { path: "summer.html", updater: (c) => updateSummerHtml(c, availability) },
-      ...CAMPS.map((camp) => ({
-        path: camp.detailFile,
-        updater: (c) => updateDetailPage(c, camp, availability[camp.id]),
-      })),
-    ];
-
-    let changedFiles = 0;
-
-    for (const file of filesToUpdate) {
-      const { content: original, sha } = await githubGet(file.path, env.GITHUB_TOKEN, env.GITHUB_REPO);
-      const updated = file.updater(original);
-
-      if (updated !== original) {
-        await githubUpdate(
-          file.path,
-          updated,
-          sha,
-          `Update camp availability (${ts.split("T")[0]})`,
-          env.GITHUB_TOKEN,
-          env.GITHUB_REPO
-        );
-        changedFiles++;
-        log.push(`Updated: ${file.path}`);
+    // 3. Read the feed and every page at the branch head, concurrently
+    const feedPath = "api/availability.json";
+    const pagePaths = ["summer.html", ...CAMPS.map((c) => c.detailFile)];
+    const base = await githubReadFiles(env, [feedPath, ...pagePaths]);
+
+    let previous = null;
+    let forecast;
+    if (base.contents[feedPath]) {
+      try {
+        ({ camps: previous, forecast } = JSON.parse(base.contents[feedPath]));
+      } catch (e) {
+        // Unreadable feed — overwrite it
       }
     }
 
-    if (changedFiles === 0) {
+    const feed = buildFeed(availability, ts.split(".")[0]);
+    // Sell-out forecasts need the registration history, which only
+    // scripts/update_availability.py keeps — carry them forward
+    if (forecast) feed.forecast = forecast;
+    if (previous && JSON.stringify(previous) === JSON.stringify(feed.camps)) {
       log.push("No changes detected");
-    } else {
-      log.push(`${changedFiles} file(s) committed and deployed`);
+      console.log(log.join("\n"));
+      return;
     }
 
+    // 4. Collect the feed plus any page whose fallback badges went stale
+    const changes = { [feedPath]: JSON.stringify(feed, null, 2) + "\n" };
+    const stale = staleFallbackCamps(previous, feed.camps);
+    if (stale.size) {
+      for (const path of pagePaths) {
+        const original = base.contents[path];
+        if (original === null) continue;
+        const updated = updateFallbackBadges(original, feed, stale);
+        if (updated !== original) changes[path] = updated;
+      }
+    }
+
+    // 5. Publish everything as one commit
+    const sha = await githubCommitFiles(
+      env,
+      base,
+      changes,
+      `Update camp availability (${ts.split("T")[0]})`
+    );
+    log.push(`Committed ${sha.slice(0, 7)}: ${Object.keys(changes).join(", ")}`);
+
     console.log(log.join("\n"));
   },
 